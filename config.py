@@ -39,8 +39,33 @@ class AppConfig:
         'timestamp_color': '#FFFFFF',
         'timestamp_background': '#000000B2',
         'timestamp_size': 24,
-        'click_marker_radius': 20,
-        'click_marker_color': (255, 255, 0, 100)
+        'click_marker_radius': 40,
+        'click_marker_color': (255, 255, 0, 100),
+        # Pipeline assíncrono de captura (listener -> fila -> workers)
+        'capture_workers': 2,
+        'capture_queue_depth': 8,
+        'capture_queue_timeout': 0.25,  # segundos bloqueando o listener antes de descartar
+        # Área capturada: 'monitor', 'janela' (janela clicada), 'regiao' (fixa na sessão) ou 'cursor'
+        'capture_region': 'monitor',
+        'cursor_crop_size': (1280, 720),  # Largura x altura no modo 'cursor'
+        # Buffer pré-clique: quadros recentes em memória, o clique usa o anterior ao instante do clique
+        'preclick_buffer': False,
+        'preclick_fps': 10,
+        'preclick_memory_mb': 256,  # Teto do anel (quadros brutos BGRA: ~8 MB por quadro Full HD)
+        'preclick_max_age': 0.5,  # segundos - quadros mais antigos são descartados (clique: captura ao vivo)
+        # Captura por intervalo: grava uma evidência quando a tela mudou desde a última gravada
+        'interval_capture': False,
+        'interval_seconds': 5.0,
+        'interval_change_ratio': 0.01,  # Fração mínima de pixels alterados (0.01 = 1%)
+        'interval_pixel_tolerance': 24,  # Diferença (0-255) abaixo da qual o pixel é considerado igual
+        'interval_downsample': 8,  # Comparação em miniatura reduzida por este fator
+        # Capturas repetidas: hash perceptual comparado com as últimas evidências gravadas
+        'dedup_enabled': False,  # Desligado: cliques agrupados não aparecem como passos no DOCX
+        'dedup_history': 5,  # Quantas evidências recentes são comparadas
+        'dedup_hash_size': 16,  # Hash de 16x16 = 256 bits
+        'dedup_max_distance': 6,  # Bits diferentes tolerados no hash (filtro rápido)
+        'dedup_max_changed_ratio': 0.0,  # Confirmação na miniatura: fração de pixels alterados tolerada
+        'dedup_pixel_tolerance': 24  # Diferença (0-255) considerada ruído na confirmação
     }
     
     # Configurações de documentos
@@ -48,7 +73,36 @@ class AppConfig:
         'default_template': 'template_evidencias.docx',
         'image_width_inches': 6.0,
         'auto_open_folder': True,
-        'backup_metadata': True
+        'backup_metadata': True,
+        'image_workers': None,  # Processos na preparação das imagens (None = todos os núcleos)
+        'streaming_writer': True,  # Grava imagens e corpo do DOCX em fluxo (memória constante)
+        # Perfil de exportação das imagens inseridas no DOCX (reamostradas para o tamanho real de impressão)
+        'export_profile': {
+            'enabled': True,
+            'target_dpi': 200,          # Largura final = image_width_inches * target_dpi
+            'max_width_px': 1600,       # None = sem limite
+            'format': 'png',            # 'png' ou 'jpeg' (WebP não é aceito pelo python-docx)
+            'png_optimize': True,
+            'png_compress_level': 9,    # 0-9
+            'quantize_colors': 0,       # > 0 reduz para paleta de N cores (máx. 256)
+            'jpeg_quality': 85
+        }
+    }
+    
+    # Configurações do gerador de templates (lote a partir do CSV)
+    TEMPLATE_SETTINGS = {
+        'batch_workers': None,  # Processos na geração dos documentos (None = todos os núcleos)
+        'csv_duplicates': 'first',  # Nomes repetidos no CSV: 'first', 'last' ou 'all' (n-ésima linha)
+        'csv_chunk_rows': 5000,  # Linhas por bloco na leitura em fluxo do CSV
+        'resume_batches': True,  # Manifesto na pasta de saída: reexecução pula casos já gerados
+        'skip_unchanged': True,  # Não regravar documentos cuja impressão digital (entradas + linha) não mudou
+        'archive_output': False,  # Gravar os documentos do lote em .zip (com índice) em vez de um .docx por caso
+        'archive_documents_per_zip': 0,  # Documentos por .zip (0 = um único arquivo)
+        # Placeholders do template -> campo (chave/rótulo) ou coluna do CSV. Sem apelido, o nome
+        # do placeholder é comparado direto com chaves, rótulos e colunas ([MÓDULO] -> "Módulo:")
+        'placeholders': {
+            'NOME_DO_PROJETO': 'Projeto'
+        }
     }
     
     # Atalhos de teclado
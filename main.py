@@ -774,6 +774,10 @@ class PrintFApp:
             )
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos no executável gerado pelo PyInstaller
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # Configurar caminho para imports
     current_dir = os.path.dirname(os.path.abspath(__file__))
     if current_dir not in sys.path:
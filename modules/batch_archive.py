@@ -0,0 +1,79 @@
+import json
+import os
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+ARQUIVO_INDICE_ZIP = "_indice.json"
+VERSAO_INDICE = 1
+
+
+class ArquivoZipLote:
+    """
+    Destino dos documentos de um lote em arquivos .zip em vez de um .docx por
+    caso na pasta de saída.
+
+    Cada documento chega em memória (bytes) e é gravado direto como membro
+    do zip, sem arquivo temporário por documento. Com ``documentos_por_zip``
+    o lote é dividido em vários arquivos (``<base>_001.zip``, ``_002``...).
+    Os .docx já são compactados, então os membros são armazenados sem nova
+    compressão. Ao fechar, grava ``<base>_indice.json`` (caso -> arquivo e
+    membro) na pasta e um ``_indice.json`` dentro de cada zip, para que outras
+    ferramentas extraiam um documento sem descompactar o lote inteiro.
+    """
+
+    def __init__(self, output_folder: str, nome_base: Optional[str] = None,
+                 documentos_por_zip: Optional[int] = None):
+        self.output_folder = output_folder
+        self.nome_base = nome_base or os.path.basename(os.path.abspath(output_folder)) or "documentos"
+        self.documentos_por_zip = documentos_por_zip or None
+        self.arquivos: List[str] = []
+        self.documentos: List[Dict] = []
+        self._zip = None
+        self._documentos_zip: List[Dict] = []
+
+    @property
+    def caminho_indice(self) -> str:
+        return os.path.join(self.output_folder, f"{self.nome_base}_indice.json")
+
+    def _nome_arquivo(self) -> str:
+        if not self.documentos_por_zip:
+            return f"{self.nome_base}.zip"
+        return f"{self.nome_base}_{len(self.arquivos) + 1:03d}.zip"
+
+    def _abrir_proximo(self) -> None:
+        self._fechar_atual()
+        nome = self._nome_arquivo()
+        self._zip = zipfile.ZipFile(os.path.join(self.output_folder, nome), 'w', zipfile.ZIP_STORED)
+        self.arquivos.append(nome)
+        self._documentos_zip = []
+
+    def _fechar_atual(self) -> None:
+        if self._zip is None:
+            return
+        self._zip.writestr(ARQUIVO_INDICE_ZIP, json.dumps(
+            {"versao": VERSAO_INDICE, "documentos": self._documentos_zip}, ensure_ascii=False, indent=2),
+            compress_type=zipfile.ZIP_DEFLATED)
+        self._zip.close()
+        self._zip = None
+
+    def adicionar(self, caso_teste: str, nome_membro: str, conteudo: bytes) -> Tuple[str, str]:
+        """Grava um documento e devolve (arquivo .zip, membro)"""
+        if self._zip is None or (self.documentos_por_zip and len(self._documentos_zip) >= self.documentos_por_zip):
+            self._abrir_proximo()
+        self._zip.writestr(nome_membro, conteudo)
+        registro = {"caso": caso_teste, "arquivo": self.arquivos[-1], "membro": nome_membro,
+                    "bytes": len(conteudo)}
+        self._documentos_zip.append(registro)
+        self.documentos.append(registro)
+        return self.arquivos[-1], nome_membro
+
+    def fechar(self) -> None:
+        """Fecha o zip atual e grava o índice geral do lote"""
+        self._fechar_atual()
+        if not self.arquivos:
+            return
+        tmp_path = self.caminho_indice + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"versao": VERSAO_INDICE, "arquivos": self.arquivos, "documentos": self.documentos},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.caminho_indice)
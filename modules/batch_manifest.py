@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import zipfile
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+ARQUIVO_MANIFESTO = ".manifesto_lote.jsonl"
+VERSAO_MANIFESTO = 1
+
+# Impressão digital do conteúdo, gravada em dc:identifier (docProps/core.xml)
+PREFIXO_IMPRESSAO = "printf:"
+_DC_IDENTIFIER = '{http://purl.org/dc/elements/1.1/}identifier'
+
+
+def hash_arquivo(caminho: Optional[str]) -> str:
+    """SHA-1 do conteúdo do arquivo ("" se não houver arquivo)"""
+    if not caminho or not os.path.exists(caminho):
+        return ""
+    sha = hashlib.sha1()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def impressao_lote(**entradas) -> str:
+    """Hash das entradas comuns a todo o lote (template, campos, colunas, versão do gerador...)"""
+    return hashlib.sha1(json.dumps(entradas, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def impressao_caso(impressao_do_lote: str, caso_teste: str, dados_csv: Optional[Dict[str, str]]) -> str:
+    """Impressão digital determinística do documento de um caso: lote + dados da linha"""
+    conteudo = json.dumps([impressao_do_lote, caso_teste, dados_csv or {}], ensure_ascii=False, sort_keys=True)
+    return PREFIXO_IMPRESSAO + hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def ler_impressao(caminho: str) -> Optional[str]:
+    """Impressão digital gravada num .docx existente (None se não houver ou não for do PrintF)"""
+    try:
+        with zipfile.ZipFile(caminho) as pacote:
+            core = pacote.read('docProps/core.xml')
+        identificador = etree.fromstring(core).find(_DC_IDENTIFIER)
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+        return None
+    if identificador is None or not (identificador.text or '').startswith(PREFIXO_IMPRESSAO):
+        return None
+    return identificador.text
+
+
+class BatchManifest:
+    """
+    Manifesto de um lote de geração de documentos, gravado na pasta de saída.
+
+    A primeira linha descreve as entradas do lote (hash do CSV e do template,
+    dados fixos, colunas selecionadas...); cada linha seguinte registra o
+    status e o arquivo gerado de um caso. Ao rodar de novo com as MESMAS
+    entradas, os casos já gerados cujo arquivo continua presente e inalterado
+    (tamanho/mtime) são pulados. Com entradas diferentes o manifesto recomeça.
+    """
+
+    def __init__(self, output_folder: str, entradas: Dict):
+        self.caminho = os.path.join(output_folder, ARQUIVO_MANIFESTO)
+        self.output_folder = output_folder
+        self.entradas = dict(entradas, versao=VERSAO_MANIFESTO)
+        self.casos: Dict[int, Dict] = {}
+        self.retomado = False
+        self.pulados = 0
+        self._arquivo = None
+
+    @staticmethod
+    def descrever_entradas(csv_path: str, template_path: str, dados_fixos: Dict[str, str],
+                           colunas_selecionadas: List[str], **extras) -> Dict:
+        return dict(
+            csv_hash=hash_arquivo(csv_path),
+            template_hash=hash_arquivo(template_path),
+            dados_fixos=dados_fixos,
+            colunas=list(colunas_selecionadas or []),
+            **extras,
+        )
+
+    def abrir(self) -> 'BatchManifest':
+        """Retoma o manifesto existente se as entradas forem as mesmas; senão começa um novo"""
+        anterior = self._ler()
+        if anterior is not None:
+            self.retomado = True
+            self.casos = anterior
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+            return self
+
+        tmp_path = self.caminho + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"lote": self.entradas}, ensure_ascii=False, sort_keys=True) + "\n")
+        os.replace(tmp_path, self.caminho)
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        return self
+
+    def _ler(self) -> Optional[Dict[int, Dict]]:
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                cabecalho = json.loads(f.readline())
+                if cabecalho.get("lote") != json.loads(json.dumps(self.entradas)):
+                    return None
+                casos = {}
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        # Última linha incompleta (execução interrompida)
+                        continue
+                    casos[registro["indice"]] = registro
+                return casos
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+    def concluido(self, indice: int, caso_teste: str) -> Optional[str]:
+        """Nome do arquivo se o caso já foi gerado e o arquivo está íntegro; senão None"""
+        registro = self.casos.get(indice)
+        if not registro or registro.get("status") != "ok" or registro.get("caso") != caso_teste:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.output_folder, registro["arquivo"]))
+        except (OSError, KeyError, TypeError):
+            return None
+        if [stat.st_size, stat.st_mtime_ns] != registro.get("assinatura"):
+            return None
+        self.pulados += 1
+        return registro["arquivo"]
+
+    def registrar(self, resultado) -> None:
+        """Registra o resultado de um caso (ResultadoDocumento)"""
+        registro = {
+            "indice": resultado.indice,
+            "caso": resultado.caso_teste,
+            "arquivo": resultado.nome_arquivo,
+            "status": "ok" if resultado.sucesso else "erro",
+        }
+        if resultado.sucesso:
+            stat = os.stat(os.path.join(self.output_folder, resultado.nome_arquivo))
+            registro["assinatura"] = [stat.st_size, stat.st_mtime_ns]
+        else:
+            registro["erro"] = resultado.erro
+        self.casos[resultado.indice] = registro
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+
+    def fechar(self) -> None:
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
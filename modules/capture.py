@@ -3,8 +3,6 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, colorchooser, ttk
 from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 import pyautogui
 from pynput import mouse, keyboard
 from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageGrab, ImageFilter  # 🔥 ADICIONADO ImageFilter
@@ -13,9 +11,10 @@ import math
 import re
 import screeninfo
 import glob
-import json
 import uuid
 import time
+import threading
+import queue
 import ctypes
 from ctypes import wintypes, byref
 import tkinter.font as tkfont
@@ -42,7 +41,75 @@ except ImportError:
     mss = None
     MSS_AVAILABLE = False
 
+# 🔥 PIPELINE ASSÍNCRONO DE CAPTURA (listener -> fila -> workers)
+try:
+    from modules.capture_pipeline import CapturePipeline, ClickEvent, frame_to_image
+except ImportError:
+    from capture_pipeline import CapturePipeline, ClickEvent, frame_to_image
+
+# 🔥 SESSÃO DE CAPTURA PERSISTENTE COM TABELA DE MONITORES EM CACHE
+try:
+    from modules.screen_grabber import ScreenGrabber, contem, intersecao, retangulo_centrado
+    from modules.frame_ring import FrameRingBuffer
+    from modules.interval_capture import CapturaPorIntervalo, DetectorMudancas
+    from modules.perceptual_hash import SupressorDuplicatas
+    from modules.click_marker import aplicar_marcador
+except ImportError:
+    from screen_grabber import ScreenGrabber, contem, intersecao, retangulo_centrado
+    from frame_ring import FrameRingBuffer
+    from interval_capture import CapturaPorIntervalo, DetectorMudancas
+    from perceptual_hash import SupressorDuplicatas
+    from click_marker import aplicar_marcador
+
+# 🔥 METADADOS COM JOURNAL APPEND-ONLY (snapshot compactado em segundo plano)
+try:
+    from modules.metadata_store import MetadataStore
+except ImportError:
+    from metadata_store import MetadataStore
+
+try:
+    from modules.evidence_catalog import EvidenceCatalog
+except ImportError:
+    from evidence_catalog import EvidenceCatalog
+
+# 🔥 RENDERIZAÇÃO NÃO DESTRUTIVA DO TIMESTAMP (cache endereçado por conteúdo)
+try:
+    from modules.render_cache import desenhar_timestamp, PASTA_CACHE
+except ImportError:
+    from render_cache import desenhar_timestamp, PASTA_CACHE
+
+# 🔥 GERAÇÃO DO DOCX: montagem compartilhada + preparação de imagens em paralelo
+try:
+    from modules.evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from modules.image_prep import GeracaoCancelada, formatar_tamanho
+except ImportError:
+    from evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from image_prep import GeracaoCancelada, formatar_tamanho
+
+try:
+    from config import APP_CONFIG
+    CAPTURE_SETTINGS = APP_CONFIG.CAPTURE_SETTINGS
+    DOCUMENT_SETTINGS = APP_CONFIG.DOCUMENT_SETTINGS
+except ImportError:
+    CAPTURE_SETTINGS = {}
+    DOCUMENT_SETTINGS = {}
+
 # ------------------ Gravador e Docx ------------------
+# 🔥 ÁREA CAPTURADA EM CADA CLIQUE (além do modo da barra de tarefas)
+REGIOES_CAPTURA = {
+    "monitor": "Monitor",
+    "janela": "Janela",
+    "regiao": "Região Fixa",
+    "cursor": "Área do Cursor",
+}
+
+# Classes de janela que representam a área de trabalho/barra (capturar o monitor)
+CLASSES_JANELA_SISTEMA = {"Progman", "WorkerW", "Shell_TrayWnd", "Shell_SecondaryTrayWnd"}
+
+DWMWA_EXTENDED_FRAME_BOUNDS = 9
+GA_ROOT = 2
+
+
 class CaptureModule:
     def __init__(self, parent=None, settings=None):
         """Inicializa o módulo de captura para trabalhar com a main.py"""
@@ -73,6 +140,9 @@ class CaptureModule:
         self.evidence_dir = None
         self.metadata_path = None
         self.metadata = {"evidencias": [], "proximo_id": 1}
+        self.metadata_store = None
+        self.catalog = EvidenceCatalog()  # Índices por arquivo/id (compartilhado com o store)
+        self.relatorio_imagens = None  # (bytes originais, bytes no documento) da última geração
         self.popup = None
         self.current_img_label = None
         self.current_img_tk = None
@@ -80,9 +150,25 @@ class CaptureModule:
         self.manter_evidencias = None
         self.modo_captura = "ocultar"  # Valores: "manter", "ocultar"
         
+        # 🔥 NOVO: Área capturada - "monitor", "janela", "regiao" (fixa na sessão) ou "cursor"
+        self.regiao_captura = CAPTURE_SETTINGS.get('capture_region', 'monitor')
+        self.regiao_fixa = None
+        
         # 🔥 NOVO: Controle para evidenciar clique (VALOR PADRÃO: True)
         self.evidenciar_clique = True
         
+        # 🔥 NOVO: Buffer de quadros anteriores ao clique (tela no instante do clique)
+        self.buffer_pre_clique = CAPTURE_SETTINGS.get('preclick_buffer', False)
+        self.frame_ring = None
+        
+        # 🔥 NOVO: Captura periódica (só grava quando a tela muda)
+        self.captura_intervalo = CAPTURE_SETTINGS.get('interval_capture', False)
+        self.captura_periodica = None
+        
+        # 🔥 NOVO: Capturas repetidas (mesma tela) viram coordenadas extras da evidência existente
+        self.suprimir_repetidas = CAPTURE_SETTINGS.get('dedup_enabled', False)
+        self.supressor_duplicatas = None
+        
         # 🔥 NOVOS ATRIBUTOS PARA PASTA AUTOMÁTICA
         self.pasta_automatica = False
         self.pasta_automatica_path = None
@@ -112,6 +198,11 @@ class CaptureModule:
         
         # Listener de teclado para atalhos
         self.listener_keyboard = None
+        
+        # 🔥 NOVO: Pipeline assíncrono (o listener só registra o clique)
+        self.capture_pipeline = None
+        # 🔥 NOVO: Sessão de captura (backend + tabela de monitores) - pode ser injetada
+        self.screen_grabber = None
 
     def _setup_styles(self):
         """Configura estilos visuais baseados no tema selecionado"""
@@ -385,32 +476,42 @@ class CaptureModule:
         self.listener_keyboard = keyboard.Listener(on_press=on_press, suppress=False)
         self.listener_keyboard.start()
 
+    def _abrir_metadata(self, dir_path):
+        """Abre os metadados do diretório (snapshot legado ou snapshot + journal)"""
+        if self.metadata_store and os.path.normcase(self.metadata_store.dir_path) == os.path.normcase(dir_path):
+            # Mesmo diretório: a cópia em memória já é a versão mais recente
+            return
+        self._fechar_metadata()
+        self.metadata_store = MetadataStore(dir_path)
+        self.metadata = self.metadata_store.carregar()
+        self.metadata_path = self.metadata_store.snapshot_path
+        self.catalog = self.metadata_store.catalog
+        
+        # Uma única listagem do diretório ao abrir; recargas posteriores usam só a memória
+        ausentes = self.catalog.verificar_arquivos(dir_path)
+        if ausentes:
+            print(f"⚠️ {ausentes} evidência(s) dos metadados sem arquivo no diretório")
+
+    def _fechar_metadata(self):
+        """Grava o snapshot final e fecha o journal"""
+        if self.metadata_store:
+            try:
+                self.metadata_store.fechar()
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar metadados: {e}")
+            self.metadata_store = None
+
     def _salvar_metadata(self):
-        """Salva os metadados no arquivo JSON"""
-        if self.metadata_path:
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        """Grava o snapshot completo dos metadados (as alterações normais vão para o journal)"""
+        if self.metadata_store:
+            self.metadata_store.compactar()
 
     def carregar_evidencias(self, dir_path):
         """Carrega as evidências baseadas nos metadados"""
-        self.metadata_path = os.path.join(dir_path, "evidencias_metadata.json")
-        
-        if os.path.exists(self.metadata_path):
-            try:
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
-            except:
-                self.metadata = {"evidencias": [], "proximo_id": 1}
-        
-        # Carrega evidências ativas (não excluídas)
-        evidencias_ativas = []
-        for evidencia in self.metadata["evidencias"]:
-            if not evidencia.get("excluida", False):
-                caminho = os.path.join(dir_path, evidencia["arquivo"])
-                if os.path.exists(caminho):
-                    evidencias_ativas.append(caminho)
+        self._abrir_metadata(dir_path)
         
-        return evidencias_ativas
+        # Carrega evidências ativas (não excluídas), na ordem de captura
+        return self.catalog.caminhos_ativos(dir_path)
 
     def recarregar_evidencias(self):
         """Recarrega a lista de evidências"""
@@ -419,11 +520,279 @@ class CaptureModule:
             return True
         return False
 
+    # 🔥 SESSÃO DE CAPTURA PERSISTENTE (um backend aberto por gravação)
+    def _obter_grabber(self):
+        """Retorna a sessão de captura, criando-a na primeira utilização"""
+        if self.screen_grabber is None and MSS_AVAILABLE:
+            try:
+                self.screen_grabber = ScreenGrabber(estimador_barra=self.estimativa_segura_barra_tarefas)
+            except Exception as e:
+                print(f"⚠️  Não foi possível iniciar a sessão de captura: {e}")
+        return self.screen_grabber
+
+    def _fechar_grabber(self):
+        self._parar_buffer_pre_clique()
+        if self.screen_grabber:
+            try:
+                self.screen_grabber.close()
+            except Exception as e:
+                print(f"Erro ao fechar sessão de captura: {e}")
+            self.screen_grabber = None
+
+    # 🔥 BUFFER PRÉ-CLIQUE (quadros recentes do monitor sob o cursor)
+    def _posicao_cursor(self):
+        if WIN32_AVAILABLE:
+            return win32api.GetCursorPos()
+        return tuple(pyautogui.position())
+
+    def _iniciar_buffer_pre_clique(self):
+        """Inicia a gravação contínua de quadros, se habilitada e com sessão de captura"""
+        self._parar_buffer_pre_clique()
+        if not self.buffer_pre_clique:
+            return
+        grabber = self._obter_grabber()
+        if not grabber:
+            print("⚠️  Buffer pré-clique indisponível sem sessão de captura (mss)")
+            return
+        self.frame_ring = FrameRingBuffer(
+            grabber,
+            self._posicao_cursor,
+            area="monitor" if self.modo_captura == "manter" else "work",
+            fps=CAPTURE_SETTINGS.get('preclick_fps', 10),
+            memoria_mb=CAPTURE_SETTINGS.get('preclick_memory_mb', 256),
+            idade_maxima=CAPTURE_SETTINGS.get('preclick_max_age', 0.5)
+        )
+        self.frame_ring.start()
+        print(f"🎞️ Buffer pré-clique ativo: {CAPTURE_SETTINGS.get('preclick_fps', 10)} quadros/s, "
+              f"até {CAPTURE_SETTINGS.get('preclick_memory_mb', 256)} MB")
+
+    def _parar_buffer_pre_clique(self):
+        if self.frame_ring:
+            ring, self.frame_ring = self.frame_ring, None
+            ring.stop()
+            if ring.usados or ring.ao_vivo:
+                print(f"🎞️ Buffer pré-clique: {ring.usados} clique(s) do buffer, "
+                      f"{ring.ao_vivo} capturado(s) ao vivo")
+
+    def _captura_pre_clique(self, x, y, t_clique):
+        """Quadro do buffer copiado antes do clique (None: capturar ao vivo)"""
+        if not self.frame_ring:
+            return None
+        encontrado = self.frame_ring.quadro_antes(x, y, t_clique)
+        if encontrado is None:
+            return None
+        frame, (rel_x, rel_y), rect, idade = encontrado
+        area = "Monitor Completo" if self.modo_captura == "manter" else "Work Area Monitor"
+        
+        # 🔥 NOVO: Nos modos de região, recorta o retângulo do quadro do monitor
+        # (sem retângulo - ex.: clique na área de trabalho - fica o monitor, como na captura ao vivo)
+        regiao = self._retangulo_regiao(x, y) if self.regiao_captura != "monitor" else None
+        if regiao is not None:
+            if not contem(rect, regiao):
+                return None
+            frame = frame.recortar(regiao[0] - rect[0], regiao[1] - rect[1],
+                                   regiao[2] - rect[0], regiao[3] - rect[1])
+            rect = regiao
+            rel_x, rel_y = x - rect[0], y - rect[1]
+            area = REGIOES_CAPTURA[self.regiao_captura]
+        metodo_utilizado = f"{self.screen_grabber.backend.nome} Pré-clique {area} {rect}"
+        print(f"✅ CAPTURA PRÉ-CLIQUE - {rect} | Coord: ({rel_x},{rel_y}) | quadro de {idade * 1000:.0f} ms antes")
+        return frame, (rel_x, rel_y), metodo_utilizado
+
+    # 🔥 CAPTURA POR INTERVALO (evidência periódica quando a tela muda)
+    def _iniciar_captura_intervalo(self):
+        self._parar_captura_intervalo()
+        if not self.captura_intervalo:
+            return
+        intervalo = CAPTURE_SETTINGS.get('interval_seconds', 5.0)
+        detector = DetectorMudancas(
+            fator=CAPTURE_SETTINGS.get('interval_downsample', 8),
+            tolerancia=CAPTURE_SETTINGS.get('interval_pixel_tolerance', 24),
+            limiar=CAPTURE_SETTINGS.get('interval_change_ratio', 0.01)
+        )
+        self.captura_periodica = CapturaPorIntervalo(
+            lambda: self.capture_inteligente(*self._posicao_cursor()),
+            self._enviar_captura_intervalo,
+            intervalo=intervalo,
+            detector=detector
+        )
+        self.captura_periodica.start()
+        print(f"🕒 Captura por intervalo ativa: a cada {intervalo} s, gravando quando mais de "
+              f"{detector.limiar:.1%} da tela mudar")
+
+    def _parar_captura_intervalo(self):
+        if self.captura_periodica:
+            periodica, self.captura_periodica = self.captura_periodica, None
+            periodica.stop()
+            print(f"🕒 Captura por intervalo: {periodica.verificados} verificação(ões), "
+                  f"{periodica.gravados} evidência(s) gravada(s)")
+
+    def _enviar_captura_intervalo(self, frame, rel, metodo, t_captura, momento, proporcao):
+        """Envia ao pipeline uma captura periódica em que a tela mudou"""
+        if not self.gravando or self.pausado:
+            return False
+        x, y = self._posicao_cursor()
+        evento = ClickEvent(x, y, t_captura, momento, frame, rel, f"{metodo} | Intervalo", origem="intervalo")
+        if not self.capture_pipeline:
+            return False
+        aceito = self.capture_pipeline.submit(
+            evento, timeout=CAPTURE_SETTINGS.get('capture_queue_timeout', 0.25))
+        if aceito:
+            print(f"🕒 Tela mudou ({proporcao:.1%} dos pixels) - captura por intervalo enviada")
+        return aceito
+
+    # 🔥 CAPTURA DE JANELA / REGIÃO / ÁREA DO CURSOR
+    def _area_monitor(self, x, y):
+        """Monitor (modo manter) ou work area (modo ocultar) que contém o ponto"""
+        area = "monitor" if self.modo_captura == "manter" else "work"
+        grabber = self._obter_grabber()
+        if grabber:
+            return grabber.monitor_em(x, y).area(area)
+        if WIN32_AVAILABLE:
+            handle = win32api.MonitorFromPoint((x, y), win32con.MONITOR_DEFAULTTONEAREST)
+            info = win32api.GetMonitorInfo(handle)
+            return tuple(info["Monitor"] if area == "monitor" else info["Work"])
+        return None
+
+    def _retangulo_janela(self, x, y):
+        """Retângulo visível da janela sob o clique (sem a borda invisível do Windows 10+)"""
+        if not WIN32_AVAILABLE:
+            return None
+        try:
+            hwnd = win32gui.WindowFromPoint((x, y))
+            hwnd = win32gui.GetAncestor(hwnd, GA_ROOT) if hwnd else win32gui.GetForegroundWindow()
+            if not hwnd or win32gui.GetClassName(hwnd) in CLASSES_JANELA_SISTEMA:
+                return None
+            rect = wintypes.RECT()
+            resultado = ctypes.windll.dwmapi.DwmGetWindowAttribute(
+                wintypes.HWND(hwnd), DWMWA_EXTENDED_FRAME_BOUNDS, byref(rect), ctypes.sizeof(rect))
+            if resultado == 0:
+                return (rect.left, rect.top, rect.right, rect.bottom)
+            return tuple(win32gui.GetWindowRect(hwnd))
+        except Exception as e:
+            print(f"⚠️  Não foi possível obter a janela em ({x},{y}): {e}")
+            return None
+
+    def _retangulo_regiao(self, x, y):
+        """Retângulo a capturar no modo de região atual, limitado ao monitor/work area"""
+        if self.regiao_captura == "regiao":
+            if not self.regiao_fixa:
+                return None
+            # A região é sempre a mesma, independente de onde foi o clique
+            left, top, right, bottom = self.regiao_fixa
+            limite = self._area_monitor((left + right) // 2, (top + bottom) // 2)
+            return intersecao(self.regiao_fixa, limite) if limite else self.regiao_fixa
+
+        limite = self._area_monitor(x, y)
+        if limite is None:
+            return None
+        if self.regiao_captura == "janela":
+            rect = self._retangulo_janela(x, y)
+            return intersecao(rect, limite) if rect else None
+        if self.regiao_captura == "cursor":
+            largura, altura = CAPTURE_SETTINGS.get('cursor_crop_size', (1280, 720))
+            return retangulo_centrado(x, y, largura, altura, limite)
+        return None
+
+    def capture_regiao(self, x, y):
+        """
+        Captura apenas o retângulo do modo de região (janela, região fixa ou
+        área do cursor). Retorna None para usar a captura do monitor.
+        """
+        rect = self._retangulo_regiao(x, y)
+        if rect is None:
+            return None
+        rel_x, rel_y = x - rect[0], y - rect[1]
+        try:
+            grabber = self._obter_grabber()
+            if grabber:
+                frame = grabber.grab(rect)
+                backend = grabber.backend.nome
+            else:
+                frame = ImageGrab.grab(bbox=rect, all_screens=True)
+                backend = "ImageGrab"
+        except Exception as e:
+            print(f"⚠️  Captura da {REGIOES_CAPTURA[self.regiao_captura].lower()} falhou (capturando o monitor): {e}")
+            return None
+        
+        metodo_utilizado = f"{backend} {REGIOES_CAPTURA[self.regiao_captura]} {rect}"
+        print(f"✅ CAPTURA {REGIOES_CAPTURA[self.regiao_captura].upper()} - {rect} | Coord: ({rel_x},{rel_y})")
+        return frame, (rel_x, rel_y), metodo_utilizado
+
+    def selecionar_regiao_fixa(self):
+        """
+        Janela translúcida sobre todas as telas: o usuário arrasta o retângulo
+        que será capturado durante a sessão. Retorna (left, top, right, bottom) ou None.
+        """
+        grabber = self._obter_grabber()
+        if grabber:
+            monitores = [m.monitor for m in grabber.monitores]
+        else:
+            monitores = [(m.x, m.y, m.x + m.width, m.y + m.height) for m in screeninfo.get_monitors()]
+        left = min(m[0] for m in monitores)
+        top = min(m[1] for m in monitores)
+        right = max(m[2] for m in monitores)
+        bottom = max(m[3] for m in monitores)
+        
+        janela = tk.Toplevel(self.root or self.parent)
+        janela.overrideredirect(True)
+        janela.attributes("-topmost", True)
+        janela.attributes("-alpha", 0.3)
+        janela.geometry(f"{right - left}x{bottom - top}+{left}+{top}")
+        
+        canvas = tk.Canvas(janela, cursor="cross", bg="black", highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+        for m in monitores:
+            canvas.create_text((m[0] + m[2]) // 2 - left, (m[1] + m[3]) // 2 - top,
+                               text="Arraste para selecionar a região a capturar (Esc cancela)",
+                               fill="white", font=("Arial", 18, "bold"))
+        
+        selecao = {"inicio": None, "retangulo": None, "resultado": None}
+        
+        def pressionar(event):
+            selecao["inicio"] = (event.x, event.y)
+            if selecao["retangulo"]:
+                canvas.delete(selecao["retangulo"])
+            selecao["retangulo"] = canvas.create_rectangle(
+                event.x, event.y, event.x, event.y, outline="yellow", width=3)
+        
+        def arrastar(event):
+            if selecao["inicio"]:
+                canvas.coords(selecao["retangulo"], *selecao["inicio"], event.x, event.y)
+        
+        def soltar(event):
+            if not selecao["inicio"]:
+                return
+            x1, x2 = sorted((selecao["inicio"][0], event.x))
+            y1, y2 = sorted((selecao["inicio"][1], event.y))
+            if x2 - x1 >= 20 and y2 - y1 >= 20:
+                selecao["resultado"] = (x1 + left, y1 + top, x2 + left, y2 + top)
+                janela.destroy()
+        
+        canvas.bind("<ButtonPress-1>", pressionar)
+        canvas.bind("<B1-Motion>", arrastar)
+        canvas.bind("<ButtonRelease-1>", soltar)
+        janela.bind("<Escape>", lambda event: janela.destroy())
+        
+        janela.focus_force()
+        janela.grab_set()
+        janela.wait_window()
+        
+        if selecao["resultado"]:
+            print(f"📐 Região fixa selecionada: {selecao['resultado']}")
+        return selecao["resultado"]
+
     # 🔥 MÉTODOS DE CAPTURA SIMPLIFICADOS E OTIMIZADOS
     def capture_inteligente(self, x, y):
         """
         Captura a tela baseado no modo selecionado pelo usuário
         """
+        # 🔥 NOVO: Janela, região fixa ou área do cursor (captura só o retângulo)
+        if self.regiao_captura != "monitor":
+            captura = self.capture_regiao(x, y)
+            if captura is not None:
+                return captura
+        
         if self.modo_captura == "manter":
             # Modo manter: captura tela COMPLETA (incluindo barra de tarefas)
             return self.capture_tela_completa_mss(x, y)
@@ -437,7 +806,21 @@ class CaptureModule:
         Funciona no primário e secundário, mesmo com coordenadas negativas.
         """
         try:
-            # 🔥 ESTRATÉGIA 1: Win32 API para captura precisa de monitor específico
+            # 🔥 ESTRATÉGIA 1: Sessão persistente (tabela de monitores em cache, sem abrir o mss a cada clique)
+            grabber = self._obter_grabber()
+            if grabber:
+                try:
+                    img, (rel_x, rel_y), monitor_area = grabber.grab_em(x, y, area="monitor")
+                    
+                    metodo_utilizado = f"{grabber.backend.nome} Monitor Completo {monitor_area}"
+                    print(f"✅ CAPTURA {grabber.backend.nome} - Monitor {monitor_area} | Coord: ({rel_x},{rel_y})")
+                    
+                    return img, (rel_x, rel_y), metodo_utilizado
+                    
+                except Exception as e:
+                    print(f"⚠️  Sessão de captura falhou (capturando com alternativa): {e}")
+
+            # 🔥 ESTRATÉGIA 2: Win32 API + ImageGrab (MSS não disponível)
             if WIN32_AVAILABLE:
                 try:
                     # Encontrar o monitor que contém o ponto (x, y)
@@ -447,73 +830,18 @@ class CaptureModule:
                     # Área completa do monitor (inclui barra)
                     monitor_area = monitor_info["Monitor"]  # (left, top, right, bottom)
                     
-                    # Capturar usando MSS para melhor compatibilidade com múltiplos monitores
-                    if MSS_AVAILABLE:
-                        with mss.mss() as sct:
-                            monitor_mss = {
-                                "left": monitor_area[0],
-                                "top": monitor_area[1], 
-                                "width": monitor_area[2] - monitor_area[0],
-                                "height": monitor_area[3] - monitor_area[1]
-                            }
-                            screenshot = sct.grab(monitor_mss)
-                            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                            
-                            rel_x = x - monitor_area[0]
-                            rel_y = y - monitor_area[1]
-                            
-                            metodo_utilizado = f"Win32 + MSS Monitor Completo {monitor_area}"
-                            print(f"✅ CAPTURA WIN32+MSS - Monitor {monitor_area} | Coord: ({rel_x},{rel_y})")
-                            
-                            return img, (rel_x, rel_y), metodo_utilizado
-                    else:
-                        # Fallback para ImageGrab se MSS não disponível
-                        screenshot = ImageGrab.grab(bbox=monitor_area)
-                        rel_x = x - monitor_area[0]
-                        rel_y = y - monitor_area[1]
-                        
-                        metodo_utilizado = f"Win32 Monitor Completo {monitor_area}"
-                        print(f"✅ CAPTURA WIN32 - Monitor {monitor_area} | Coord: ({rel_x},{rel_y})")
-                        
-                        return screenshot, (rel_x, rel_y), metodo_utilizado
+                    screenshot = ImageGrab.grab(bbox=monitor_area, all_screens=True)
+                    rel_x = x - monitor_area[0]
+                    rel_y = y - monitor_area[1]
+                    
+                    metodo_utilizado = f"Win32 Monitor Completo {monitor_area}"
+                    print(f"✅ CAPTURA WIN32 - Monitor {monitor_area} | Coord: ({rel_x},{rel_y})")
+                    
+                    return screenshot, (rel_x, rel_y), metodo_utilizado
                         
                 except Exception as e:
                     print(f"⚠️  Win32 falhou (capturando com alternativa): {e}")
 
-            # 🔥 ESTRATÉGIA 2: MSS como alternativa principal
-            if MSS_AVAILABLE:
-                try:
-                    with mss.mss() as sct:
-                        monitor_encontrado = None
-                        
-                        # Procurar em todos os monitores (exceto o virtual)
-                        for monitor in sct.monitors[1:]:
-                            if (monitor["left"] <= x < monitor["left"] + monitor["width"] and
-                                monitor["top"] <= y < monitor["top"] + monitor["height"]):
-                                monitor_encontrado = monitor
-                                break
-
-                        # Fallback para primeiro monitor se não encontrou
-                        if not monitor_encontrado:
-                            monitor_encontrado = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
-                            print(f"⚠️  Monitor não encontrado para coordenadas ({x},{y}), usando monitor {monitor_encontrado} como fallback")
-
-                        # Capturar a tela completa do monitor encontrado
-                        screenshot = sct.grab(monitor_encontrado)
-                        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-
-                        # Calcular coordenadas relativas ao monitor
-                        rel_x = x - monitor_encontrado["left"]
-                        rel_y = y - monitor_encontrado["top"]
-
-                        metodo_utilizado = f"MSS Monitor Completo {monitor_encontrado['width']}x{monitor_encontrado['height']}"
-                        print(f"✅ CAPTURA MSS - Monitor {monitor_encontrado} | Coord: ({rel_x},{rel_y})")
-
-                        return img, (rel_x, rel_y), metodo_utilizado
-                        
-                except Exception as e:
-                    print(f"⚠️  MSS falhou (capturando com alternativa): {e}")
-
             # 🔥 ESTRATÉGIA 3: Fallback com ImageGrab
             try:
                 screenshot = ImageGrab.grab()
@@ -551,84 +879,22 @@ class CaptureModule:
         usando a mesma lógica robusta do gravador_evidencias.py
         """
         try:
-            # 🔥 ESTRATÉGIA 1: Win32 API + MSS para multi-monitor (MESMA DO GRAVADOR)
-            if WIN32_AVAILABLE and MSS_AVAILABLE:
+            # 🔥 ESTRATÉGIA 1: Sessão persistente com work areas em cache
+            # (Win32 informa a work area real; sem Win32 ela é estimada na montagem da tabela)
+            grabber = self._obter_grabber()
+            if grabber:
                 try:
-                    # Encontrar o monitor que contém o ponto (x, y)
-                    monitor_handle = win32api.MonitorFromPoint((x, y), win32con.MONITOR_DEFAULTTONEAREST)
-                    monitor_info = win32gui.GetMonitorInfo(monitor_handle)
+                    img, (rel_x, rel_y), work_area = grabber.grab_em(x, y, area="work")
                     
-                    # 🔥 USAR WORK AREA (área sem barra de tarefas) - CHAVE DA CORREÇÃO
-                    work_area = monitor_info["Work"]  # (left, top, right, bottom)
+                    metodo_utilizado = f"{grabber.backend.nome} Work Area Monitor {work_area}"
+                    print(f"✅ CAPTURA SEM BARRA - Monitor Work Area {work_area} | Coord: ({rel_x},{rel_y})")
+                    
+                    return img, (rel_x, rel_y), metodo_utilizado
                     
-                    with mss.mss() as sct:
-                        # Configurar captura específica para o monitor encontrado
-                        monitor_mss = {
-                            "left": work_area[0],
-                            "top": work_area[1], 
-                            "width": work_area[2] - work_area[0],
-                            "height": work_area[3] - work_area[1]
-                        }
-                        
-                        screenshot = sct.grab(monitor_mss)
-                        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                        
-                        # Calcular coordenadas relativas à work area do monitor
-                        rel_x = x - work_area[0]
-                        rel_y = y - work_area[1]
-                        
-                        metodo_utilizado = f"Win32+MSS Work Area Monitor {work_area}"
-                        print(f"✅ CAPTURA SEM BARRA - Monitor Work Area {work_area} | Coord: ({rel_x},{rel_y})")
-                        
-                        return img, (rel_x, rel_y), metodo_utilizado
-                        
-                except Exception as e:
-                    print(f"⚠️  Win32+MSS falhou (capturando com alternativa): {e}")
-
-            # 🔥 ESTRATÉGIA 2: MSS puro para multi-monitor (sem Win32)
-            if MSS_AVAILABLE:
-                try:
-                    with mss.mss() as sct:
-                        monitor_encontrado = None
-                        
-                        # Procurar em todos os monitores (exceto o virtual)
-                        for i, monitor in enumerate(sct.monitors[1:], 1):
-                            if (monitor["left"] <= x < monitor["left"] + monitor["width"] and
-                                monitor["top"] <= y < monitor["top"] + monitor["height"]):
-                                monitor_encontrado = monitor
-                                break
-
-                        # Fallback para primeiro monitor se não encontrou
-                        if not monitor_encontrado:
-                            monitor_encontrado = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
-                            print(f"⚠️  Monitor não encontrado para coordenadas ({x},{y}), usando fallback")
-
-                        # 🔥 ESTIMAR WORK AREA (recortar barra de tarefas) - CHAVE DA CORREÇÃO
-                        barra_altura = self.estimativa_segura_barra_tarefas(monitor_encontrado["height"])
-                        work_area = {
-                            "left": monitor_encontrado["left"],
-                            "top": monitor_encontrado["top"], 
-                            "width": monitor_encontrado["width"],
-                            "height": monitor_encontrado["height"] - barra_altura
-                        }
-
-                        # Capturar a work area do monitor
-                        screenshot = sct.grab(work_area)
-                        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-
-                        # Calcular coordenadas relativas ao monitor
-                        rel_x = x - work_area["left"]
-                        rel_y = y - work_area["top"]
-
-                        metodo_utilizado = f"MSS Work Area Monitor {work_area['width']}x{work_area['height']}"
-                        print(f"✅ CAPTURA SEM BARRA - MSS Work Area | Coord: ({rel_x},{rel_y})")
-
-                        return img, (rel_x, rel_y), metodo_utilizado
-                        
                 except Exception as e:
-                    print(f"⚠️  MSS falhou (capturando com alternativa): {e}")
+                    print(f"⚠️  Sessão de captura falhou (capturando com alternativa): {e}")
 
-            # 🔥 ESTRATÉGIA 3: ScreenInfo + ImageGrab para multi-monitor
+            # 🔥 ESTRATÉGIA 2: ScreenInfo + ImageGrab para multi-monitor
             try:
                 monitors = screeninfo.get_monitors()
                 target_monitor = None
@@ -662,18 +928,16 @@ class CaptureModule:
             except Exception as e:
                 print(f"⚠️  ScreenInfo falhou: {e}")
 
-            # 🔥 ESTRATÉGIA 4: Fallback - recorte manual do monitor primário
+            # 🔥 ESTRATÉGIA 3: Fallback - work area estimada do monitor primário
             try:
-                # Capturar tela completa primeiro
-                screenshot_full = pyautogui.screenshot()
-                screen_width, screen_height = screenshot_full.size
+                screen_width, screen_height = pyautogui.size()
                 
                 # Verificar se as coordenadas estão no monitor primário
                 if 0 <= x < screen_width and 0 <= y < screen_height:
-                    # Recortar barra do primário
+                    # Capturar só a área acima da barra do primário (sem capturar a tela toda e recortar)
                     barra_altura = self.estimativa_segura_barra_tarefas(screen_height)
                     work_area = (0, 0, screen_width, screen_height - barra_altura)
-                    screenshot = screenshot_full.crop(work_area)
+                    screenshot = pyautogui.screenshot(region=(0, 0, screen_width, screen_height - barra_altura))
                     
                     rel_x = x
                     rel_y = y
@@ -688,12 +952,12 @@ class CaptureModule:
                     # Coordenadas fora do primário - retornar tela completa como fallback
                     metodo_utilizado = "Fallback - Tela Completa (fora do primário)"
                     print(f"❌ Coordenadas ({x},{y}) fora do monitor primário, usando tela completa")
-                    return screenshot_full, (x, y), metodo_utilizado
+                    return pyautogui.screenshot(), (x, y), metodo_utilizado
                     
             except Exception as e:
                 print(f"❌ Fallback falhou: {e}")
 
-            # 🔥 ESTRATÉGIA 5: Último recurso
+            # 🔥 ESTRATÉGIA 4: Último recurso
             screenshot = pyautogui.screenshot()
             metodo_utilizado = "Fallback Extremo - Tela Completa"
             print(f"❌ TODOS OS MÉTODOS FALHARAM - Retornando tela completa")
@@ -720,104 +984,16 @@ class CaptureModule:
             return 60
         
     # 🔥 NOVA FUNÇÃO: APLICAR TIMESTAMP MODERNO COM FUNDO (APENAS NA GERAÇÃO DO DOCX)
-    def aplicar_timestamp_moderno(self, caminho_imagem, evidencia_meta):
-        """Aplica o timestamp com fundo semi-transparente e texto centralizado - APENAS NA GERAÇÃO DO DOCX"""
-        img = Image.open(caminho_imagem).convert("RGBA")
-        draw = ImageDraw.Draw(img)
-        
-        # Calcular posição em pixels
-        img_width, img_height = img.size
-        pos_x_percent = evidencia_meta["timestamp_posicao"]["x"]
-        pos_y_percent = evidencia_meta["timestamp_posicao"]["y"]
-        
-        # Configurações do texto
-        texto = evidencia_meta["timestamp_texto"]
-        texto_cor = evidencia_meta["timestamp_cor"]  # Branco
-        fundo_cor = evidencia_meta.get("timestamp_fundo", "#000000B2")  # Preto 70%
-        tamanho = evidencia_meta.get("timestamp_tamanho", self.TIMESTAMP_TAMANHO_PADRAO)
-        
-        # Converter cor de fundo para RGBA
-        if fundo_cor.startswith("#") and len(fundo_cor) == 9:  # Formato #RRGGBBAA
-            r = int(fundo_cor[1:3], 16)
-            g = int(fundo_cor[3:5], 16)
-            b = int(fundo_cor[5:7], 16)
-            a = int(fundo_cor[7:9], 16)
-            fundo_rgba = (r, g, b, a)
-        else:
-            fundo_rgba = (0, 0, 0, 178)  # Fallback: preto 70%
-        
-        # Usar fonte
-        try:
-            font = ImageFont.truetype("arial.ttf", tamanho)
-        except:
-            font = ImageFont.load_default()
-        
-        # 🔥 CALCULAR TAMANHO DO TEXTO PARA CENTRALIZAR
-        bbox = draw.textbbox((0, 0), texto, font=font)
-        texto_largura = bbox[2] - bbox[0]
-        texto_altura = bbox[3] - bbox[1]
-        
-        # 🔥 DEFINIR PADDING E CANTOS ARREDONDADOS
-        padding_horizontal = 20
-        padding_vertical = 12
-        borda_radius = 8
-        
-        # 🔥 CALCULAR POSIÇÃO FINAL DO FUNDO (centralizado na posição especificada)
-        fundo_largura = texto_largura + (padding_horizontal * 2)
-        fundo_altura = texto_altura + (padding_vertical * 2)
-        
-        # Calcular coordenadas do fundo baseado na posição percentual
-        fundo_x1 = int((img_width * pos_x_percent) - (fundo_largura / 2))  # Centralizado horizontalmente
-        fundo_y1 = int((img_height * pos_y_percent) - (fundo_altura / 2))   # Centralizado verticalmente
-        fundo_x2 = fundo_x1 + fundo_largura
-        fundo_y2 = fundo_y1 + fundo_altura
-        
-        # 🔥 GARANTIR que o fundo não saia dos limites da imagem
-        margem = 10
-        if fundo_x1 < margem:
-            fundo_x1 = margem
-            fundo_x2 = fundo_x1 + fundo_largura
-        elif fundo_x2 > img_width - margem:
-            fundo_x2 = img_width - margem
-            fundo_x1 = fundo_x2 - fundo_largura
-            
-        if fundo_y1 < margem:
-            fundo_y1 = margem
-            fundo_y2 = fundo_y1 + fundo_altura
-        elif fundo_y2 > img_height - margem:
-            fundo_y2 = img_height - margem
-            fundo_y1 = fundo_y2 - fundo_altura
-        
-        # 🔥 CORREÇÃO CRÍTICA: Calcular a posição vertical do texto considerando a métrica da fonte
-        bbox = draw.textbbox((0, 0), texto, font=font)
-        texto_ascendente = -bbox[1]  # A parte "acima" da linha de base
-        texto_largura = bbox[2] - bbox[0]
-        texto_altura_total = bbox[3] - bbox[1]
-
-        # 🔥 CALCULAR POSIÇÃO DO TEXTO (verdadeiramente centralizado no fundo)
-        texto_x = fundo_x1 + padding_horizontal
-        # Ajuste fino para centralização vertical perfeita
-        texto_y = fundo_y1 + (fundo_altura - texto_altura_total) // 2 + texto_ascendente
-        
-        # 🔥 DESENHAR FUNDO COM CANTOS ARREDONDADOS
-        # Criar máscara para cantos arredondados
-        mask = Image.new("L", (fundo_largura, fundo_altura), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.rounded_rectangle(
-            [0, 0, fundo_largura, fundo_altura],
-            radius=borda_radius,
-            fill=255
-        )
-        
-        # Aplicar fundo semi-transparente
-        fundo_img = Image.new("RGBA", (fundo_largura, fundo_altura), fundo_rgba)
-        img.paste(fundo_img, (fundo_x1, fundo_y1), mask)
-        
-        # 🔥 DESENHAR TEXTO BRANCO VERDADEIRAMENTE CENTRALIZADO
-        draw.text((texto_x, texto_y), texto, fill=texto_cor, font=font)
-        
-        # Salvar a imagem
-        img.save(caminho_imagem)
+    def aplicar_timestamp_moderno(self, caminho_imagem, evidencia_meta, destino=None):
+        """
+        Aplica o timestamp com fundo semi-transparente e texto centralizado.
+        Grava em ``destino`` (sem ``destino``, sobrescreve a própria imagem).
+        Na geração do DOCX use o RenderCache, que nunca altera a captura original.
+        """
+        with Image.open(caminho_imagem) as origem:
+            img = origem.convert("RGBA")
+        desenhar_timestamp(img, evidencia_meta, self.TIMESTAMP_TAMANHO_PADRAO)
+        img.save(destino or caminho_imagem, "PNG")
 
     # 🔥 NOVA FUNÇÃO: CRIAR PASTA AUTOMÁTICA NO DIRETÓRIO DO TEMPLATE
     def _criar_pasta_automatica(self):
@@ -987,6 +1163,40 @@ class CaptureModule:
             )
         rb2.pack(anchor="w", pady=2)
         
+        # 🔥 NOVO: Área capturada em cada clique
+        self._create_styled_label(main_frame, text="Área Capturada:", 
+                                style_type="title").pack(anchor="w", pady=(20, 10))
+        
+        self.regiao_captura_var = tk.StringVar(value=self.regiao_captura)
+        regiao_frame = self._create_styled_frame(main_frame)
+        regiao_frame.pack(fill=tk.X, pady=5)
+        
+        largura_cursor, altura_cursor = CAPTURE_SETTINGS.get('cursor_crop_size', (1280, 720))
+        opcoes_regiao = [
+            ("monitor", "Monitor inteiro"),
+            ("janela", "Somente a janela clicada"),
+            ("regiao", "Região fixa (selecionada ao iniciar a gravação)"),
+            ("cursor", f"Área ao redor do clique ({largura_cursor} x {altura_cursor})"),
+        ]
+        for valor, texto in opcoes_regiao:
+            if self.using_liquid_glass and self.style_manager:
+                rb = ttk.Radiobutton(
+                    regiao_frame, 
+                    text=texto,
+                    variable=self.regiao_captura_var, 
+                    value=valor,
+                    style="Glass.TRadiobutton"
+                )
+            else:
+                rb = tk.Radiobutton(
+                    regiao_frame, 
+                    text=texto,
+                    variable=self.regiao_captura_var, 
+                    value=valor,
+                    bg='#f5f5f5'
+                )
+            rb.pack(anchor="w", pady=2)
+        
         # 🔥 NOVO: Checkbox para evidenciar clique
         self._create_styled_label(main_frame, text="Opções de Captura:", style_type="title").pack(anchor="w", pady=(20, 10))
         
@@ -1013,6 +1223,62 @@ class CaptureModule:
             )
         evidenciar_checkbox.pack(anchor="w")
         
+        # 🔥 NOVO: Checkbox para o buffer pré-clique
+        self.buffer_pre_clique_var = tk.BooleanVar(value=self.buffer_pre_clique)
+        if self.using_liquid_glass and self.style_manager:
+            buffer_checkbox = ttk.Checkbutton(
+                evidenciar_frame, 
+                text="Capturar a tela do instante do clique (gravação contínua em memória)",
+                variable=self.buffer_pre_clique_var,
+                style="Glass.TCheckbutton"
+            )
+        else:
+            buffer_checkbox = tk.Checkbutton(
+                evidenciar_frame, 
+                text="Capturar a tela do instante do clique (gravação contínua em memória)",
+                variable=self.buffer_pre_clique_var,
+                bg='#f5f5f5'
+            )
+        buffer_checkbox.pack(anchor="w")
+        
+        # 🔥 NOVO: Checkbox para a captura por intervalo
+        self.captura_intervalo_var = tk.BooleanVar(value=self.captura_intervalo)
+        texto_intervalo = (f"Capturar também a cada {CAPTURE_SETTINGS.get('interval_seconds', 5.0)} s "
+                           f"quando a tela mudar")
+        if self.using_liquid_glass and self.style_manager:
+            intervalo_checkbox = ttk.Checkbutton(
+                evidenciar_frame, 
+                text=texto_intervalo,
+                variable=self.captura_intervalo_var,
+                style="Glass.TCheckbutton"
+            )
+        else:
+            intervalo_checkbox = tk.Checkbutton(
+                evidenciar_frame, 
+                text=texto_intervalo,
+                variable=self.captura_intervalo_var,
+                bg='#f5f5f5'
+            )
+        intervalo_checkbox.pack(anchor="w")
+        
+        # 🔥 NOVO: Checkbox para agrupar capturas repetidas
+        self.suprimir_repetidas_var = tk.BooleanVar(value=self.suprimir_repetidas)
+        if self.using_liquid_glass and self.style_manager:
+            repetidas_checkbox = ttk.Checkbutton(
+                evidenciar_frame, 
+                text="Não gravar novamente telas repetidas (o clique é anotado na evidência anterior)",
+                variable=self.suprimir_repetidas_var,
+                style="Glass.TCheckbutton"
+            )
+        else:
+            repetidas_checkbox = tk.Checkbutton(
+                evidenciar_frame, 
+                text="Não gravar novamente telas repetidas (o clique é anotado na evidência anterior)",
+                variable=self.suprimir_repetidas_var,
+                bg='#f5f5f5'
+            )
+        repetidas_checkbox.pack(anchor="w")
+        
         # Label informativa
         if self.using_liquid_glass and self.style_manager:
             info_evidenciar = ttk.Label(
@@ -1134,9 +1400,13 @@ class CaptureModule:
             
             # 🔥 Armazena a escolha do modo de captura
             self.modo_captura = self.modo_captura_var.get()
+            self.regiao_captura = self.regiao_captura_var.get()
             
             # 🔥 NOVO: Armazena a preferência de evidenciar clique
             self.evidenciar_clique = self.evidenciar_clique_var.get()
+            self.buffer_pre_clique = self.buffer_pre_clique_var.get()
+            self.captura_intervalo = self.captura_intervalo_var.get()
+            self.suprimir_repetidas = self.suprimir_repetidas_var.get()
             
             # 🔥 VERIFICAÇÃO ADICIONAL: Limpar qualquer estado residual
             self.gravando = False
@@ -1186,6 +1456,7 @@ class CaptureModule:
         self.evidencia_count = 0
         self.pasta_automatica = False
         self.pasta_automatica_path = None
+        self.regiao_fixa = None
         
         # Mostrar janela de configuração
         if self.mostrar_janela_configuracao():
@@ -1196,6 +1467,10 @@ class CaptureModule:
     def pausar(self):
         if self.gravando and not self.pausado:
             self.pausado = True
+            if self.frame_ring:
+                self.frame_ring.pausar()
+            if self.captura_periodica:
+                self.captura_periodica.pausar()
             messagebox.showinfo("Gravação Pausada", "Gravação pausada. Clique em Retomar para continuar.")
         else:
             messagebox.showwarning("Aviso", "Gravação não está ativa ou já está pausada.")
@@ -1203,6 +1478,10 @@ class CaptureModule:
     def retomar(self):
         if self.gravando and self.pausado:
             self.pausado = False
+            if self.frame_ring:
+                self.frame_ring.retomar()
+            if self.captura_periodica:
+                self.captura_periodica.retomar()
             messagebox.showinfo("Gravação Retomada", "Gravação retomada. Continue clicando para capturar telas.")
         else:
             messagebox.showwarning("Aviso", "Gravação não está pausada.")
@@ -1220,6 +1499,12 @@ class CaptureModule:
         self.gravando = False
         self.pausado = False
 
+        # 🔥 NOVO: Aguardar as capturas ainda na fila antes de navegar
+        self._parar_captura_intervalo()
+        self._parar_pipeline()
+        self._resumo_sessao()
+        self._fechar_grabber()
+
         # Fechar popup se estiver aberto
         if self.popup and self.popup.winfo_exists():
             self.popup.destroy()
@@ -1237,16 +1522,9 @@ class CaptureModule:
         if not os.path.exists(self.evidence_dir):
             os.makedirs(self.evidence_dir)
 
-        # Inicializar metadados
-        self.metadata_path = os.path.join(self.evidence_dir, "evidencias_metadata.json")
-        if os.path.exists(self.metadata_path):
-            try:
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
-            except:
-                self.metadata = {"evidencias": [], "proximo_id": 1}
-        else:
-            self.metadata = {"evidencias": [], "proximo_id": 1}
+        # Inicializar metadados (snapshot + journal)
+        self._fechar_metadata()
+        self._abrir_metadata(self.evidence_dir)
 
         # Carregar template
         try:
@@ -1263,10 +1541,32 @@ class CaptureModule:
             self.doc = Document()
             self.using_template = False
 
+        # 🔥 NOVO: Região fixa escolhida uma vez por sessão (antes do listener, para o arraste não virar captura)
+        if self.regiao_captura == "regiao" and not self.regiao_fixa:
+            self.regiao_fixa = self.selecionar_regiao_fixa()
+            if not self.regiao_fixa:
+                print("ℹ️ Nenhuma região selecionada - capturando o monitor inteiro")
+                self.regiao_captura = "monitor"
+        
         # Iniciar gravação
         self.gravando = True
         self.pausado = False
 
+        # 🔥 NOVO: Pipeline de captura (composição, codificação e gravação fora do listener)
+        self.supressor_duplicatas = None
+        if self.suprimir_repetidas:
+            self.supressor_duplicatas = SupressorDuplicatas(
+                historico=CAPTURE_SETTINGS.get('dedup_history', 5),
+                distancia_maxima=CAPTURE_SETTINGS.get('dedup_max_distance', 6),
+                tamanho=CAPTURE_SETTINGS.get('dedup_hash_size', 16),
+                proporcao_maxima=CAPTURE_SETTINGS.get('dedup_max_changed_ratio', 0.0),
+                tolerancia=CAPTURE_SETTINGS.get('dedup_pixel_tolerance', 24)
+            )
+        self._iniciar_pipeline()
+        self._obter_grabber()
+        self._iniciar_buffer_pre_clique()
+        self._iniciar_captura_intervalo()
+
         # Configurar listener do mouse
         def on_click(x, y, button, pressed):
             if pressed and button == mouse.Button.left and self.gravando and not self.pausado:
@@ -1284,6 +1584,9 @@ class CaptureModule:
         # 🔥 MENSAGEM ATUALIZADA COM INFORMAÇÃO SOBRE PASTA AUTOMÁTICA
         mensagem = "✅ Gravação iniciada com sucesso!\n\n"
         mensagem += "Clique com o botão esquerdo do mouse para capturar telas.\n\n"
+        if self.captura_intervalo:
+            mensagem += (f"🕒 A tela também será capturada a cada {CAPTURE_SETTINGS.get('interval_seconds', 5.0)} s "
+                         "quando houver mudança.\n\n")
         mensagem += "Atalhos disponíveis:\n"
         mensagem += "• F6: Pausar gravação\n"
         mensagem += "• F7: Retomar gravação\n" 
@@ -1294,83 +1597,213 @@ class CaptureModule:
         
         messagebox.showinfo("Gravação Iniciada", mensagem)
 
+    def _iniciar_pipeline(self):
+        """Cria e inicia o pipeline assíncrono de captura"""
+        self._parar_pipeline()
+        self.capture_pipeline = CapturePipeline(
+            process=self._processar_captura,
+            commit=self._registrar_evidencia,
+            workers=CAPTURE_SETTINGS.get('capture_workers', 2),
+            queue_depth=CAPTURE_SETTINGS.get('capture_queue_depth', 8),
+            on_error=self._erro_captura
+        )
+        self.capture_pipeline.start()
+
+    def _parar_pipeline(self):
+        """Processa as capturas pendentes e encerra o pipeline"""
+        if self.capture_pipeline:
+            pendentes = self.capture_pipeline.pendentes
+            if pendentes:
+                print(f"⏳ Aguardando {pendentes} captura(s) pendente(s)...")
+            self.capture_pipeline.stop()
+            if self.capture_pipeline.descartados:
+                print(f"⚠️ {self.capture_pipeline.descartados} clique(s) descartado(s) por fila cheia")
+            self.capture_pipeline = None
+
+    def _resumo_sessao(self):
+        """Resumo da gravação no console"""
+        resumo = f"📊 Sessão: {self.evidencia_count} evidência(s) gravada(s)"
+        if self.supressor_duplicatas:
+            resumo += f", {self.supressor_duplicatas.suprimidas} captura(s) repetida(s) suprimida(s)"
+        print(resumo)
+
+    def _na_thread_da_interface(self, funcao, *args):
+        """Agenda uma chamada na thread do Tk (os workers não tocam em widgets)"""
+        if self.root:
+            try:
+                self.root.after(0, funcao, *args)
+            except Exception as e:
+                print(f"Erro ao agendar atualização da interface: {e}")
+
     def capturar_tela(self, x, y):
-        """Captura a tela e salva a evidência - SEM APLICAR TIMESTAMP NA IMAGEM"""
+        """
+        Registra o clique na thread do listener: apenas coordenadas, instante e
+        cópia bruta dos pixels. Composição, codificação e gravação ficam com o pipeline.
+        """
         try:
-            # 🔥 CAPTURA INTELIGENTE BASEADA NO MODO SELECIONADO
-            screenshot, (rel_x, rel_y), metodo_utilizado = self.capture_inteligente(x, y)
-            
-            # 🔥 MODIFICADO: Aplicar círculo apenas se configurado
-            if self.evidenciar_clique:
-                # Aplicar círculo amarelo semi-transparente no clique
-                img = screenshot.convert("RGBA")
-                overlay = Image.new("RGBA", img.size, (255, 255, 255, 0))
-                draw = ImageDraw.Draw(overlay)
-                r = 40  # Raio do círculo
-                
-                # Desenhar círculo amarelo semi-transparente no local do clique
-                draw.ellipse((rel_x-r, rel_y-r, rel_x+r, rel_y+r), fill=(255, 255, 0, 100))
-                final_img = Image.alpha_composite(img, overlay)
-                imagem_para_salvar = final_img.convert("RGB")
-                print(f"✅ Círculo amarelo aplicado nas coordenadas ({rel_x}, {rel_y})")
-            else:
-                # Usar imagem original sem círculo
-                imagem_para_salvar = screenshot
-                print(f"✅ Captura sem círculo nas coordenadas ({rel_x}, {rel_y})")
-            
-            # Gerar nome único para o arquivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"evidencia_{self.metadata['proximo_id']:04d}_{timestamp}.png"
-            filepath = os.path.join(self.evidence_dir, filename)
-            
-            # Salvar a imagem (com ou sem círculo) - SEM TIMESTAMP
-            imagem_para_salvar.save(filepath, "PNG")
-            
-            # 🔥 ADICIONAR METADADOS DA EVIDÊNCIA (incluindo a opção de clique)
-            evidencia_meta = {
-                "id": self.metadata['proximo_id'],
-                "arquivo": filename,
-                "timestamp": timestamp,
-                "coordenadas": {"x": x, "y": y},
-                "coordenadas_relativas": {"x": rel_x, "y": rel_y},
-                "metodo_captura": metodo_utilizado,
-                "modo_captura": self.modo_captura,
-                "evidenciar_clique": self.evidenciar_clique,  # 🔥 NOVO: Salvar esta preferência
-                "comentario": "",
-                "excluida": False,
-                # 🔥 CORREÇÃO CRÍTICA: TIMESTAMP SÓ NOS METADADOS, NÃO NA IMAGEM
-                "timestamp_texto": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-                "timestamp_cor": "#FFFFFF",
-                "timestamp_tamanho": self.TIMESTAMP_TAMANHO_PADRAO,
-                "timestamp_posicao": {"x": self.TIMESTAMP_POSICAO_PADRAO_X, "y": self.TIMESTAMP_POSICAO_PADRAO_Y},
-                "timestamp_fundo": "#000000B2"
-            }
+            t_clique = time.monotonic()
+            momento = datetime.now()
             
-            # 🔥 CORREÇÃO: NÃO APLICAR TIMESTAMP NA IMAGEM DURANTE A CAPTURA
-            # O timestamp só será aplicado durante a geração do DOCX
+            # 🔥 QUADRO DO BUFFER (tela antes do clique) OU CAPTURA INTELIGENTE (apenas cópia bruta)
+            captura = self._captura_pre_clique(x, y, t_clique)
+            if captura is None:
+                captura = self.capture_inteligente(x, y)
+            frame, (rel_x, rel_y), metodo_utilizado = captura
+            evento = ClickEvent(x, y, t_clique, momento, frame, (rel_x, rel_y), metodo_utilizado)
             
-            # Atualizar metadados
-            self.metadata["evidencias"].append(evidencia_meta)
-            self.metadata["proximo_id"] += 1
-            self._salvar_metadata()
-            
-            # Adicionar à lista de prints
-            self.prints.append(filepath)
-            self.evidencia_count += 1
-            
-            # Atualizar feedback
-            if self.popup and self.popup.winfo_exists():
-                try:
-                    self.current_index = len(self.prints) - 1
-                    self.atualizar_popup()
-                except Exception as e:
-                    print(f"Erro ao atualizar popup: {e}")
-            
-            print(f"✅ Captura {self.evidencia_count} salva: {filename}")
+            if not self.capture_pipeline:
+                self._iniciar_pipeline()
             
+            aceito = self.capture_pipeline.submit(
+                evento, timeout=CAPTURE_SETTINGS.get('capture_queue_timeout', 0.25))
+            if not aceito:
+                print(f"⚠️ Fila de captura cheia - clique em ({x},{y}) descartado")
+                
         except Exception as e:
             print(f"❌ Erro ao capturar tela: {e}")
-            messagebox.showerror("Erro", f"Erro ao capturar tela: {e}")
+            self._na_thread_da_interface(messagebox.showerror, "Erro", f"Erro ao capturar tela: {e}")
+
+    def _processar_captura(self, evento):
+        """
+        Executado no pool: converte, aplica o círculo do clique e grava o PNG - SEM TIMESTAMP.
+        Retorna (caminho provisório, hash perceptual, imagem pendente). Quando a tela
+        repete uma evidência já gravada o PNG não é codificado: o caminho é None e a
+        imagem fica pendente até a confirmação, que só a grava se a repetição não se
+        confirmar (ex.: a evidência repetida foi excluída nesse meio tempo).
+        """
+        screenshot = frame_to_image(evento.frame)
+        
+        # 🔥 NOVO: Hash perceptual da tela (antes do círculo) para detectar repetições
+        assinatura = None
+        if self.supressor_duplicatas:
+            assinatura = self.supressor_duplicatas.hash_de(screenshot)
+            if self.supressor_duplicatas.procurar(assinatura):
+                return None, assinatura, screenshot
+        
+        return self._gravar_provisorio(evento, screenshot), assinatura, None
+
+    def _gravar_provisorio(self, evento, screenshot):
+        """Aplica o círculo do clique (se configurado) e grava o PNG com nome provisório"""
+        rel_x, rel_y = evento.rel
+        
+        # 🔥 MODIFICADO: Aplicar círculo apenas se configurado (e só em capturas de clique)
+        if self.evidenciar_clique and evento.origem == "clique":
+            # Círculo semi-transparente misturado só na área dele (sprite pré-desenhado, sem camada do tamanho da tela)
+            imagem_para_salvar = aplicar_marcador(
+                screenshot, rel_x, rel_y,
+                raio=CAPTURE_SETTINGS.get('click_marker_radius', 40),
+                cor=CAPTURE_SETTINGS.get('click_marker_color', (255, 255, 0, 100))
+            )
+            print(f"✅ Círculo amarelo aplicado nas coordenadas ({rel_x}, {rel_y})")
+        else:
+            # Usar imagem original sem círculo
+            imagem_para_salvar = screenshot
+            print(f"✅ Captura sem círculo nas coordenadas ({rel_x}, {rel_y})")
+        
+        # 🔥 O id só é definido na confirmação (em ordem de clique); grava com nome provisório
+        caminho_provisorio = os.path.join(self.evidence_dir, f".captura_pendente_{evento.seq:06d}.png")
+        imagem_para_salvar.save(caminho_provisorio, "PNG")
+        return caminho_provisorio
+
+    def _registrar_repeticao(self, evento, arquivo, caminho_provisorio):
+        """Captura igual a uma evidência recente: guarda só o clique nos metadados dela"""
+        if caminho_provisorio and os.path.exists(caminho_provisorio):
+            try:
+                os.remove(caminho_provisorio)
+            except OSError:
+                pass
+        self.supressor_duplicatas.suprimidas += 1
+        if evento.origem == "clique" and arquivo in self.catalog:
+            self.metadata_store.registrar_repeticao(arquivo, {
+                "coordenadas": {"x": evento.x, "y": evento.y},
+                "coordenadas_relativas": {"x": evento.rel[0], "y": evento.rel[1]},
+                "timestamp_texto": evento.momento.strftime("%d/%m/%Y %H:%M:%S")
+            })
+        print(f"♻️ Tela repetida - clique em ({evento.x},{evento.y}) registrado em {arquivo}")
+
+    def _registrar_evidencia(self, evento, resultado):
+        """Confirmação em ordem de clique: define id/nome final e atualiza os metadados"""
+        caminho_provisorio, assinatura, imagem_pendente = resultado
+        rel_x, rel_y = evento.rel
+        
+        # 🔥 NOVO: Repetição confirmada em ordem (inclui evidências gravadas depois do processamento)
+        if self.supressor_duplicatas and assinatura is not None:
+            repetida = self.supressor_duplicatas.procurar(assinatura)
+            if repetida:
+                self._registrar_repeticao(evento, repetida, caminho_provisorio)
+                return
+        
+        # Repetição apontada pelo worker que deixou de existir: grava a captura agora
+        if caminho_provisorio is None:
+            caminho_provisorio = self._gravar_provisorio(evento, imagem_pendente)
+        
+        # Gerar nome único para o arquivo (id sequencial + instante do clique)
+        timestamp = evento.momento.strftime("%Y%m%d_%H%M%S")
+        filename = f"evidencia_{self.metadata['proximo_id']:04d}_{timestamp}.png"
+        filepath = os.path.join(self.evidence_dir, filename)
+        os.replace(caminho_provisorio, filepath)
+        
+        # 🔥 ADICIONAR METADADOS DA EVIDÊNCIA (incluindo a opção de clique)
+        evidencia_meta = {
+            "id": self.metadata['proximo_id'],
+            "arquivo": filename,
+            "timestamp": timestamp,
+            "coordenadas": {"x": evento.x, "y": evento.y},
+            "coordenadas_relativas": {"x": rel_x, "y": rel_y},
+            "metodo_captura": evento.metodo,
+            "modo_captura": self.modo_captura,
+            "regiao_captura": self.regiao_captura,
+            "evidenciar_clique": self.evidenciar_clique and evento.origem == "clique",  # 🔥 NOVO: Salvar esta preferência
+            "origem": evento.origem,  # "clique" ou "intervalo"
+            "comentario": "",
+            "excluida": False,
+            # 🔥 CORREÇÃO CRÍTICA: TIMESTAMP SÓ NOS METADADOS, NÃO NA IMAGEM
+            "timestamp_texto": evento.momento.strftime("%d/%m/%Y %H:%M:%S"),
+            "timestamp_cor": "#FFFFFF",
+            "timestamp_tamanho": self.TIMESTAMP_TAMANHO_PADRAO,
+            "timestamp_posicao": {"x": self.TIMESTAMP_POSICAO_PADRAO_X, "y": self.TIMESTAMP_POSICAO_PADRAO_Y},
+            "timestamp_fundo": "#000000B2"
+        }
+        
+        # 🔥 CORREÇÃO: NÃO APLICAR TIMESTAMP NA IMAGEM DURANTE A CAPTURA
+        # O timestamp só será aplicado durante a geração do DOCX
+        
+        # Atualizar metadados (uma linha no journal, sem reescrever o arquivo inteiro)
+        self.metadata_store.adicionar(evidencia_meta)
+        if self.supressor_duplicatas and assinatura is not None:
+            self.supressor_duplicatas.manter(assinatura, filename)
+        
+        # Adicionar à lista de prints
+        self.prints.append(filepath)
+        self.evidencia_count += 1
+        
+        # Atualizar feedback (na thread do Tk)
+        self._na_thread_da_interface(self._atualizar_popup_ultima_captura)
+        
+        atraso_ms = (time.monotonic() - evento.t_monotonic) * 1000
+        print(f"✅ Captura {self.evidencia_count} salva: {filename} ({atraso_ms:.0f} ms após o clique)")
+
+    def _erro_captura(self, evento, erro):
+        """Erro em uma captura do pipeline: remove o arquivo provisório e avisa o usuário"""
+        if evento.seq is not None and self.evidence_dir:
+            caminho_provisorio = os.path.join(self.evidence_dir, f".captura_pendente_{evento.seq:06d}.png")
+            if os.path.exists(caminho_provisorio):
+                try:
+                    os.remove(caminho_provisorio)
+                except OSError:
+                    pass
+        print(f"❌ Erro ao capturar tela: {erro}")
+        self._na_thread_da_interface(
+            lambda: messagebox.showerror("Erro", f"Erro ao capturar tela: {erro}"))
+
+    def _atualizar_popup_ultima_captura(self):
+        """Mostra a captura mais recente no popup de feedback"""
+        if self.popup and self.popup.winfo_exists():
+            try:
+                self.current_index = len(self.prints) - 1
+                self.atualizar_popup()
+            except Exception as e:
+                print(f"Erro ao atualizar popup: {e}")
 
     def mostrar_janela_feedback(self):
         """Mostra janela de feedback durante a gravação"""
@@ -1494,14 +1927,9 @@ class CaptureModule:
             return
             
         try:
-            # Atualizar metadados
-            evidencia_id = self.metadata["evidencias"][self.current_index]["id"]
-            for evidencia in self.metadata["evidencias"]:
-                if evidencia["id"] == evidencia_id:
-                    evidencia["comentario"] = comentario
-                    break
-                    
-            self._salvar_metadata()
+            # Atualizar metadados (o índice se refere à lista de prints, não aos metadados)
+            nome_arquivo = os.path.basename(self.prints[self.current_index])
+            self.metadata_store.comentar(nome_arquivo, comentario)
             
             # Limpar campo
             self.comment_entry.delete(0, tk.END)
@@ -1632,95 +2060,7 @@ class CaptureModule:
             
             # 🔥 CORREÇÃO: APLICAR TIMESTAMP DINAMICAMENTE APENAS NA EXIBIÇÃO (não salva na imagem)
             if evidencia_meta and evidencia_meta.get("timestamp_texto") and self.modo_captura == "ocultar":
-                draw = ImageDraw.Draw(img)
-                
-                # Calcular posição em pixels
-                img_width, img_height = img.size
-                pos_x_percent = evidencia_meta["timestamp_posicao"]["x"]
-                pos_y_percent = evidencia_meta["timestamp_posicao"]["y"]
-                
-                # Configurações do texto
-                texto = evidencia_meta["timestamp_texto"]
-                texto_cor = evidencia_meta["timestamp_cor"]
-                fundo_cor = evidencia_meta.get("timestamp_fundo", "#000000B2")
-                tamanho = evidencia_meta.get("timestamp_tamanho", self.TIMESTAMP_TAMANHO_PADRAO)
-                
-                # Usar fonte
-                try:
-                    font = ImageFont.truetype("arial.ttf", tamanho)
-                except:
-                    font = ImageFont.load_default()
-                
-                # 🔥 CALCULAR TAMANHO DO TEXTO PARA CENTRALIZAR (mesma lógica do gravador)
-                bbox = draw.textbbox((0, 0), texto, font=font)
-                texto_largura = bbox[2] - bbox[0]
-                texto_altura = bbox[3] - bbox[1]
-                
-                # 🔥 DEFINIR PADDING E CANTOS ARREDONDADOS
-                padding_horizontal = 20
-                padding_vertical = 12
-                borda_radius = 8
-                
-                # 🔥 CALCULAR POSIÇÃO FINAL DO FUNDO (centralizado)
-                fundo_largura = texto_largura + (padding_horizontal * 2)
-                fundo_altura = texto_altura + (padding_vertical * 2)
-                
-                # Calcular coordenadas do fundo baseado na posição percentual
-                fundo_x1 = int((img_width * pos_x_percent) - (fundo_largura / 2))
-                fundo_y1 = int((img_height * pos_y_percent) - (fundo_altura / 2))
-                fundo_x2 = fundo_x1 + fundo_largura
-                fundo_y2 = fundo_y1 + fundo_altura
-                
-                # 🔥 GARANTIR que o fundo não saia dos limites da imagem
-                margem = 10
-                if fundo_x1 < margem:
-                    fundo_x1 = margem
-                    fundo_x2 = fundo_x1 + fundo_largura
-                elif fundo_x2 > img_width - margem:
-                    fundo_x2 = img_width - margem
-                    fundo_x1 = fundo_x2 - fundo_largura
-                    
-                if fundo_y1 < margem:
-                    fundo_y1 = margem
-                    fundo_y2 = fundo_y1 + fundo_altura
-                elif fundo_y2 > img_height - margem:
-                    fundo_y2 = img_height - margem
-                    fundo_y1 = fundo_y2 - fundo_altura
-                
-                # 🔥 CORREÇÃO CRÍTICA: Calcular posição vertical do texto
-                bbox = draw.textbbox((0, 0), texto, font=font)
-                texto_ascendente = -bbox[1]
-                texto_largura = bbox[2] - bbox[0]
-                texto_altura_total = bbox[3] - bbox[1]
-
-                # 🔥 CALCULAR POSIÇÃO DO TEXTO (verdadeiramente centralizado)
-                texto_x = fundo_x1 + padding_horizontal
-                texto_y = fundo_y1 + (fundo_altura - texto_altura_total) // 2 + texto_ascendente
-                
-                # 🔥 DESENHAR FUNDO COM CANTOS ARREDONDADOS
-                mask = Image.new("L", (fundo_largura, fundo_altura), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.rounded_rectangle(
-                    [0, 0, fundo_largura, fundo_altura],
-                    radius=borda_radius,
-                    fill=255
-                )
-                
-                # Aplicar fundo semi-transparente
-                if fundo_cor.startswith("#") and len(fundo_cor) == 9:
-                    r = int(fundo_cor[1:3], 16)
-                    g = int(fundo_cor[3:5], 16)
-                    b = int(fundo_cor[5:7], 16)
-                    a = int(fundo_cor[7:9], 16)
-                    fundo_rgba = (r, g, b, a)
-                else:
-                    fundo_rgba = (0, 0, 0, 178)
-
-                fundo_img = Image.new("RGBA", (fundo_largura, fundo_altura), fundo_rgba)
-                img.paste(fundo_img, (fundo_x1, fundo_y1), mask)
-
-                # 🔥 DESENHAR TEXTO BRANCO CENTRALIZADO
-                draw.text((texto_x, texto_y), texto, fill=texto_cor, font=font)
+                desenhar_timestamp(img, evidencia_meta, self.TIMESTAMP_TAMANHO_PADRAO)
             
             # Obter o tamanho da área disponível para a imagem
             self.popup.update()
@@ -1745,17 +2085,11 @@ class CaptureModule:
 
     def obter_comentario(self, nome_arquivo):
         """Obtém o comentário salvo nos metadados"""
-        for evidencia in self.metadata["evidencias"]:
-            if evidencia["arquivo"] == nome_arquivo:
-                return evidencia.get("comentario", "")
-        return ""
+        return self.catalog.comentario(nome_arquivo)
 
     def obter_metadados_evidencia(self, nome_arquivo):
         """Obtém os metadados completos da evidência - similar ao gravador_evidencias.py"""
-        for evidencia in self.metadata["evidencias"]:
-            if evidencia["arquivo"] == nome_arquivo:
-                return evidencia
-        return None
+        return self.catalog.por_arquivo(nome_arquivo)
 
     def salvar_comentario(self):
         """Salva o comentário da evidência atual"""
@@ -1766,13 +2100,9 @@ class CaptureModule:
         nome_arquivo = os.path.basename(caminho_print)
         comentario = self.comment_entry.get()
         
-        # Atualiza metadados
-        for evidencia in self.metadata["evidencias"]:
-            if evidencia["arquivo"] == nome_arquivo:
-                evidencia["comentario"] = comentario
-                break
-                
-        self._salvar_metadata()        
+        # Atualiza metadados (só grava se o comentário mudou)
+        if self.metadata_store:
+            self.metadata_store.comentar(nome_arquivo, comentario)
 
     # Métodos de navegação
     def primeira_evidencia(self):
@@ -1844,12 +2174,9 @@ class CaptureModule:
                 os.remove(caminho_print)
                 
                 # Marca como excluída nos metadados
-                for evidencia in self.metadata["evidencias"]:
-                    if evidencia["arquivo"] == nome_arquivo:
-                        evidencia["excluida"] = True
-                        break
-                
-                self._salvar_metadata()
+                self.metadata_store.excluir(nome_arquivo)
+                if self.supressor_duplicatas:
+                    self.supressor_duplicatas.esquecer(nome_arquivo)
                 
                 # Recarrega a lista de evidências
                 self.recarregar_evidencias()
@@ -1873,16 +2200,92 @@ class CaptureModule:
         """Processa todas as evidências e gera o DOCX"""
         self.salvar_comentario()  # Salva automaticamente antes de navegar
         
-        # Gerar documento
-        try:
-            doc_path = self.gerar_documento()
+        # Gerar documento em segundo plano, com progresso e opção de cancelar
+        self._gerar_documento_com_progresso(self._documento_gerado)
+
+    def _gerar_documento_com_progresso(self, ao_concluir):
+        """Executa gerar_documento fora da thread do Tk, exibindo uma janela de progresso"""
+        parent = self.popup if self.popup and self.popup.winfo_exists() else self.root
+        janela = tk.Toplevel(parent)
+        janela.title("Gerando documento")
+        janela.geometry("420x140")
+        janela.resizable(False, False)
+        janela.transient(parent)
+        janela.grab_set()
+        self._apply_style_to_window(janela)
+        
+        status = tk.Label(janela, text="Preparando imagens...", font=("Arial", 10))
+        status.pack(pady=(15, 5))
+        barra = ttk.Progressbar(janela, mode='determinate', length=360, maximum=max(1, len(self.prints)))
+        barra.pack(pady=5)
+        
+        cancelamento = threading.Event()
+        
+        def cancelar():
+            cancelamento.set()
+            status.config(text="Cancelando...")
+            btn_cancelar.config(state=tk.DISABLED)
+        
+        btn_cancelar = tk.Button(janela, text="Cancelar", command=cancelar, width=12)
+        btn_cancelar.pack(pady=8)
+        janela.protocol("WM_DELETE_WINDOW", cancelar)
+        
+        mensagens = queue.Queue()
+        
+        def executar():
+            try:
+                doc_path = self.gerar_documento(
+                    progresso=lambda feitas, total: mensagens.put(("progresso", feitas, total)),
+                    cancelado=cancelamento.is_set)
+                mensagens.put(("ok", doc_path))
+            except GeracaoCancelada:
+                mensagens.put(("cancelado",))
+            except Exception as e:
+                mensagens.put(("erro", e))
+        
+        def acompanhar():
+            try:
+                while True:
+                    mensagem = mensagens.get_nowait()
+                    if mensagem[0] == "progresso":
+                        _, feitas, total = mensagem
+                        barra.config(maximum=total, value=feitas)
+                        if not cancelamento.is_set():
+                            status.config(text=f"Evidência {feitas} de {total}")
+                        continue
+                    janela.grab_release()
+                    janela.destroy()
+                    ao_concluir(*mensagem)
+                    return
+            except queue.Empty:
+                pass
+            janela.after(100, acompanhar)
+        
+        threading.Thread(target=executar, name="gerar-documento", daemon=True).start()
+        janela.after(100, acompanhar)
+
+    def _documento_gerado(self, resultado, valor=None):
+        """Resultado da geração em segundo plano (executado na thread do Tk)"""
+        if resultado == "cancelado":
+            messagebox.showinfo("Cancelado", "Geração do documento cancelada.", parent=self.popup)
+            return
+        
+        if resultado == "erro":
+            messagebox.showerror("Erro", f"Erro ao gerar documento: {valor}", parent=self.popup)
+        else:
+            doc_path = valor
             
             # 🔥 ADICIONADO: ABRIR PASTA APÓS GERAR DOCUMENTO
             pasta_para_abrir = os.path.dirname(doc_path)
             
+            tamanhos = ""
+            if self.relatorio_imagens:
+                antes, depois = self.relatorio_imagens
+                tamanhos = f"\n\nImagens: {formatar_tamanho(antes)} → {formatar_tamanho(depois)}"
+            
             resposta = messagebox.askyesno(
                 "Sucesso", 
-                f"Documento gerado com sucesso em:\n{doc_path}\n\nDeseja abrir a pasta onde o documento foi salvo?",
+                f"Documento gerado com sucesso em:\n{doc_path}{tamanhos}\n\nDeseja abrir a pasta onde o documento foi salvo?",
                 parent=self.popup
             )
             
@@ -1893,9 +2296,6 @@ class CaptureModule:
                         f"Pasta do documento:\n{pasta_para_abrir}",
                         parent=self.popup
                     )
-                    
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao gerar documento: {e}", parent=self.popup)
         
         # Fechar janela de navegação
         if self.popup and self.popup.winfo_exists():
@@ -2499,13 +2899,7 @@ class CaptureModule:
                 
                 # 🔥 CORREÇÃO: ATUALIZAR POSIÇÃO DO TIMESTAMP NOS METADADOS (APENAS SE MODO OCULTAR)
                 if self.modo_captura == "ocultar":
-                    for evidencia in self.metadata["evidencias"]:
-                        if evidencia["arquivo"] == nome_arquivo:
-                            evidencia["timestamp_posicao"]["x"] = self.timestamp_pos[0]
-                            evidencia["timestamp_posicao"]["y"] = self.timestamp_pos[1]
-                            break
-                    
-                    self._salvar_metadata()
+                    self.metadata_store.mover_timestamp(nome_arquivo, self.timestamp_pos[0], self.timestamp_pos[1])
                 
                 # 🔥 CORREÇÃO ADICIONAL: Forçar atualização da exibição principal
                 messagebox.showinfo("Edição", "Evidência atualizada com sucesso!")
@@ -2576,110 +2970,40 @@ class CaptureModule:
         
         self.canvas.create_polygon(x2, y2, x3, y3, x4, y4, fill=color, outline=color)
 
-    def gerar_documento(self):
-        """Gera o documento DOCX com as evidências e retorna o caminho do documento"""
+    def _evidencia_com_timestamp(self, nome_arquivo):
+        """Metadados da evidência cujo timestamp vai na imagem do DOCX (apenas no modo ocultar)"""
+        evidencia = self.catalog.por_arquivo(nome_arquivo)
+        if self.modo_captura == "ocultar" and evidencia and evidencia.get("timestamp_texto"):
+            return evidencia
+        return None
+
+    def gerar_documento(self, progresso=None, cancelado=None):
+        """
+        Gera o documento DOCX com as evidências e retorna o caminho do documento.
+        As imagens são preparadas em paralelo (pool de processos) e entram no
+        documento na ordem das evidências; ``progresso(feitas, total)`` e
+        ``cancelado()`` permitem acompanhar e interromper a geração.
+        """
         doc_path = None
+        builder = None
         try:
             print("🔄 Iniciando geração do documento DOCX...")
             
             # 🔥 CORREÇÃO: Criar novo documento em vez de reutilizar o existente
-            if self.template_path and os.path.exists(self.template_path):
-                self.doc = Document(self.template_path)
-                self.using_template = True
-                print(f"✅ Template carregado: {self.template_path}")
-            else:
-                self.doc = Document()
-                self.using_template = False
-                print("ℹ️ Criando documento vazio (sem template)")
-            
-            # Adicionar título se não estiver usando template
-            if not self.using_template:
-                titulo = self.doc.add_heading('Evidências Capturadas', 0)
-                titulo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            
-            # Adicionar data e hora
-            if not self.using_template:
-                data_hora = self.doc.add_paragraph()
-                data_hora.add_run(f"Data e hora da geração: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}").italic = True
-                data_hora.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            
-            # 🔥 CORREÇÃO CRÍTICA: APLICAR TIMESTAMP APENAS NA GERAÇÃO DO DOCX (igual ao gravador_evidencias.py)
-            if self.modo_captura == "ocultar":
-                print("🕒 Aplicando timestamp nas evidências para o documento...")
-                for caminho_print in self.prints:
-                    nome_arquivo = os.path.basename(caminho_print)
-                    # Encontrar os metadados da evidência
-                    for evidencia in self.metadata["evidencias"]:
-                        if evidencia["arquivo"] == nome_arquivo and evidencia["timestamp_texto"]:
-                            # Aplicar timestamp apenas na cópia temporária para o DOCX
-                            self.aplicar_timestamp_moderno(caminho_print, evidencia)
-                            break
-            
-            # Adicionar evidências
-            for i, print_path in enumerate(self.prints, 1):
-                print(f"📷 Adicionando evidência {i}: {print_path}")
-                
-                # 🔥 CORREÇÃO: Adicionar separador ANTES da primeira evidência
-                if i == 1:
-                    self.doc.add_paragraph("―" * 36).alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                
-                # Adicionar título da evidência
-                self.doc.add_paragraph().add_run(f"Evidência {i}").bold = True
-                
-                # Adicionar comentário se existir
-                nome_arquivo = os.path.basename(print_path)
-                comentario = self.obter_comentario(nome_arquivo)
-                if comentario:
-                    comentario_para = self.doc.add_paragraph()
-                    comentario_para.add_run(f"Comentário: {comentario}").italic = True
-                
-                # Adicionar imagem
-                try:
-                    paragraph = self.doc.add_paragraph()
-                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    run = paragraph.add_run()
-                    
-                    # 🔥 CORREÇÃO: Verificar se o arquivo existe antes de adicionar
-                    if os.path.exists(print_path):
-                        run.add_picture(print_path, width=Inches(6.0))
-                        print(f"✅ Imagem {i} adicionada com sucesso")
-                    else:
-                        print(f"⚠️ Arquivo não encontrado: {print_path}")
-                        self.doc.add_paragraph(f"[Arquivo de imagem não encontrado: {print_path}]")
-                        
-                except Exception as e:
-                    print(f"❌ Erro ao adicionar imagem {print_path}: {e}")
-                    self.doc.add_paragraph(f"[Erro ao carregar imagem: {print_path}]")
-                
-                # 🔥 CORREÇÃO: Adicionar separador DEPOIS de CADA evidência
-                self.doc.add_paragraph("―" * 36).alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-             
-            # 🔥 CORREÇÃO: USAR NOME DO TEMPLATE PARA O DOCUMENTO
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # Obter nome do template sem extensão
-            template_filename = os.path.basename(self.template_path)
-            template_name = os.path.splitext(template_filename)[0]
-            
-            # 🔥 CORREÇÃO: LIMPAR NOME DO TEMPLATE PARA EVITAR PROBLEMAS NO WINDOWS
-            template_name = self._limpar_nome_arquivo(template_name)
-            
-            # Criar nome do documento usando o nome do template
-            doc_filename = f"{template_name}_{timestamp}.docx"
-            doc_path = os.path.join(self.output_dir, doc_filename)
-            
-            # 🔥 CORREÇÃO: Verificar se o diretório existe antes de salvar
-            os.makedirs(os.path.dirname(doc_path), exist_ok=True)
-            
-            # 🔥 CORREÇÃO ADICIONAL: VERIFICAR SE O CAMINHO É VÁLIDO
-            if len(doc_path) > 255:
-                # Se o caminho for muito longo, criar um nome mais curto
-                short_name = f"Evidencias_{timestamp}.docx"
-                doc_path = os.path.join(self.output_dir, short_name)
-                print(f"⚠️ Caminho muito longo, usando nome reduzido: {short_name}")
-            
-            self.doc.save(doc_path)
-            print(f"✅ Documento salvo em: {doc_path}")
+            builder = EvidenceDocumentBuilder(
+                self.template_path, DOCUMENT_SETTINGS.get('image_width_inches', 6.0),
+                streaming=DOCUMENT_SETTINGS.get('streaming_writer', True))
+            self.doc = builder.doc
+            self.using_template = builder.using_template
+            
+            # 🔥 MESMA GERAÇÃO DO MÓDULO DE DOCUMENTOS; o timestamp (modo ocultar) é desenhado
+            # numa cópia no cache de imagens, a captura original nunca é alterada
+            doc_path, self.relatorio_imagens = gerar_documento_evidencias(
+                builder, self.prints, self.output_dir, self.evidence_dir, self.obter_comentario,
+                DOCUMENT_SETTINGS, progresso, cancelado,
+                timestamp_de=self._evidencia_com_timestamp,
+                tamanho_timestamp=self.TIMESTAMP_TAMANHO_PADRAO)
+            doc_filename = os.path.basename(doc_path)
             
             # 🔥 EXCLUSÃO CONDICIONAL DAS EVIDÊNCIAS E PASTA AUTOMÁTICA
             if not self.manter_evidencias:
@@ -2692,11 +3016,18 @@ class CaptureModule:
                     except Exception as e:
                         print(f"⚠️ Erro ao excluir {print_path}: {e}")
                 
-                # Também excluir o arquivo de metadados
+                # Cache de imagens preparadas
+                cache_dir = os.path.join(self.evidence_dir, PASTA_CACHE)
+                if os.path.isdir(cache_dir):
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    print(f"🗑️ Excluído: {cache_dir}")
+                
+                # Também excluir o arquivo de metadados (snapshot e journal)
                 try:
-                    if self.metadata_path and os.path.exists(self.metadata_path):
-                        os.remove(self.metadata_path)
-                        print(f"🗑️ Excluído: {self.metadata_path}")
+                    if self.metadata_store:
+                        for caminho in self.metadata_store.remover_arquivos():
+                            print(f"🗑️ Excluído: {caminho}")
+                        self.metadata_store = None
                 except Exception as e:
                     print(f"⚠️ Erro ao excluir metadados: {e}")
                 
@@ -2734,12 +3065,19 @@ class CaptureModule:
             print(f"✅ Documento gerado com sucesso: {doc_path}")
             return doc_path
             
+        except GeracaoCancelada:
+            print("⏹️ Geração do documento cancelada")
+            raise
         except Exception as e:
             print(f"❌ Erro ao gerar documento: {e}")
             # 🔥 CORREÇÃO: Mostrar detalhes do erro
             import traceback
             traceback.print_exc()
             raise
+        finally:
+            # Remove o DOCX parcial se a gravação em fluxo não chegou ao fim
+            if builder:
+                builder.descartar()
 
     def close(self):
         """Fecha o módulo de forma segura"""
@@ -2755,6 +3093,15 @@ class CaptureModule:
                 except:
                     pass
                 self.listener_mouse = None
+            
+            # Encerrar pipeline de captura
+            try:
+                self._parar_captura_intervalo()
+                self._parar_pipeline()
+            except Exception:
+                pass
+            self._fechar_grabber()
+            self._fechar_metadata()
                 
             if hasattr(self, 'listener_keyboard') and self.listener_keyboard:
                 try:
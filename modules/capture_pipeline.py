@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+
+from PIL import Image
+
+
+class RawFrame:
+    """Quadro bruto (BGRA) copiado do backend de captura, ainda sem conversão"""
+
+    __slots__ = ("size", "bgra")
+
+    def __init__(self, size, bgra):
+        self.size = size
+        self.bgra = bgra
+
+    @classmethod
+    def from_mss(cls, screenshot):
+        """Cria o quadro a partir de um ScreenShot do mss (apenas cópia do buffer)"""
+        return cls(screenshot.size, screenshot.bgra)
+
+    def recortar(self, left, top, right, bottom):
+        """Novo quadro com o retângulo (coordenadas do quadro), copiando só essas linhas"""
+        largura = self.size[0]
+        inicio, fim = left * 4, right * 4
+        linhas = [self.bgra[(y * largura * 4) + inicio:(y * largura * 4) + fim] for y in range(top, bottom)]
+        return RawFrame((right - left, bottom - top), b"".join(linhas))
+
+    def to_image(self):
+        """Converte o buffer BGRA em imagem RGB do PIL"""
+        return Image.frombytes("RGB", self.size, self.bgra, "raw", "BGRX")
+
+
+def frame_to_image(frame):
+    """Aceita RawFrame ou imagem PIL e devolve sempre uma imagem PIL"""
+    if isinstance(frame, RawFrame):
+        return frame.to_image()
+    return frame
+
+
+class ClickEvent:
+    """
+    Clique registrado pelo listener: coordenadas, instante e pixels brutos.
+    Capturas por intervalo usam o mesmo evento com ``origem="intervalo"``
+    (coordenadas = posição do cursor).
+    """
+
+    __slots__ = ("seq", "x", "y", "t_monotonic", "momento", "frame",
+                 "rel", "metodo", "origem")
+
+    def __init__(self, x, y, t_monotonic, momento, frame, rel, metodo, origem="clique"):
+        self.seq = None  # Definido pelo pipeline ao aceitar o evento
+        self.x = x
+        self.y = y
+        self.t_monotonic = t_monotonic
+        self.momento = momento
+        self.frame = frame
+        self.rel = rel
+        self.metodo = metodo
+        self.origem = origem
+
+
+class CapturePipeline:
+    """
+    Pipeline produtor/consumidor de capturas.
+
+    O listener apenas registra o clique (``submit``); um pool limitado de
+    threads executa ``process`` (composição, codificação e gravação) e
+    ``commit`` é chamado estritamente na ordem dos cliques, garantindo que os
+    ids das evidências sigam a ordem real de captura.
+    """
+
+    _SENTINELA = object()
+
+    def __init__(self, process, commit, workers=2, queue_depth=8, on_error=None):
+        self._process = process
+        self._commit = commit
+        self._on_error = on_error
+        self._workers = max(1, int(workers))
+        self._fila = queue.Queue(maxsize=max(1, int(queue_depth)))
+        self._threads = []
+        self._encerrar = threading.Event()
+
+        self._lock_submit = threading.Lock()
+        self._proximo_seq = 0
+
+        # Buffer de reordenação: seq -> (evento, resultado, erro)
+        self._cond = threading.Condition()
+        self._concluidos = {}
+        self._proximo_commit = 0
+
+        self.descartados = 0
+
+    @property
+    def em_execucao(self):
+        return bool(self._threads)
+
+    @property
+    def pendentes(self):
+        """Quantidade de eventos aceitos e ainda não confirmados"""
+        with self._cond:
+            return self._proximo_seq - self._proximo_commit
+
+    def start(self):
+        """Inicia as threads consumidoras"""
+        if self._threads:
+            return
+        self._encerrar.clear()
+        for i in range(self._workers):
+            t = threading.Thread(target=self._worker_loop, name=f"captura-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, evento, timeout=None):
+        """
+        Enfileira um evento. Com a fila cheia, bloqueia até ``timeout``
+        segundos (backpressure) e descarta o evento se não houver espaço.
+        Retorna True se o evento foi aceito.
+        """
+        with self._lock_submit:
+            evento.seq = self._proximo_seq
+            try:
+                self._fila.put(evento, timeout=timeout)
+            except queue.Full:
+                evento.seq = None
+                self.descartados += 1
+                return False
+            with self._cond:
+                self._proximo_seq += 1
+        return True
+
+    def drain(self, timeout=None):
+        """Aguarda até que todos os eventos aceitos tenham sido confirmados"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._proximo_commit < self._proximo_seq:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._cond.wait(restante)
+        return True
+
+    def stop(self, timeout=None):
+        """Processa o que já foi aceito e encerra as threads"""
+        if not self._threads:
+            return True
+        concluido = self.drain(timeout)
+        self._encerrar.set()
+        for _ in self._threads:
+            try:
+                self._fila.put_nowait(self._SENTINELA)
+            except queue.Full:
+                break  # Fila ainda cheia: os workers saem pelo evento ao esvaziá-la
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        return concluido
+
+    def _worker_loop(self):
+        while True:
+            try:
+                evento = self._fila.get(timeout=0.5)
+            except queue.Empty:
+                if self._encerrar.is_set():
+                    break
+                continue
+            if evento is self._SENTINELA:
+                break
+            resultado, erro = None, None
+            try:
+                resultado = self._process(evento)
+            except Exception as e:
+                erro = e
+            finally:
+                # Libera o quadro bruto o quanto antes
+                evento.frame = None
+            self._concluir(evento, resultado, erro)
+
+    def _concluir(self, evento, resultado, erro):
+        with self._cond:
+            self._concluidos[evento.seq] = (evento, resultado, erro)
+            # Confirma em ordem tudo o que já estiver disponível
+            while self._proximo_commit in self._concluidos:
+                ev, res, err = self._concluidos.pop(self._proximo_commit)
+                try:
+                    if err is None:
+                        self._commit(ev, res)
+                    elif self._on_error:
+                        self._on_error(ev, err)
+                except Exception as e:
+                    if self._on_error:
+                        self._on_error(ev, e)
+                self._proximo_commit += 1
+            self._cond.notify_all()
@@ -0,0 +1,203 @@
+"""
+Modo de linha de comando (sem interface gráfica) do PrintF.
+
+    python -m printf templates --csv casos.csv --template modelo.docx --field projeto=X ...
+    python -m printf evidence --dir pasta_evidencias [--template modelo.docx]
+
+Nada aqui importa Tk: usa o mesmo código de processamento da interface.
+Os logs vão para stderr e o resumo (JSON, com tempos) para stdout.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from config import APP_CONFIG
+    DOCUMENT_SETTINGS = APP_CONFIG.DOCUMENT_SETTINGS
+    TEMPLATE_SETTINGS = getattr(APP_CONFIG, 'TEMPLATE_SETTINGS', {})
+except ImportError:
+    DOCUMENT_SETTINGS = {}
+    TEMPLATE_SETTINGS = {}
+
+try:
+    from modules.template_batch import ConfigManager, executar_lote
+    from modules.csv_store import TAMANHO_BLOCO, DUPLICADOS_VALIDOS, coluna_de_nome, colunas_csv
+    from modules.evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from modules.evidence_catalog import EvidenceCatalog
+    from modules.metadata_store import MetadataStore, FORMATOS_IMAGEM, metadata_da_listagem
+except ImportError:
+    from template_batch import ConfigManager, executar_lote
+    from csv_store import TAMANHO_BLOCO, DUPLICADOS_VALIDOS, coluna_de_nome, colunas_csv
+    from evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from evidence_catalog import EvidenceCatalog
+    from metadata_store import MetadataStore, FORMATOS_IMAGEM, metadata_da_listagem
+
+
+def _log(mensagem):
+    print(mensagem, file=sys.stderr, flush=True)
+
+
+def _campos_fixos(parser, pares, campos_config):
+    """Converte ``--field chave=valor`` e exige todos os campos da configuração (como a interface)"""
+    dados = {}
+    for par in pares or []:
+        chave, separador, valor = par.partition('=')
+        if not separador:
+            parser.error(f"--field espera chave=valor, recebido: {par}")
+        dados[chave.strip()] = valor.strip()
+    faltando = [campo['key'] for campo in campos_config if not dados.get(campo['key'])]
+    if faltando:
+        parser.error(f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+    return dados
+
+
+def comando_templates(args, parser):
+    inicio = time.perf_counter()
+    campos_config = ConfigManager(args.fields_config).load_config()
+    dados_fixos = _campos_fixos(parser, args.field, campos_config)
+
+    if not Path(args.csv).exists():
+        parser.error(f"Arquivo CSV não encontrado: {args.csv}")
+
+    template_path = args.template or ""
+    use_default_template = not (template_path and Path(template_path).exists())
+    if template_path and use_default_template:
+        _log(f"⚠️ Template não encontrado ({template_path}), usando template padrão")
+
+    output_folder = args.output
+    if not output_folder:
+        output_folder = f"evidencias_{Path(template_path).stem}" if template_path else 'evidencias_geradas'
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+
+    colunas = []
+    if args.all_columns or args.columns:
+        disponiveis = colunas_csv(args.csv)
+        nome = coluna_de_nome(disponiveis)
+        if args.all_columns:
+            colunas = [coluna for coluna in disponiveis if coluna != nome]
+        else:
+            colunas = [coluna.strip() for coluna in args.columns.split(',') if coluna.strip()]
+
+    resumo = executar_lote(
+        args.csv, dados_fixos, template_path, output_folder, use_default_template,
+        campos_config, colunas,
+        duplicados=args.duplicates or TEMPLATE_SETTINGS.get('csv_duplicates', 'first'),
+        workers=args.workers or TEMPLATE_SETTINGS.get('batch_workers'),
+        tamanho_bloco=TEMPLATE_SETTINGS.get('csv_chunk_rows', TAMANHO_BLOCO),
+        retomar=not (args.no_resume or args.rewrite_all) and TEMPLATE_SETTINGS.get('resume_batches', True),
+        placeholders=TEMPLATE_SETTINGS.get('placeholders'),
+        pular_inalterados=not args.rewrite_all and TEMPLATE_SETTINGS.get('skip_unchanged', True),
+        arquivo_zip=args.zip or TEMPLATE_SETTINGS.get('archive_output', False),
+        documentos_por_zip=args.zip_size or TEMPLATE_SETTINGS.get('archive_documents_per_zip'),
+        log=_log)
+
+    saida = {"comando": "templates", "pasta": str(Path(output_folder).absolute()),
+             "template": template_path if not use_default_template else None,
+             "colunas": colunas, "workers": args.workers or os.cpu_count()}
+    saida.update(resumo.como_dict())
+    saida["segundos_total"] = round(time.perf_counter() - inicio, 3)
+    return saida, 1 if resumo.erros else 0
+
+
+def comando_evidence(args, parser):
+    inicio = time.perf_counter()
+    dir_path = args.dir
+    if not os.path.isdir(dir_path):
+        parser.error(f"Pasta de evidências não encontrada: {dir_path}")
+
+    # Mesma leitura de metadados da interface, sem alterar snapshot/journal
+    # (a pasta pode estar aberta na interface)
+    store = MetadataStore(dir_path)
+    existe_metadata = os.path.exists(store.snapshot_path) or os.path.exists(store.journal_path)
+    if existe_metadata:
+        store.carregar()
+        catalog = store.catalog
+    else:
+        catalog = EvidenceCatalog(metadata_da_listagem(dir_path)["evidencias"])
+    store.fechar(compactar=False)
+    catalog.verificar_arquivos(dir_path)
+    prints = catalog.caminhos_ativos(dir_path, FORMATOS_IMAGEM)
+    t_leitura = time.perf_counter() - inicio
+
+    configuracao = dict(DOCUMENT_SETTINGS)
+    if args.workers:
+        configuracao['image_workers'] = args.workers
+
+    # Imagens preparadas em --cache-dir ou numa pasta temporária (nada criado na pasta das evidências)
+    cache_temporario = None if args.cache_dir else tempfile.TemporaryDirectory(prefix="printf_cache_")
+    cache_dir = args.cache_dir or cache_temporario.name
+
+    builder = EvidenceDocumentBuilder(args.template, configuracao.get('image_width_inches', 6.0),
+                                      streaming=configuracao.get('streaming_writer', True))
+    try:
+        doc_path, (bytes_origem, bytes_final) = gerar_documento_evidencias(
+            builder, prints, args.output or dir_path, dir_path, catalog.comentario, configuracao,
+            cache_dir=cache_dir)
+    finally:
+        builder.descartar()
+        if cache_temporario:
+            cache_temporario.cleanup()
+
+    total = time.perf_counter() - inicio
+    return {
+        "comando": "evidence",
+        "documento": os.path.abspath(doc_path),
+        "evidencias": len(prints),
+        "bytes_origem": bytes_origem,
+        "bytes_final": bytes_final,
+        "workers": configuracao.get('image_workers') or os.cpu_count(),
+        "segundos_leitura": round(t_leitura, 3),
+        "segundos_geracao": round(total - t_leitura, 3),
+        "segundos_total": round(total, 3),
+    }, 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="printf", description="PrintF em modo linha de comando (sem interface)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    templates = subparsers.add_parser("templates", help="CSV + template -> um documento por caso de teste")
+    templates.add_argument("--csv", required=True, help="Arquivo CSV ou planilha .xlsx com os casos de teste")
+    templates.add_argument("--template", help="Template DOCX (sem template: documento padrão)")
+    templates.add_argument("--output", help="Pasta de saída (padrão: evidencias_<template>)")
+    templates.add_argument("--field", action="append", metavar="CHAVE=VALOR",
+                           help="Valor de um campo fixo (repetir para cada campo)")
+    templates.add_argument("--fields-config", default="config_campos.json",
+                           help="Configuração dos campos fixos (padrão: config_campos.json)")
+    colunas = templates.add_mutually_exclusive_group()
+    colunas.add_argument("--columns", help="Colunas do CSV incluídas na tabela, separadas por vírgula")
+    colunas.add_argument("--all-columns", action="store_true", help="Incluir todas as colunas do CSV")
+    templates.add_argument("--duplicates", choices=DUPLICADOS_VALIDOS, help="Tratamento de nomes repetidos")
+    templates.add_argument("--no-resume", action="store_true", help="Ignorar o manifesto e gerar tudo de novo")
+    templates.add_argument("--rewrite-all", action="store_true",
+                           help="Regravar todos os documentos (sem manifesto nem comparação de conteúdo)")
+    templates.add_argument("--zip", action="store_true",
+                           help="Gravar os documentos em .zip com índice (sem um .docx por caso na pasta)")
+    templates.add_argument("--zip-size", type=int, metavar="N", help="Dividir em vários .zip de N documentos")
+    templates.add_argument("--workers", type=int, help="Processos em paralelo (padrão: todos os núcleos)")
+    templates.set_defaults(executar=comando_templates)
+
+    evidence = subparsers.add_parser("evidence", help="Pasta de evidências -> um documento DOCX")
+    evidence.add_argument("--dir", required=True, help="Pasta com as evidências")
+    evidence.add_argument("--template", help="Template DOCX")
+    evidence.add_argument("--output", help="Pasta de saída (padrão: a pasta das evidências)")
+    evidence.add_argument("--workers", type=int, help="Processos na preparação das imagens")
+    evidence.add_argument("--cache-dir", help="Pasta do cache de imagens preparadas "
+                                              "(padrão: pasta temporária descartada ao final)")
+    evidence.set_defaults(executar=comando_evidence)
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    # Os módulos de processamento usam print(); no modo CLI isso vai para stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        resumo, codigo = args.executar(args, parser)
+    print(json.dumps(resumo, ensure_ascii=False, indent=2))
+    return codigo
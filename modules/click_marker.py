@@ -0,0 +1,40 @@
+import functools
+
+from PIL import Image, ImageDraw
+
+
+@functools.lru_cache(maxsize=16)
+def sprite_marcador(raio, cor):
+    """Círculo do clique já desenhado (RGBA, fundo transparente), um por raio e cor"""
+    tamanho = 2 * raio + 1
+    sprite = Image.new("RGBA", (tamanho, tamanho), (255, 255, 255, 0))
+    ImageDraw.Draw(sprite).ellipse((0, 0, 2 * raio, 2 * raio), fill=cor)
+    return sprite
+
+
+def aplicar_marcador(imagem, x, y, raio=40, cor=(255, 255, 0, 100)):
+    """
+    Mistura o círculo do clique centrado em (x, y) na própria imagem RGB.
+
+    Só o retângulo do círculo é convertido e composto; o custo não depende da
+    resolução da tela. O resultado é o mesmo de compor uma camada transparente
+    do tamanho da imagem inteira. Retorna a imagem (convertida para RGB se
+    necessário).
+    """
+    if imagem.mode != "RGB":
+        imagem = imagem.convert("RGB")
+    cor = tuple(cor)
+    if len(cor) == 3:
+        cor += (255,)
+    sprite = sprite_marcador(int(raio), cor)
+
+    left, top = x - raio, y - raio
+    caixa = (max(left, 0), max(top, 0),
+             min(left + sprite.width, imagem.width), min(top + sprite.height, imagem.height))
+    if caixa[2] <= caixa[0] or caixa[3] <= caixa[1]:
+        return imagem  # Clique fora da área capturada
+
+    trecho_sprite = sprite.crop((caixa[0] - left, caixa[1] - top, caixa[2] - left, caixa[3] - top))
+    trecho = imagem.crop(caixa).convert("RGBA")
+    imagem.paste(Image.alpha_composite(trecho, trecho_sprite).convert("RGB"), caixa[:2])
+    return imagem
@@ -0,0 +1,300 @@
+import codecs
+import itertools
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from modules.xlsx_store import colunas_xlsx, eh_planilha, estimar_linhas_xlsx, ler_blocos_xlsx
+except ImportError:
+    from xlsx_store import colunas_xlsx, eh_planilha, estimar_linhas_xlsx, ler_blocos_xlsx
+
+DUPLICADOS_VALIDOS = ('first', 'last', 'all')
+
+ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'windows-1252']
+DELIMITADORES = [',', ';', '\t', '|']
+TAMANHO_PREFIXO = 64 * 1024
+TAMANHO_BLOCO = 5000
+
+
+class FormatoCSV:
+    """Encoding e delimitador detectados a partir do início do arquivo"""
+
+    __slots__ = ("encoding", "delimitador")
+
+    def __init__(self, encoding: str, delimitador: str):
+        self.encoding = encoding
+        self.delimitador = delimitador
+
+
+_FORMATOS: Dict[tuple, FormatoCSV] = {}
+
+
+def _decodificar(prefixo: bytes, encoding: str, completo: bool) -> str:
+    try:
+        return prefixo.decode(encoding)
+    except UnicodeDecodeError as e:
+        # Prefixo cortado no meio de um caractere multibyte
+        if not completo and e.start >= len(prefixo) - 3:
+            return prefixo[:e.start].decode(encoding)
+        raise
+
+
+def detectar_formato(file_path: str) -> FormatoCSV:
+    """
+    Detecta encoding e delimitador UMA vez, lendo apenas um prefixo do arquivo.
+    O resultado fica memorizado por (caminho, tamanho, mtime), então
+    ``get_csv_columns`` e a leitura completa reaproveitam a mesma detecção.
+    """
+    stat = os.stat(file_path)
+    chave = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    formato = _FORMATOS.get(chave)
+    if formato:
+        return formato
+
+    with open(file_path, 'rb') as f:
+        prefixo = f.read(TAMANHO_PREFIXO)
+    completo = len(prefixo) < TAMANHO_PREFIXO
+
+    if prefixo.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+        texto = _decodificar(prefixo[len(codecs.BOM_UTF8):], 'utf-8', completo)
+    else:
+        for encoding in ENCODINGS:
+            try:
+                texto = _decodificar(prefixo, encoding, completo)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            encoding = 'latin-1'
+            texto = prefixo.decode(encoding)
+
+    # Delimitador mais frequente no cabeçalho (empate ou nenhum: vírgula)
+    cabecalho = texto.split('\n', 1)[0]
+    delimitador = max(DELIMITADORES, key=cabecalho.count)
+    if not cabecalho.count(delimitador):
+        delimitador = ','
+
+    formato = _FORMATOS[chave] = FormatoCSV(encoding, delimitador)
+    return formato
+
+
+def _trocar_encoding(formato: FormatoCSV) -> bool:
+    """
+    Passa o formato (o mesmo objeto memorizado) para o próximo encoding
+    candidato. Retorna False se não houver outro para tentar.
+    """
+    atual = 'utf-8' if formato.encoding == 'utf-8-sig' else formato.encoding
+    if atual not in ENCODINGS or ENCODINGS.index(atual) + 1 >= len(ENCODINGS):
+        return False
+    anterior = formato.encoding
+    formato.encoding = ENCODINGS[ENCODINGS.index(atual) + 1]
+    print(f"⚠️  CSV não é {anterior} após o início do arquivo - relendo como {formato.encoding}")
+    return True
+
+
+def ler_csv(file_path: str, formato: Optional[FormatoCSV] = None, **kwargs) -> pd.DataFrame:
+    """
+    ``pd.read_csv`` com o formato detectado e o engine C. Os valores são lidos
+    como texto (sem inferência de tipo), iguais aos do arquivo.
+    Com ``chunksize`` retorna um iterador de blocos.
+
+    A decodificação é estrita: se o encoding detectado no prefixo falhar mais
+    adiante no arquivo, o CSV é lido de novo com o próximo encoding candidato
+    (que passa a ficar memorizado). Com ``chunksize`` o erro só aparece durante
+    a iteração; ``ler_blocos`` trata esse caso.
+    """
+    formato = formato or detectar_formato(file_path)
+    while True:
+        try:
+            return pd.read_csv(file_path, sep=formato.delimitador, encoding=formato.encoding,
+                               engine='c', dtype=str, on_bad_lines='skip', **kwargs)
+        except UnicodeDecodeError:
+            if kwargs.get('chunksize') or not _trocar_encoding(formato):
+                raise
+
+
+def ler_blocos(file_path: str, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[pd.DataFrame]:
+    """Lê o CSV (ou a planilha .xlsx) em blocos de ``tamanho_bloco`` linhas (memória constante)"""
+    if eh_planilha(file_path):
+        yield from ler_blocos_xlsx(file_path, tamanho_bloco)
+        return
+    formato = detectar_formato(file_path)
+    entregues = 0
+    while True:
+        try:
+            with ler_csv(file_path, formato, chunksize=tamanho_bloco) as leitor:
+                lidas = 0
+                for bloco in leitor:
+                    # Releitura com outro encoding: pula as linhas já entregues
+                    pular = min(len(bloco), max(0, entregues - lidas))
+                    lidas += len(bloco)
+                    if pular:
+                        bloco = bloco.iloc[pular:]
+                        if not len(bloco):
+                            continue
+                    entregues += len(bloco)
+                    yield bloco
+            return
+        except UnicodeDecodeError:
+            if not _trocar_encoding(formato):
+                raise
+
+
+def ler_tabela(file_path: str) -> pd.DataFrame:
+    """Arquivo inteiro (CSV ou .xlsx) em um único DataFrame de texto"""
+    if eh_planilha(file_path):
+        blocos = list(ler_blocos_xlsx(file_path, TAMANHO_BLOCO))
+        if not blocos:
+            return pd.DataFrame(columns=colunas_xlsx(file_path), dtype=object)
+        return pd.concat(blocos, ignore_index=True)
+    return ler_csv(file_path)
+
+
+def estimar_linhas(file_path: str) -> int:
+    """Quantidade aproximada de linhas de dados (quebras de linha, sem o cabeçalho)"""
+    if eh_planilha(file_path):
+        return estimar_linhas_xlsx(file_path)
+    linhas = 0
+    with open(file_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            linhas += bloco.count(b"\n")
+    return max(0, linhas - 1)
+
+
+def coluna_de_nome(colunas: List[str]) -> str:
+    """Coluna com o nome do caso de teste: ``Nome`` se existir, senão a primeira"""
+    return 'Nome' if 'Nome' in colunas else colunas[0]
+
+
+class CSVRecordStore:
+    """
+    Registros do CSV indexados pelo nome do caso de teste (já sem espaços).
+
+    Os valores das colunas selecionadas são projetados uma única vez na
+    leitura, com NaN normalizado para "", então cada consulta é O(1) em vez
+    de uma máscara booleana sobre o DataFrame inteiro.
+
+    Nomes repetidos seguem ``duplicados``:
+      - ``first``: todas as ocorrências usam a primeira linha (comportamento anterior)
+      - ``last``: todas usam a última linha
+      - ``all``: a n-ésima ocorrência do nome usa a n-ésima linha com esse nome
+    """
+
+    def __init__(self, colunas: List[str], colunas_selecionadas: Optional[List[str]] = None,
+                 duplicados: str = 'first'):
+        if duplicados not in DUPLICADOS_VALIDOS:
+            raise ValueError(f"Política de duplicados inválida: {duplicados}")
+        self.coluna_nome = coluna_de_nome(colunas)
+        self.colunas = [col for col in colunas if col != self.coluna_nome]
+        self.colunas_selecionadas = list(colunas_selecionadas or [])
+        self.duplicados = duplicados
+        self.nomes: List[str] = []
+        self._linhas: Dict[str, List[Dict[str, str]]] = {}
+
+    @classmethod
+    def de_dataframe(cls, df: pd.DataFrame, colunas_selecionadas: Optional[List[str]] = None,
+                     duplicados: str = 'first') -> 'CSVRecordStore':
+        store = cls(df.columns.tolist(), colunas_selecionadas, duplicados)
+        store.adicionar(df)
+        return store
+
+    def _projetar(self, df: pd.DataFrame) -> List[Tuple[str, Dict[str, str]]]:
+        """(nome, dados projetados) de cada linha com nome válido do bloco"""
+        nomes = df[self.coluna_nome]
+        nomes = nomes[nomes.notna()].astype(str).str.strip()
+        nomes = nomes[nomes != '']
+        novos = nomes.tolist()
+
+        # Projeção das colunas selecionadas (colunas ausentes no CSV ficam vazias)
+        presentes = [col for col in self.colunas_selecionadas if col in df.columns]
+        if presentes:
+            valores = df.loc[nomes.index, presentes]
+            valores = valores.astype(object).where(valores.notna(), "")
+            colunas_valores = [valores[col].map(str).tolist() for col in presentes]
+        else:
+            colunas_valores = []
+        ausentes = {col: "" for col in self.colunas_selecionadas if col not in df.columns}
+
+        projetados = []
+        for posicao, nome in enumerate(novos):
+            registro = {col: valores_col[posicao] for col, valores_col in zip(presentes, colunas_valores)}
+            registro.update(ausentes)
+            projetados.append((nome, registro))
+        return projetados
+
+    def adicionar(self, df: pd.DataFrame) -> List[str]:
+        """Indexa um bloco de linhas e retorna os nomes (válidos) encontrados nele"""
+        novos = []
+        for nome, registro in self._projetar(df):
+            self._linhas.setdefault(nome, []).append(registro)
+            novos.append(nome)
+        self.nomes.extend(novos)
+        return novos
+
+    def fluxo(self, blocos: Iterable[pd.DataFrame]) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        (nome, dados) de cada caso, na ordem do arquivo, à medida que os blocos
+        chegam e sem reter as linhas já entregues. Com ``first`` apenas o
+        primeiro registro de cada nome é guardado; ``last`` exige o arquivo
+        inteiro e não pode ser usado em fluxo.
+        """
+        if self.duplicados == 'last':
+            raise ValueError("A política 'last' exige a leitura completa do CSV")
+        primeiros = {}
+        for bloco in blocos:
+            for nome, registro in self._projetar(bloco):
+                if self.duplicados == 'first':
+                    registro = primeiros.setdefault(nome, registro)
+                yield nome, registro
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def __contains__(self, nome: str) -> bool:
+        return nome.strip() in self._linhas
+
+    def registros(self, nome: str) -> List[Dict[str, str]]:
+        """Todas as linhas com esse nome, na ordem do arquivo"""
+        return self._linhas.get(nome.strip(), [])
+
+    def dados(self, nome: str, ocorrencia: int = 0) -> Dict[str, str]:
+        """Dados projetados do caso de teste (``ocorrencia`` só é usada com ``duplicados='all'``)"""
+        linhas = self._linhas.get(nome.strip())
+        if not linhas:
+            return {}
+        if self.duplicados == 'last':
+            return linhas[-1]
+        if self.duplicados == 'all':
+            return linhas[min(ocorrencia, len(linhas) - 1)]
+        return linhas[0]
+
+
+def colunas_csv(file_path: str) -> List[str]:
+    """Colunas do CSV (reaproveita a detecção de formato) ou da aba ativa da planilha"""
+    if eh_planilha(file_path):
+        return colunas_xlsx(file_path)
+    return ler_csv(file_path, nrows=0).columns.tolist()
+
+
+def iterar_casos(file_path: str, colunas_selecionadas: Optional[List[str]] = None,
+                 duplicados: str = 'first', tamanho_bloco: int = TAMANHO_BLOCO
+                 ) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    (nome, dados do CSV) de cada caso de teste, lendo o arquivo (CSV ou
+    .xlsx) em blocos. Com ``duplicados='last'`` ele precisa ser lido por inteiro antes.
+    """
+    if duplicados == 'last':
+        registros = CSVRecordStore.de_dataframe(ler_tabela(file_path), colunas_selecionadas, duplicados)
+        for nome in registros.nomes:
+            yield nome, registros.dados(nome)
+        return
+    # Colunas do primeiro bloco: o arquivo é aberto uma única vez
+    blocos = ler_blocos(file_path, tamanho_bloco)
+    primeiro = next(blocos, None)
+    if primeiro is None or not len(primeiro.columns):
+        return
+    registros = CSVRecordStore(primeiro.columns.tolist(), colunas_selecionadas, duplicados)
+    yield from registros.fluxo(itertools.chain([primeiro], blocos))
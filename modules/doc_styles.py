@@ -0,0 +1,105 @@
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Pt, RGBColor
+
+# Estilos nomeados usados nos documentos gerados. Cada entrada:
+# chave -> (nome do estilo, tipo, estilo base, tamanho da fonte, negrito)
+ESTILOS = {
+    'titulo_documento': ("PrintF Título Documento", WD_STYLE_TYPE.PARAGRAPH, 'Title', 16, True),
+    'titulo_secao': ("PrintF Título Seção", WD_STYLE_TYPE.PARAGRAPH, 'Heading 1', 14, True),
+    'titulo_tabela': ("PrintF Título Tabela", WD_STYLE_TYPE.PARAGRAPH, 'Heading 2', 14, True),
+    'subtitulo': ("PrintF Subtítulo", WD_STYLE_TYPE.PARAGRAPH, 'Heading 2', 12, True),
+    'rotulo': ("PrintF Rótulo", WD_STYLE_TYPE.CHARACTER, None, 12, True),
+    'valor': ("PrintF Valor", WD_STYLE_TYPE.CHARACTER, None, 12, False),
+}
+
+ESTILO_TABELA = "PrintF Tabela Dados"
+
+# Bordas pretas simples em volta e entre as células (antes: tcBorders em cada célula)
+_BORDAS_TABELA = (
+    f'<w:tblPr {nsdecls("w")}><w:tblBorders>'
+    + ''.join(f'<w:{lado} w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+              for lado in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'))
+    + '</w:tblBorders></w:tblPr>'
+)
+
+
+def _estilo(estilos, nome):
+    try:
+        return estilos[nome]
+    except KeyError:
+        return None
+
+
+def _id_estilo(chave):
+    # Id ASCII estável (o python-docx derivaria do nome, com acentos)
+    return 'PrintF' + ''.join(parte.capitalize() for parte in chave.split('_'))
+
+
+def _fonte(estilo, tamanho, negrito):
+    estilo.font.name = 'Arial'
+    estilo.font.size = Pt(tamanho)
+    estilo.font.bold = negrito
+    estilo.font.color.rgb = RGBColor(0, 0, 0)
+
+
+def registrar_estilos(doc) -> dict:
+    """
+    Registra no documento (se ainda não existirem) os estilos de parágrafo,
+    caractere e tabela do PrintF e devolve ``{chave: id do estilo}``.
+
+    A formatação (Arial, tamanho, negrito, preto) fica uma única vez na
+    definição do estilo; parágrafos, runs e tabelas só referenciam o estilo,
+    em vez de repetir fonte/cor em cada run e bordas em cada célula.
+    Com o template em cache, o registro acontece uma vez por template.
+    """
+    estilos = doc.styles
+    registrados = {}
+
+    for chave, (nome, tipo, base, tamanho, negrito) in ESTILOS.items():
+        estilo = _estilo(estilos, nome)
+        if estilo is None:
+            estilo = estilos.add_style(nome, tipo)
+            estilo.style_id = _id_estilo(chave)
+            estilo_base = _estilo(estilos, base) if base else None
+            if estilo_base is not None:
+                # Herda nível de tópico/espaçamento do título original (navegação do Word)
+                estilo.base_style = estilo_base
+            if tipo == WD_STYLE_TYPE.PARAGRAPH:
+                estilo.next_paragraph_style = estilos['Normal']
+            _fonte(estilo, tamanho, negrito)
+        registrados[chave] = estilo.style_id
+
+    tabela = _estilo(estilos, ESTILO_TABELA)
+    if tabela is None:
+        tabela = estilos.add_style(ESTILO_TABELA, WD_STYLE_TYPE.TABLE)
+        tabela.style_id = _id_estilo('tabela_dados')
+        normal_table = _estilo(estilos, 'Normal Table')
+        if normal_table is not None:
+            tabela.base_style = normal_table
+        tabela.element.append(parse_xml(_BORDAS_TABELA))
+    registrados['tabela'] = tabela.style_id
+
+    return registrados
+
+
+# Os ids são aplicados direto no XML: o setter ``.style`` do python-docx
+# procura o estilo padrão do tipo (varre todos os estilos) a cada chamada.
+
+def paragrafo(doc, texto: str, estilo_id: str):
+    """Parágrafo no fim do documento com o estilo de parágrafo informado"""
+    para = doc.add_paragraph(texto)
+    para._p.style = estilo_id
+    return para
+
+
+def trecho(para, texto: str, estilo_id: str):
+    """Run com o estilo de caractere informado"""
+    run = para.add_run(texto)
+    run._r.style = estilo_id
+    return run
+
+
+def estilo_tabela(tabela, estilo_id: str) -> None:
+    tabela._tbl.tblStyle_val = estilo_id
@@ -0,0 +1,106 @@
+import copy
+from typing import Callable, Dict, List, Optional
+
+from docx.oxml.ns import qn
+
+W_R = qn('w:r')
+W_T = qn('w:t')
+W_TR = qn('w:tr')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+# Caracteres que o python-docx converte em <w:tab/>, <w:br/>... em vez de texto
+_ESPECIAIS = ('\t', '\n', '\r')
+
+
+def _marcador(numero: int) -> str:
+    # Área de uso privado do Unicode: não aparece nos rótulos/textos fixos
+    return f"\ue000{numero}\ue001"
+
+
+class FragmentoDocumento:
+    """
+    Esqueleto XML do conteúdo que um gerador acrescenta ao documento,
+    compilado uma vez por lote.
+
+    ``construir(doc, data, field_config, colunas_selecionadas, dados_csv)``
+    roda UMA vez sobre o documento base com marcadores no lugar dos valores;
+    os elementos criados são retirados do corpo e guardados, e cada marcador
+    vira um "slot" (posição do run no esqueleto). Em ``instanciar`` cada caso
+    só copia o esqueleto e troca o texto dos slots pelos valores da linha,
+    sem refazer parágrafos, runs, estilos e tabela pela API do python-docx.
+    """
+
+    def __init__(self, doc, construir: Callable, field_config: List[Dict],
+                 colunas_selecionadas: Optional[List[str]] = None, com_tabela: bool = True,
+                 padrao: str = ''):
+        self.padrao = padrao
+        marcadores = {}
+
+        def marcar(origem, chave):
+            texto = _marcador(len(marcadores))
+            marcadores[texto] = (origem, chave)
+            return texto
+
+        data = {campo['key']: marcar('dado', campo['key']) for campo in field_config}
+        data['Caso de Teste'] = marcar('dado', 'Caso de Teste')
+        dados_csv = {}
+        if com_tabela:
+            dados_csv = {coluna: marcar('csv', coluna) for coluna in colunas_selecionadas or []}
+
+        corpo = doc.element.body
+        sect_pr = corpo.find(qn('w:sectPr'))
+        ultimo = sect_pr.getprevious() if sect_pr is not None else (corpo[-1] if len(corpo) else None)
+
+        construir(doc, data, field_config, colunas_selecionadas, dados_csv)
+
+        # Elementos criados pelo construtor: entre o último filho anterior e o sectPr
+        inicio = ultimo.getnext() if ultimo is not None else (corpo[0] if len(corpo) else None)
+        self._esqueleto = []
+        elemento = inicio
+        while elemento is not None and elemento is not sect_pr:
+            self._esqueleto.append(elemento)
+            elemento = elemento.getnext()
+        for elemento in self._esqueleto:
+            corpo.remove(elemento)
+
+        self._slots = []
+        runs = [r for elemento in self._esqueleto for r in elemento.iter(W_R)]
+        for indice, run in enumerate(runs):
+            t = run.find(W_T)
+            if t is not None and t.text in marcadores:
+                self._slots.append((indice, marcadores[t.text]))
+
+    def instanciar(self, doc, data: Dict[str, str], dados_csv: Optional[Dict[str, str]] = None) -> None:
+        """Acrescenta ao fim do corpo uma cópia do esqueleto com os valores do caso"""
+        fontes = {'dado': data, 'csv': dados_csv or {}}
+        copias = [copy.deepcopy(elemento) for elemento in self._esqueleto]
+        runs = [r for elemento in copias for r in elemento.iter(W_R)]
+
+        for indice, (origem, chave) in self._slots:
+            run = runs[indice]
+            if origem == 'csv' and chave not in fontes['csv']:
+                # Coluna ausente nos dados: a linha da tabela fica vazia (como antes)
+                for linha in run.iterancestors(W_TR):
+                    for r in list(linha.iter(W_R)):
+                        r.getparent().remove(r)
+                    break
+                continue
+            texto = str(fontes[origem].get(chave, self.padrao))
+            t = run.find(W_T)
+            if not texto:
+                run.remove(t)
+            elif any(especial in texto for especial in _ESPECIAIS):
+                # Quebras de linha/tabulações: mesma conversão do python-docx
+                run.text = texto
+            else:
+                t.text = texto
+                if texto[0].isspace() or texto[-1].isspace():
+                    t.set(XML_SPACE, 'preserve')
+
+        corpo = doc.element.body
+        sect_pr = corpo.find(qn('w:sectPr'))
+        for elemento in copias:
+            if sect_pr is not None:
+                sect_pr.addprevious(elemento)
+            else:
+                corpo.append(elemento)
@@ -0,0 +1,221 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_PIC = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+NS_WP = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_IMAGEM = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+
+EMU_POR_POLEGADA = 914400
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+    "tif": "image/tiff",
+    "tiff": "image/tiff",
+}
+
+PARTE_DOCUMENTO = "word/document.xml"
+PARTE_RELS = "word/_rels/document.xml.rels"
+PARTE_TIPOS = "[Content_Types].xml"
+
+
+def _modo_padrao():
+    """Permissões de um arquivo novo comum (0666 menos a umask), não as 0600 do mkstemp"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _texto(texto):
+    """<w:t> com xml:space="preserve" quando necessário (mesma regra do python-docx)"""
+    texto = escape(texto)
+    if texto != texto.strip():
+        return f'<w:t xml:space="preserve">{texto}</w:t>'
+    return f"<w:t>{texto}</w:t>"
+
+
+def paragrafo_xml(texto="", negrito=False, italico=False, centralizado=False):
+    """Parágrafo simples com um único run (equivalente a add_paragraph().add_run())"""
+    ppr = '<w:pPr><w:jc w:val="center"/></w:pPr>' if centralizado else ""
+    if not texto and not negrito and not italico:
+        return f"<w:p>{ppr}</w:p>"
+    rpr = ""
+    if negrito or italico:
+        rpr = "<w:rPr>" + ("<w:b/>" if negrito else "") + ("<w:i/>" if italico else "") + "</w:rPr>"
+    return f"<w:p>{ppr}<w:r>{rpr}{_texto(texto)}</w:r></w:p>"
+
+
+def imagem_xml(rid, doc_pr_id, nome, cx, cy):
+    """Parágrafo centralizado com imagem inline (mesma estrutura gerada por run.add_picture)"""
+    nome = escape(nome, {'"': "&quot;"})
+    return (
+        '<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:drawing>'
+        f'<wp:inline xmlns:wp="{NS_WP}" xmlns:a="{NS_A}" xmlns:pic="{NS_PIC}" xmlns:r="{NS_R}">'
+        f'<wp:extent cx="{cx}" cy="{cy}"/>'
+        f'<wp:docPr id="{doc_pr_id}" name="Picture {doc_pr_id}"/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        f'<a:graphic><a:graphicData uri="{NS_PIC}"><pic:pic>'
+        f'<pic:nvPicPr><pic:cNvPr id="0" name="{nome}"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"/></pic:spPr>'
+        '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+    )
+
+
+class StreamingDocxWriter:
+    """
+    Escreve um DOCX em fluxo a partir de um documento base (bytes do .docx).
+
+    As imagens vão direto para ``word/media/*`` no zip de saída assim que são
+    adicionadas e o XML dos parágrafos é acumulado em um arquivo temporário;
+    no ``fechar`` o corpo é montado como: conteúdo do documento base + XML
+    acumulado + ``sectPr`` final. A memória usada não cresce com a quantidade
+    de imagens.
+
+    O zip é escrito em ``dir_temporario``: na pasta do documento final ele é
+    publicado com uma renomeação atômica (sem copiar o arquivo).
+    """
+
+    def __init__(self, base_docx, dir_temporario=None):
+        fd, self._tmp_saida = tempfile.mkstemp(prefix=".", suffix=".docx.tmp", dir=dir_temporario)
+        os.close(fd)
+        self._base = zipfile.ZipFile(io.BytesIO(base_docx))
+        self._zip = zipfile.ZipFile(self._tmp_saida, "w", zipfile.ZIP_DEFLATED)
+        self._corpo = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        self._rels = []
+        self._extensoes = set()
+
+        documento = self._base.read(PARTE_DOCUMENTO).decode("utf-8")
+        self._cabeca, self._cauda = self._dividir_corpo(documento)
+
+        rels = self._base.read(PARTE_RELS).decode("utf-8")
+        self._rels_base = rels
+        ids = [int(n) for n in re.findall(r'Id="rId(\d+)"', rels)]
+        self._proximo_rid = max(ids, default=0) + 1
+
+        ids_doc_pr = [int(n) for n in re.findall(r'<wp:docPr[^>]*\sid="(\d+)"', documento)]
+        self._proximo_doc_pr = max(ids_doc_pr, default=0) + 1
+
+        nomes = set(self._base.namelist())
+        self._midias_existentes = {n for n in nomes if n.startswith("word/media/")}
+        self._proxima_midia = 1
+
+        # Copia as demais partes do documento base sem alterações
+        for item in self._base.infolist():
+            if item.filename not in (PARTE_DOCUMENTO, PARTE_RELS, PARTE_TIPOS):
+                self._zip.writestr(item, self._base.read(item.filename))
+
+    @staticmethod
+    def _dividir_corpo(documento):
+        """Separa o document.xml no ponto de inserção: antes do sectPr final do body"""
+        fim_body = documento.rfind("</w:body>")
+        if fim_body < 0:
+            raise ValueError("document.xml sem <w:body>")
+        inicio_sect = documento.rfind("<w:sectPr", 0, fim_body)
+        if inicio_sect >= 0:
+            fim_sect = documento.find("</w:sectPr>", inicio_sect)
+            # Só é o sectPr do body se for o último filho antes de </w:body>
+            if fim_sect >= 0 and documento[fim_sect + len("</w:sectPr>"):fim_body].strip() == "":
+                return documento[:inicio_sect], documento[inicio_sect:]
+        return documento[:fim_body], documento[fim_body:]
+
+    def escrever_xml(self, fragmento):
+        self._corpo.write(fragmento)
+
+    def adicionar_paragrafo(self, texto="", negrito=False, italico=False, centralizado=False):
+        self.escrever_xml(paragrafo_xml(texto, negrito, italico, centralizado))
+
+    def adicionar_imagem(self, caminho, largura_polegadas):
+        """Grava a imagem no zip e escreve o parágrafo com a imagem na largura indicada"""
+        with Image.open(caminho) as img:
+            largura_px, altura_px = img.size
+        extensao = os.path.splitext(caminho)[1].lower().lstrip(".") or "png"
+        if extensao not in CONTENT_TYPES:
+            raise ValueError(f"Formato de imagem não suportado no DOCX: {extensao}")
+
+        nome_midia = f"word/media/image{self._proxima_midia}.{extensao}"
+        while nome_midia in self._midias_existentes:
+            self._proxima_midia += 1
+            nome_midia = f"word/media/image{self._proxima_midia}.{extensao}"
+        self._proxima_midia += 1
+
+        # PNG/JPEG já são comprimidos: armazenar sem recomprimir
+        self._zip.write(caminho, nome_midia, compress_type=zipfile.ZIP_STORED)
+        self._extensoes.add(extensao)
+
+        rid = f"rId{self._proximo_rid}"
+        self._proximo_rid += 1
+        self._rels.append((rid, nome_midia[len("word/"):]))
+
+        doc_pr_id = self._proximo_doc_pr
+        self._proximo_doc_pr += 1
+
+        cx = int(largura_polegadas * EMU_POR_POLEGADA)
+        cy = int(cx * altura_px / largura_px)
+        self.escrever_xml(imagem_xml(rid, doc_pr_id, os.path.basename(caminho), cx, cy))
+
+    def _content_types(self):
+        tipos = self._base.read(PARTE_TIPOS).decode("utf-8")
+        existentes = {e.lower() for e in re.findall(r'<Default\s+Extension="([^"]+)"', tipos)}
+        novos = "".join(
+            f'<Default Extension="{ext}" ContentType="{CONTENT_TYPES[ext]}"/>'
+            for ext in sorted(self._extensoes) if ext not in existentes
+        )
+        return tipos.replace("</Types>", novos + "</Types>")
+
+    def _relacionamentos(self):
+        novos = "".join(
+            f'<Relationship Id="{rid}" Type="{REL_IMAGEM}" Target="{alvo}"/>'
+            for rid, alvo in self._rels
+        )
+        return self._rels_base.replace("</Relationships>", novos + "</Relationships>")
+
+    def fechar(self, caminho_saida):
+        """Monta document.xml (em fluxo), rels e content types e publica o arquivo"""
+        try:
+            self._zip.writestr(PARTE_TIPOS, self._content_types())
+            self._zip.writestr(PARTE_RELS, self._relacionamentos())
+
+            with self._zip.open(PARTE_DOCUMENTO, "w") as destino:
+                destino.write(self._cabeca.encode("utf-8"))
+                self._corpo.seek(0)
+                for bloco in iter(lambda: self._corpo.read(256 * 1024), ""):
+                    destino.write(bloco.encode("utf-8"))
+                destino.write(self._cauda.encode("utf-8"))
+        except Exception:
+            self.descartar()
+            raise
+
+        self._zip.close()
+        self._corpo.close()
+        self._base.close()
+        os.chmod(self._tmp_saida, _modo_padrao())
+        try:
+            os.replace(self._tmp_saida, caminho_saida)
+        except OSError:
+            # Temporário em outro volume (escrita iniciada fora da pasta de saída)
+            shutil.move(self._tmp_saida, caminho_saida)
+        return caminho_saida
+
+    def descartar(self):
+        """Abandona a escrita e remove o arquivo parcial"""
+        for recurso in (self._zip, self._corpo, self._base):
+            try:
+                recurso.close()
+            except Exception:
+                pass
+        if os.path.exists(self._tmp_saida):
+            os.remove(self._tmp_saida)
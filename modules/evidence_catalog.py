@@ -0,0 +1,91 @@
+import os
+
+
+class EvidenceCatalog:
+    """
+    Índice em memória das evidências de um diretório.
+
+    As entradas são os próprios dicts de ``metadata["evidencias"]``; o catálogo
+    apenas mantém índices por nome de arquivo e por id, além da visão ordenada
+    das evidências ativas (não excluídas), todos atualizados em O(1).
+    """
+
+    def __init__(self, evidencias=None):
+        self._por_arquivo = {}
+        self._por_id = {}
+        self._ativas = {}  # arquivo -> entrada, na ordem de captura
+        self._ausentes = set()
+        if evidencias:
+            self.carregar(evidencias)
+
+    def carregar(self, evidencias):
+        """Reconstrói todos os índices a partir da lista de metadados"""
+        self._por_arquivo = {}
+        self._por_id = {}
+        self._ativas = {}
+        self._ausentes = set()
+        for evidencia in evidencias:
+            self.adicionar(evidencia)
+
+    # ------------------------------------------------------------------ consultas
+    def __len__(self):
+        return len(self._por_arquivo)
+
+    def __contains__(self, arquivo):
+        return arquivo in self._por_arquivo
+
+    def por_arquivo(self, arquivo):
+        return self._por_arquivo.get(arquivo)
+
+    def por_id(self, evidencia_id):
+        return self._por_id.get(evidencia_id)
+
+    def comentario(self, arquivo):
+        evidencia = self._por_arquivo.get(arquivo)
+        return evidencia.get("comentario", "") if evidencia else ""
+
+    def ativas(self):
+        """Entradas não excluídas (e com arquivo presente), na ordem de captura"""
+        return [e for arquivo, e in self._ativas.items() if arquivo not in self._ausentes]
+
+    def caminhos_ativos(self, dir_path, extensoes=None):
+        """Caminhos completos das evidências ativas, opcionalmente filtrados por extensão"""
+        caminhos = []
+        for arquivo in self._ativas:
+            if arquivo in self._ausentes:
+                continue
+            if extensoes and os.path.splitext(arquivo)[1].lower() not in extensoes:
+                continue
+            caminhos.append(os.path.join(dir_path, arquivo))
+        return caminhos
+
+    # ------------------------------------------------------------------ mutações
+    def adicionar(self, evidencia):
+        arquivo = evidencia["arquivo"]
+        self._por_arquivo[arquivo] = evidencia
+        if "id" in evidencia:
+            self._por_id[evidencia["id"]] = evidencia
+        if evidencia.get("excluida", False):
+            self._ativas.pop(arquivo, None)
+        else:
+            self._ativas[arquivo] = evidencia
+        self._ausentes.discard(arquivo)
+
+    def excluir(self, arquivo):
+        evidencia = self._por_arquivo.get(arquivo)
+        if evidencia is not None:
+            evidencia["excluida"] = True
+        self._ativas.pop(arquivo, None)
+        return evidencia
+
+    def verificar_arquivos(self, dir_path):
+        """
+        Marca como ausentes as evidências cujo arquivo não existe mais.
+        Usa uma única listagem do diretório em vez de um os.path.exists por entrada.
+        """
+        try:
+            presentes = set(os.listdir(dir_path))
+        except OSError:
+            presentes = set()
+        self._ausentes = {arquivo for arquivo in self._ativas if arquivo not in presentes}
+        return len(self._ausentes)
@@ -0,0 +1,232 @@
+import io
+import os
+import re
+from datetime import datetime
+
+from docx import Document
+from docx.shared import Inches
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+try:
+    from modules.docx_stream import StreamingDocxWriter
+    from modules.image_prep import TarefaImagem, preparar_imagens, perfil_exportacao, formatar_tamanho
+    from modules.render_cache import RenderCache
+except ImportError:
+    from docx_stream import StreamingDocxWriter
+    from image_prep import TarefaImagem, preparar_imagens, perfil_exportacao, formatar_tamanho
+    from render_cache import RenderCache
+
+SEPARADOR = "―" * 36
+
+
+def limpar_nome_arquivo(nome):
+    """Remove caracteres inválidos para nomes de arquivo no Windows, mantendo caracteres PT-BR"""
+    caracteres_invalidos = r'[\\/*?:"<>|]'
+    nome_limpo = re.sub(caracteres_invalidos, '_', nome)
+
+    nome_limpo = re.sub(r'[^\w\s\-\.\(\)áàâãéèêíïóôõöúçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ]', '', nome_limpo)
+
+    if len(nome_limpo) > 100:
+        nome_limpo = nome_limpo[:100]
+
+    return nome_limpo.strip()
+
+
+class EvidenceDocumentBuilder:
+    """
+    Monta o DOCX de evidências (sem dependência de Tk): template ou documento
+    vazio, uma seção por evidência com título, comentário e imagem.
+    Compartilhado pelos módulos de captura e de geração de documentos.
+
+    Com ``streaming=True`` o template é carregado pelo python-docx apenas
+    como documento base; as evidências vão para um ``StreamingDocxWriter``
+    (imagens direto no zip, XML do corpo em arquivo temporário), então a
+    memória não cresce com a quantidade de evidências. O zip só é aberto em
+    ``iniciar_saida``, já na pasta onde o documento será salvo.
+    """
+
+    def __init__(self, template_path=None, largura_imagem=6.0, streaming=False):
+        self.template_path = template_path
+        self.largura_imagem = largura_imagem
+        self.quantidade = 0
+        self.writer = None
+        self._base_streaming = None
+
+        if template_path and os.path.exists(template_path):
+            self.doc = Document(template_path)
+            self.using_template = True
+            print(f"✅ Template carregado: {template_path}")
+        else:
+            self.doc = Document()
+            self.using_template = False
+            print("ℹ️ Criando documento vazio (sem template)")
+
+        # Título e data apenas sem template
+        if not self.using_template:
+            titulo = self.doc.add_heading('Evidências Capturadas', 0)
+            titulo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+            data_hora = self.doc.add_paragraph()
+            data_hora.add_run(f"Data e hora da geração: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}").italic = True
+            data_hora.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+        if streaming:
+            base = io.BytesIO()
+            self.doc.save(base)
+            self._base_streaming = base.getvalue()
+            print("📦 Gravação do DOCX em fluxo ativada")
+
+    def iniciar_saida(self, output_dir=None):
+        """Abre a gravação em fluxo com o arquivo temporário na pasta de saída"""
+        if self._base_streaming is None:
+            return
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.writer = StreamingDocxWriter(self._base_streaming, dir_temporario=output_dir or None)
+        self._base_streaming = None
+
+    def _paragrafo(self, texto="", negrito=False, italico=False, centralizado=False):
+        if self.writer:
+            self.writer.adicionar_paragrafo(texto, negrito, italico, centralizado)
+            return
+        paragrafo = self.doc.add_paragraph()
+        if texto:
+            run = paragrafo.add_run(texto)
+            run.bold = negrito or None
+            run.italic = italico or None
+        if centralizado:
+            paragrafo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+    def _imagem(self, caminho_imagem):
+        if self.writer:
+            self.writer.adicionar_imagem(caminho_imagem, self.largura_imagem)
+            return
+        paragraph = self.doc.add_paragraph()
+        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        paragraph.add_run().add_picture(caminho_imagem, width=Inches(self.largura_imagem))
+
+    def _separador(self):
+        self._paragrafo(SEPARADOR, centralizado=True)
+
+    def adicionar_evidencia(self, caminho_original, caminho_imagem=None, comentario="", erro=None):
+        """Adiciona uma evidência; ``caminho_imagem`` é a versão preparada (com timestamp etc.)"""
+        self.iniciar_saida()
+        self.quantidade += 1
+        i = self.quantidade
+        print(f"📷 Adicionando evidência {i}: {caminho_original}")
+
+        # Separador ANTES da primeira evidência
+        if i == 1:
+            self._separador()
+
+        self._paragrafo(f"Evidência {i}", negrito=True)
+
+        if comentario:
+            self._paragrafo(f"Comentário: {comentario}", italico=True)
+
+        try:
+            if erro:
+                print(f"❌ Erro ao preparar imagem {caminho_original}: {erro}")
+                self._paragrafo(centralizado=True)
+                self._paragrafo(f"[Erro ao carregar imagem: {caminho_original}]")
+            elif caminho_imagem and os.path.exists(caminho_imagem):
+                self._imagem(caminho_imagem)
+                print(f"✅ Imagem {i} adicionada com sucesso")
+            else:
+                print(f"⚠️ Arquivo não encontrado: {caminho_original}")
+                self._paragrafo(centralizado=True)
+                self._paragrafo(f"[Arquivo de imagem não encontrado: {caminho_original}]")
+
+        except Exception as e:
+            print(f"❌ Erro ao adicionar imagem {caminho_original}: {e}")
+            if self.writer:
+                # No python-docx o parágrafo da imagem já foi criado antes da falha
+                self._paragrafo(centralizado=True)
+            self._paragrafo(f"[Erro ao carregar imagem: {caminho_original}]")
+
+        # Separador DEPOIS de CADA evidência
+        self._separador()
+
+    def caminho_saida(self, output_dir):
+        """Nome do documento baseado no template + data/hora (com fallback para caminhos longos)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        template_name = "Evidencias"
+        if self.template_path:
+            template_name = os.path.splitext(os.path.basename(self.template_path))[0]
+        template_name = limpar_nome_arquivo(template_name)
+
+        doc_path = os.path.join(output_dir, f"{template_name}_{timestamp}.docx")
+        if len(doc_path) > 255:
+            short_name = f"Evidencias_{timestamp}.docx"
+            doc_path = os.path.join(output_dir, short_name)
+            print(f"⚠️ Caminho muito longo, usando nome reduzido: {short_name}")
+        return doc_path
+
+    def salvar(self, output_dir, doc_path=None):
+        doc_path = doc_path or self.caminho_saida(output_dir)
+        os.makedirs(os.path.dirname(doc_path) or ".", exist_ok=True)
+        self.iniciar_saida(os.path.dirname(doc_path) or ".")
+        if self.writer:
+            self.writer.fechar(doc_path)
+            self.writer = None
+        else:
+            self.doc.save(doc_path)
+        print(f"✅ Documento salvo em: {doc_path}")
+        return doc_path
+
+    def descartar(self):
+        """Descarta a gravação em andamento (erro ou cancelamento)"""
+        if self.writer:
+            self.writer.descartar()
+            self.writer = None
+        self._base_streaming = None
+
+
+def gerar_documento_evidencias(builder, prints, output_dir, evidence_dir, comentario_de=None,
+                               configuracao=None, progresso=None, cancelado=None,
+                               timestamp_de=None, tamanho_timestamp=24, cache_dir=None):
+    """
+    Monta e salva o documento de uma pasta de evidências, sem depender de
+    interface: imagens preparadas em paralelo conforme o perfil de exportação
+    do ``configuracao`` (DOCUMENT_SETTINGS) e inseridas em ordem.
+
+    ``timestamp_de(arquivo)`` devolve os metadados da evidência cujo timestamp
+    deve ser desenhado na imagem (ou None para inserir sem timestamp). O cache
+    de imagens preparadas fica em ``cache_dir`` (padrão: ``.render_cache`` da
+    pasta de evidências). Retorna ``(doc_path, (bytes_origem, bytes_final))``.
+    """
+    configuracao = configuracao or {}
+    exportacao = perfil_exportacao(configuracao.get('export_profile'), builder.largura_imagem)
+    render_cache = None
+    if exportacao or timestamp_de:
+        render_cache = RenderCache(cache_dir) if cache_dir else RenderCache.para_diretorio(evidence_dir)
+
+    # DOCX em fluxo montado já na pasta de saída (publicado por renomeação)
+    builder.iniciar_saida(output_dir)
+
+    tarefas = []
+    for indice, print_path in enumerate(prints):
+        evidencia = timestamp_de(os.path.basename(print_path)) if timestamp_de else None
+        destino = None
+        if (evidencia or exportacao) and os.path.exists(print_path):
+            destino = render_cache.reservar(print_path, evidencia, tamanho_timestamp, exportacao)
+        tarefas.append(TarefaImagem(indice, print_path, dict(evidencia) if evidencia else None,
+                                    destino, tamanho_timestamp, exportacao))
+
+    renderizados = bytes_origem = bytes_final = 0
+    for resultado in preparar_imagens(tarefas, configuracao.get('image_workers'), progresso, cancelado):
+        renderizados += resultado.renderizado
+        bytes_origem += resultado.bytes_origem
+        bytes_final += resultado.bytes_final
+        comentario = comentario_de(os.path.basename(resultado.origem)) if comentario_de else ""
+        builder.adicionar_evidencia(resultado.origem, resultado.caminho, comentario, resultado.erro)
+
+    if render_cache:
+        render_cache.podar()
+        render_cache.salvar_indice()
+        print(f"🖼️ Imagens: {renderizados} renderizada(s), "
+              f"{len(tarefas) - renderizados} reaproveitada(s) do cache")
+    print(f"📦 Imagens no documento: {formatar_tamanho(bytes_origem)} → {formatar_tamanho(bytes_final)}")
+
+    return builder.salvar(output_dir), (bytes_origem, bytes_final)
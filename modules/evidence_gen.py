@@ -3,19 +3,16 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, colorchooser, ttk
 from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 import pyautogui
 from pynput import mouse, keyboard
 from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageFilter
-from datetime import datetime
 import math
-import re
 import glob
-import json
 import uuid
 import shutil
 import subprocess
+import threading
+import queue
 
 # Importar sistema de estilos
 try:
@@ -29,6 +26,31 @@ except ImportError:
         STYLES_AVAILABLE = False
         print("⚠️ Estilos Liquid Glass não disponíveis, usando fallback")
 
+# Montagem do DOCX compartilhada + preparação de imagens em paralelo
+try:
+    from modules.evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from modules.image_prep import GeracaoCancelada, formatar_tamanho
+except ImportError:
+    from evidence_docx import EvidenceDocumentBuilder, gerar_documento_evidencias
+    from image_prep import GeracaoCancelada, formatar_tamanho
+
+try:
+    from config import APP_CONFIG
+    DOCUMENT_SETTINGS = APP_CONFIG.DOCUMENT_SETTINGS
+except ImportError:
+    DOCUMENT_SETTINGS = {}
+
+# Metadados com journal append-only (compatível com evidencias_metadata.json legado)
+try:
+    from modules.metadata_store import MetadataStore, metadata_da_listagem
+except ImportError:
+    from metadata_store import MetadataStore, metadata_da_listagem
+
+try:
+    from modules.evidence_catalog import EvidenceCatalog
+except ImportError:
+    from evidence_catalog import EvidenceCatalog
+
 class EvidenceGeneratorModule:
     """Módulo completo de geração de documentos de evidências"""
     
@@ -45,6 +67,9 @@ class EvidenceGeneratorModule:
         self.evidence_dir = None
         self.metadata_path = None
         self.metadata = {"evidencias": [], "proximo_id": 1}
+        self.metadata_store = None
+        self.catalog = EvidenceCatalog()
+        self.relatorio_imagens = None  # (bytes originais, bytes no documento) da última geração
         
         self.gravando = False
         self.listener_mouse = None
@@ -167,54 +192,47 @@ class EvidenceGeneratorModule:
             return tk.Entry(parent, bg='white', fg='#2c3e50', 
                           relief="solid", bd=1, **kwargs)
 
+    def _fechar_metadata(self):
+        """Grava o snapshot final e fecha o journal"""
+        if self.metadata_store:
+            try:
+                self.metadata_store.fechar()
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar metadados: {e}")
+            self.metadata_store = None
+
     def _salvar_metadata(self):
-        """Salva os metadados no arquivo JSON"""
-        if self.metadata_path:
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        """Grava o snapshot completo dos metadados (as alterações normais vão para o journal)"""
+        if self.metadata_store:
+            self.metadata_store.substituir(self.metadata)
 
     def carregar_evidencias(self, dir_path):
         """Carrega as evidências baseadas nos metadados - SUPORTA MÚLTIPLOS FORMATOS"""
-        self.metadata_path = os.path.join(dir_path, "evidencias_metadata.json")
-        
         FORMATOS_SUPORTADOS = ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.tif']
         
-        if os.path.exists(self.metadata_path):
-            try:
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
-            except:
-                self.metadata = {"evidencias": [], "proximo_id": 1}
-        else:
-            self.metadata = {"evidencias": [], "proximo_id": 1}
-            
-            for arquivo in os.listdir(dir_path):
-                _, ext = os.path.splitext(arquivo)
-                if ext.lower() in FORMATOS_SUPORTADOS:
-                    caminho_completo = os.path.join(dir_path, arquivo)
-                    timestamp = datetime.fromtimestamp(os.path.getmtime(caminho_completo))
-                    
-                    self.metadata["evidencias"].append({
-                        "id": self.metadata["proximo_id"],
-                        "arquivo": arquivo,
-                        "comentario": "",
-                        "timestamp": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        "excluida": False
-                    })
-                    self.metadata["proximo_id"] += 1
+        mesmo_diretorio = (self.metadata_store and
+                           os.path.normcase(self.metadata_store.dir_path) == os.path.normcase(dir_path))
+        if not mesmo_diretorio:
+            self._fechar_metadata()
+            self.metadata_store = MetadataStore(dir_path)
+            self.metadata_path = self.metadata_store.snapshot_path
             
+            existe_metadata = (os.path.exists(self.metadata_store.snapshot_path) or
+                               os.path.exists(self.metadata_store.journal_path))
+            self.metadata = self.metadata_store.carregar()
+        else:
+            existe_metadata = True
+        self.catalog = self.metadata_store.catalog
+        
+        if not existe_metadata:
+            self.metadata = metadata_da_listagem(dir_path, FORMATOS_SUPORTADOS)
             self._salvar_metadata()
         
-        evidencias_ativas = []
-        for evidencia in self.metadata["evidencias"]:
-            if not evidencia.get("excluida", False):
-                caminho = os.path.join(dir_path, evidencia["arquivo"])
-                if os.path.exists(caminho):
-                    _, ext = os.path.splitext(evidencia["arquivo"])
-                    if ext.lower() in FORMATOS_SUPORTADOS:
-                        evidencias_ativas.append(caminho)
+        if not mesmo_diretorio:
+            # Uma única listagem do diretório ao abrir; recargas posteriores usam só a memória
+            self.catalog.verificar_arquivos(dir_path)
         
-        return evidencias_ativas
+        return self.catalog.caminhos_ativos(dir_path, FORMATOS_SUPORTADOS)
 
     def recarregar_evidencias(self):
         """Recarrega a lista de evidências"""
@@ -225,10 +243,7 @@ class EvidenceGeneratorModule:
 
     def obter_comentario(self, nome_arquivo):
         """Obtém o comentário salvo nos metadados"""
-        for evidencia in self.metadata["evidencias"]:
-            if evidencia["arquivo"] == nome_arquivo:
-                return evidencia.get("comentario", "")
-        return ""
+        return self.catalog.comentario(nome_arquivo)
     
     def show(self):
         """Mostra a interface do módulo"""
@@ -296,6 +311,8 @@ class EvidenceGeneratorModule:
                         pass
                     self.listener_mouse = None
                 
+                self._fechar_metadata()
+                
                 if hasattr(self, 'popup') and self.popup and self.popup.winfo_exists():
                     try:
                         self.popup.destroy()
@@ -621,12 +638,8 @@ class EvidenceGeneratorModule:
         nome_arquivo = os.path.basename(caminho_print)
         comentario = self.comment_entry.get()
         
-        for evidencia in self.metadata["evidencias"]:
-            if evidencia["arquivo"] == nome_arquivo:
-                evidencia["comentario"] = comentario
-                break
-                
-        self._salvar_metadata()
+        if self.metadata_store:
+            self.metadata_store.comentar(nome_arquivo, comentario)
 
     def primeira_evidencia(self):
         self.salvar_comentario()
@@ -712,12 +725,7 @@ class EvidenceGeneratorModule:
             try:
                 os.remove(caminho_print)
                 
-                for evidencia in self.metadata["evidencias"]:
-                    if evidencia["arquivo"] == nome_arquivo:
-                        evidencia["excluida"] = True
-                        break
-                
-                self._salvar_metadata()
+                self.metadata_store.excluir(nome_arquivo)
                 
                 self.recarregar_evidencias()
                 
@@ -739,14 +747,89 @@ class EvidenceGeneratorModule:
         """Processa todas as evidências e gera o DOCX"""
         self.salvar_comentario()
         
-        try:
-            doc_path = self.gerar_documento()
-            
+        self._gerar_documento_com_progresso(self._documento_gerado)
+
+    def _gerar_documento_com_progresso(self, ao_concluir):
+        """Executa gerar_documento fora da thread do Tk, exibindo uma janela de progresso"""
+        parent = self.popup if self.popup and self.popup.winfo_exists() else self.root
+        janela = tk.Toplevel(parent)
+        janela.title("Gerando documento")
+        janela.geometry("420x140")
+        janela.resizable(False, False)
+        janela.transient(parent)
+        janela.grab_set()
+        self._apply_styles(janela)
+        
+        status = tk.Label(janela, text="Preparando imagens...", font=("Arial", 10))
+        status.pack(pady=(15, 5))
+        barra = ttk.Progressbar(janela, mode='determinate', length=360, maximum=max(1, len(self.prints)))
+        barra.pack(pady=5)
+        
+        cancelamento = threading.Event()
+        
+        def cancelar():
+            cancelamento.set()
+            status.config(text="Cancelando...")
+            btn_cancelar.config(state=tk.DISABLED)
+        
+        btn_cancelar = tk.Button(janela, text="Cancelar", command=cancelar, width=12)
+        btn_cancelar.pack(pady=8)
+        janela.protocol("WM_DELETE_WINDOW", cancelar)
+        
+        mensagens = queue.Queue()
+        
+        def executar():
+            try:
+                doc_path = self.gerar_documento(
+                    progresso=lambda feitas, total: mensagens.put(("progresso", feitas, total)),
+                    cancelado=cancelamento.is_set)
+                mensagens.put(("ok", doc_path))
+            except GeracaoCancelada:
+                mensagens.put(("cancelado",))
+            except Exception as e:
+                mensagens.put(("erro", e))
+        
+        def acompanhar():
+            try:
+                while True:
+                    mensagem = mensagens.get_nowait()
+                    if mensagem[0] == "progresso":
+                        _, feitas, total = mensagem
+                        barra.config(maximum=total, value=feitas)
+                        if not cancelamento.is_set():
+                            status.config(text=f"Evidência {feitas} de {total}")
+                        continue
+                    janela.grab_release()
+                    janela.destroy()
+                    ao_concluir(*mensagem)
+                    return
+            except queue.Empty:
+                pass
+            janela.after(100, acompanhar)
+        
+        threading.Thread(target=executar, name="gerar-documento", daemon=True).start()
+        janela.after(100, acompanhar)
+
+    def _documento_gerado(self, resultado, valor=None):
+        """Resultado da geração em segundo plano (executado na thread do Tk)"""
+        if resultado == "cancelado":
+            messagebox.showinfo("Cancelado", "Geração do documento cancelada.", parent=self.popup)
+            return
+        
+        if resultado == "erro":
+            messagebox.showerror("Erro", f"Erro ao gerar documento: {valor}", parent=self.popup)
+        else:
+            doc_path = valor
             pasta_para_abrir = os.path.dirname(doc_path)
             
+            tamanhos = ""
+            if self.relatorio_imagens:
+                antes, depois = self.relatorio_imagens
+                tamanhos = f"\n\nImagens: {formatar_tamanho(antes)} → {formatar_tamanho(depois)}"
+            
             resposta = messagebox.askyesno(
                 "Sucesso", 
-                f"Documento gerado com sucesso em:\n{doc_path}\n\nDeseja abrir a pasta onde o documento foi salvo?",
+                f"Documento gerado com sucesso em:\n{doc_path}{tamanhos}\n\nDeseja abrir a pasta onde o documento foi salvo?",
                 parent=self.popup
             )
             
@@ -757,9 +840,6 @@ class EvidenceGeneratorModule:
                         f"Pasta do documento:\n{pasta_para_abrir}",
                         parent=self.popup
                     )
-                    
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao gerar documento: {e}", parent=self.popup)
         
         if self.popup and self.popup.winfo_exists():
             self.popup.destroy()
@@ -787,102 +867,40 @@ class EvidenceGeneratorModule:
                 self.popup.destroy()
                 self.popup = None
 
-    def gerar_documento(self):
-        """Gera o documento DOCX com as evidências e retorna o caminho do documento"""
+    def gerar_documento(self, progresso=None, cancelado=None):
+        """
+        Gera o documento DOCX com as evidências e retorna o caminho do documento.
+        As imagens são preparadas em paralelo e entram no documento em ordem.
+        """
         doc_path = None
+        builder = None
         try:
             print("📄 Iniciando geração do documento DOCX...")
             
-            if self.template_path and os.path.exists(self.template_path):
-                self.doc = Document(self.template_path)
-                self.using_template = True
-                print(f"✅ Template carregado: {self.template_path}")
-            else:
-                self.doc = Document()
-                self.using_template = False
-                print("ℹ️ Criando documento vazio (sem template)")
-            
-            if not self.using_template:
-                titulo = self.doc.add_heading('Evidências Capturadas', 0)
-                titulo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            
-            if not self.using_template:
-                data_hora = self.doc.add_paragraph()
-                data_hora.add_run(f"Data e hora da geração: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}").italic = True
-                data_hora.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            
-            for i, print_path in enumerate(self.prints, 1):
-                print(f"📷 Adicionando evidência {i}: {print_path}")
-                
-                # 🔥 CORREÇÃO: Adicionar separador ANTES da primeira evidência
-                if i == 1:
-                    self.doc.add_paragraph("―" * 36).alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                
-                self.doc.add_paragraph().add_run(f"Evidência {i}").bold = True
-                
-                nome_arquivo = os.path.basename(print_path)
-                comentario = self.obter_comentario(nome_arquivo)
-                if comentario:
-                    comentario_para = self.doc.add_paragraph()
-                    comentario_para.add_run(f"Comentário: {comentario}").italic = True
-                
-                try:
-                    paragraph = self.doc.add_paragraph()
-                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    run = paragraph.add_run()
-                    
-                    if os.path.exists(print_path):
-                        run.add_picture(print_path, width=Inches(6.0))
-                        print(f"✅ Imagem {i} adicionada com sucesso")
-                    else:
-                        print(f"⚠️ Arquivo não encontrado: {print_path}")
-                        self.doc.add_paragraph(f"[Arquivo de imagem não encontrado: {print_path}]")
-                        
-                except Exception as e:
-                    print(f"❌ Erro ao adicionar imagem {print_path}: {e}")
-                    self.doc.add_paragraph(f"[Erro ao carregar imagem: {print_path}]")
-                
-                self.doc.add_paragraph("―" * 36).alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            template_filename = os.path.basename(self.template_path)
-            template_name = os.path.splitext(template_filename)[0]
+            builder = EvidenceDocumentBuilder(
+                self.template_path, DOCUMENT_SETTINGS.get('image_width_inches', 6.0),
+                streaming=DOCUMENT_SETTINGS.get('streaming_writer', True))
+            self.doc = builder.doc
+            self.using_template = builder.using_template
             
-            template_name = self._limpar_nome_arquivo(template_name)
-            
-            doc_filename = f"{template_name}_{timestamp}.docx"
-            doc_path = os.path.join(self.output_dir, doc_filename)
-            
-            os.makedirs(os.path.dirname(doc_path), exist_ok=True)
-            
-            if len(doc_path) > 255:
-                short_name = f"Evidencias_{timestamp}.docx"
-                doc_path = os.path.join(self.output_dir, short_name)
-                print(f"⚠️ Caminho muito longo, usando nome reduzido: {short_name}")
-            
-            self.doc.save(doc_path)
-            print(f"✅ Documento salvo em: {doc_path}")
+            doc_path, self.relatorio_imagens = gerar_documento_evidencias(
+                builder, self.prints, self.output_dir, self.evidence_dir, self.obter_comentario,
+                DOCUMENT_SETTINGS, progresso, cancelado)
             
             return doc_path
             
+        except GeracaoCancelada:
+            print("⏹️ Geração do documento cancelada")
+            raise
         except Exception as e:
             print(f"❌ Erro ao gerar documento: {e}")
             import traceback
             traceback.print_exc()
             raise
-
-    def _limpar_nome_arquivo(self, nome):
-        """Remove caracteres inválidos para nomes de arquivo no Windows, mantendo caracteres PT-BR"""
-        caracteres_invalidos = r'[\\/*?:"<>|]'
-        nome_limpo = re.sub(caracteres_invalidos, '_', nome)
-        
-        nome_limpo = re.sub(r'[^\w\s\-\.\(\)áàâãéèêíïóôõöúçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ]', '', nome_limpo)
-        
-        if len(nome_limpo) > 100:
-            nome_limpo = nome_limpo[:100]
-            
-        return nome_limpo.strip()
+        finally:
+            # Remove o DOCX parcial se a gravação em fluxo não chegou ao fim
+            if builder:
+                builder.descartar()
 
     def abrir_editor(self, caminho_print, parent):
         """Abre editor de imagens para a evidência - RETORNA A JANELA DO EDITOR"""
@@ -0,0 +1,150 @@
+import collections
+import threading
+import time
+
+
+class QuadroGravado:
+    """Quadro do buffer: pixels brutos, instante da cópia e monitor/retângulo de origem"""
+
+    __slots__ = ("t_monotonic", "frame", "monitor", "rect", "tamanho")
+
+    def __init__(self, t_monotonic, frame, monitor, rect):
+        self.t_monotonic = t_monotonic
+        self.frame = frame
+        self.monitor = monitor
+        self.rect = rect
+        self.tamanho = len(frame.bgra)
+
+
+class FrameRingBuffer:
+    """
+    Gravação contínua dos quadros mais recentes do monitor sob o cursor.
+
+    Uma thread captura ``fps`` quadros por segundo (pela mesma sessão do
+    ScreenGrabber) e guarda os quadros brutos dos últimos ``idade_maxima``
+    segundos, que são os únicos que um clique pode usar; ``memoria_mb`` é só
+    um teto (ao passar dele os mais antigos saem antes do prazo). No
+    clique, ``quadro_antes`` devolve o último quadro copiado ANTES do instante
+    do clique, ou seja, a tela como estava quando o usuário clicou e não depois
+    que a aplicação reagiu. Quadros mais antigos que ``idade_maxima`` segundos
+    (thread atrasada, monitor diferente) não são usados: o chamador captura ao
+    vivo como antes.
+    """
+
+    def __init__(self, grabber, posicao_cursor, area="monitor", fps=10, memoria_mb=256,
+                 idade_maxima=0.5):
+        self.grabber = grabber
+        self.posicao_cursor = posicao_cursor
+        self.area = area
+        self.intervalo = 1.0 / max(0.5, float(fps))
+        self.memoria_max = max(1, int(float(memoria_mb) * 1024 * 1024))
+        self.idade_maxima = max(float(idade_maxima), self.intervalo * 2)
+
+        self._quadros = collections.deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._ativo = threading.Event()
+        self._ativo.set()
+        self._thread = None
+        self._avisou_limite = False
+
+        self.capturados = 0
+        self.usados = 0
+        self.ao_vivo = 0
+
+    @property
+    def em_execucao(self):
+        return self._thread is not None
+
+    @property
+    def memoria_em_uso(self):
+        return self._bytes
+
+    def start(self):
+        """Inicia a thread de gravação"""
+        if self._thread:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="captura-pre-clique", daemon=True)
+        self._thread.start()
+
+    def pausar(self):
+        """Suspende a gravação e libera os quadros guardados"""
+        self._ativo.clear()
+        self._limpar()
+
+    def retomar(self):
+        self._ativo.set()
+
+    def stop(self, timeout=2.0):
+        """Encerra a thread e libera a memória do anel"""
+        if self._thread:
+            self._parar.set()
+            self._ativo.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._limpar()
+
+    def _limpar(self):
+        with self._lock:
+            self._quadros.clear()
+            self._bytes = 0
+
+    def _loop(self):
+        falhas = 0
+        while not self._parar.is_set():
+            if not self._ativo.wait(0.2):
+                continue
+            inicio = time.monotonic()
+            try:
+                x, y = self.posicao_cursor()
+                monitor = self.grabber.monitor_em(x, y)
+                rect = monitor.area(self.area)
+                frame = self.grabber.grab(rect)
+            except Exception as e:
+                falhas += 1
+                if falhas == 1:
+                    print(f"⚠️  Buffer pré-clique: falha ao capturar quadro ({e})")
+            else:
+                falhas = 0
+                # Instante em que a cópia terminou: o conteúdo é anterior a ele
+                self._guardar(QuadroGravado(time.monotonic(), frame, monitor, rect))
+            self._parar.wait(max(0.0, inicio + self.intervalo - time.monotonic()))
+
+    def _guardar(self, quadro):
+        limite_idade = quadro.t_monotonic - self.idade_maxima
+        with self._lock:
+            self._quadros.append(quadro)
+            self._bytes += quadro.tamanho
+            self.capturados += 1
+            # Quadros que nenhum clique pode mais escolher, depois o teto de memória
+            while self._quadros and (self._quadros[0].t_monotonic < limite_idade
+                                     or self._bytes > self.memoria_max):
+                self._bytes -= self._quadros.popleft().tamanho
+            vazio = not self._quadros
+        if vazio and not self._avisou_limite:
+            self._avisou_limite = True
+            print(f"⚠️  Buffer pré-clique: um quadro ({quadro.tamanho / 1048576:.0f} MB) não cabe no limite "
+                  f"de memória ({self.memoria_max / 1048576:.0f} MB) - capturando ao vivo")
+
+    def quadro_antes(self, x, y, t_clique):
+        """
+        Último quadro do monitor que contém (x, y) copiado até ``t_clique``
+        (time.monotonic). Retorna (quadro bruto, (rel_x, rel_y), retângulo,
+        idade em segundos) ou None se não houver quadro recente o bastante.
+        """
+        with self._lock:
+            escolhido = None
+            for quadro in reversed(self._quadros):
+                if quadro.t_monotonic > t_clique:
+                    continue  # Copiado depois do clique: pode já mostrar a reação
+                if t_clique - quadro.t_monotonic <= self.idade_maxima and quadro.monitor.contem(x, y):
+                    escolhido = quadro
+                break
+        if escolhido is None:
+            self.ao_vivo += 1
+            return None
+        self.usados += 1
+        rect = escolhido.rect
+        return escolhido.frame, (x - rect[0], y - rect[1]), rect, t_clique - escolhido.t_monotonic
@@ -0,0 +1,191 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+try:
+    from modules.render_cache import desenhar_timestamp
+except ImportError:
+    from render_cache import desenhar_timestamp
+
+
+class GeracaoCancelada(Exception):
+    """Geração interrompida pelo usuário"""
+
+
+def perfil_exportacao(perfil, largura_polegadas):
+    """
+    Resolve o perfil de exportação do DOCUMENT_SETTINGS para a largura real
+    de impressão. Retorna None se o perfil estiver desativado.
+    """
+    if not perfil or not perfil.get("enabled", True):
+        return None
+    largura_px = int(round(largura_polegadas * perfil.get("target_dpi", 200)))
+    if perfil.get("max_width_px"):
+        largura_px = min(largura_px, perfil["max_width_px"])
+    formato = str(perfil.get("format", "png")).lower()
+    if formato not in ("png", "jpeg"):
+        # python-docx só reconhece PNG/JPEG/GIF/BMP/TIFF (WebP não é aceito)
+        print(f"⚠️ Formato '{formato}' não suportado no DOCX, usando PNG")
+        formato = "png"
+    return {
+        "largura_px": largura_px,
+        "format": formato,
+        "png_optimize": bool(perfil.get("png_optimize", True)),
+        "png_compress_level": int(perfil.get("png_compress_level", 9)),
+        "quantize_colors": int(perfil.get("quantize_colors", 0) or 0),
+        "jpeg_quality": int(perfil.get("jpeg_quality", 85)),
+    }
+
+
+def exportar_imagem(img, destino, exportacao):
+    """Reamostra uma única vez para a largura de impressão e codifica conforme o perfil"""
+    largura_px = exportacao["largura_px"]
+    if img.width > largura_px:
+        altura_px = max(1, int(round(img.height * largura_px / img.width)))
+        img = img.resize((largura_px, altura_px), Image.LANCZOS)
+
+    if exportacao["format"] == "jpeg":
+        img.convert("RGB").save(destino, "JPEG", quality=exportacao["jpeg_quality"], optimize=True)
+        return
+
+    if exportacao["quantize_colors"]:
+        # Capturas de tela costumam ter poucas cores: paleta reduz bastante o PNG
+        img = img.quantize(colors=min(256, exportacao["quantize_colors"]),
+                           method=Image.FASTOCTREE)
+    img.save(destino, "PNG", optimize=exportacao["png_optimize"],
+             compress_level=exportacao["png_compress_level"])
+
+
+def formatar_tamanho(num_bytes):
+    for unidade in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unidade}" if unidade == "B" else f"{num_bytes:.1f} {unidade}"
+        num_bytes /= 1024.0
+    return f"{num_bytes:.1f} GB"
+
+
+class TarefaImagem:
+    """
+    Preparação de uma evidência para o DOCX. Precisa ser serializável
+    (pickle) para ir aos processos do pool: apenas tipos simples.
+    Sem ``destino`` a imagem original é usada como está.
+    """
+
+    __slots__ = ("indice", "origem", "evidencia_meta", "destino", "tamanho_padrao", "exportacao")
+
+    def __init__(self, indice, origem, evidencia_meta=None, destino=None, tamanho_padrao=24, exportacao=None):
+        self.indice = indice
+        self.origem = origem
+        self.evidencia_meta = evidencia_meta
+        self.destino = destino
+        self.tamanho_padrao = tamanho_padrao
+        self.exportacao = exportacao
+
+
+class ResultadoImagem:
+    """Imagem pronta para ``run.add_picture`` (ou o erro ocorrido)"""
+
+    __slots__ = ("indice", "origem", "caminho", "erro", "renderizado", "bytes_origem", "bytes_final")
+
+    def __init__(self, indice, origem, caminho=None, erro=None, renderizado=False):
+        self.indice = indice
+        self.origem = origem
+        self.caminho = caminho
+        self.erro = erro
+        self.renderizado = renderizado
+        self.bytes_origem = 0
+        self.bytes_final = 0
+
+
+def preparar_imagem(tarefa):
+    """Executado no pool: timestamp (se houver), reamostragem e codificação"""
+    if not os.path.exists(tarefa.origem):
+        return ResultadoImagem(tarefa.indice, tarefa.origem)
+    try:
+        caminho = tarefa.origem
+        renderizado = False
+
+        if tarefa.destino:
+            caminho = tarefa.destino
+            if not os.path.exists(caminho):
+                with Image.open(tarefa.origem) as original:
+                    original.load()
+                    img = original.convert("RGBA") if tarefa.evidencia_meta else original.copy()
+                if tarefa.evidencia_meta:
+                    desenhar_timestamp(img, tarefa.evidencia_meta, tarefa.tamanho_padrao)
+
+                tmp_path = f"{caminho}.{os.getpid()}.tmp"
+                if tarefa.exportacao:
+                    exportar_imagem(img, tmp_path, tarefa.exportacao)
+                else:
+                    img.save(tmp_path, "PNG")
+                os.replace(tmp_path, caminho)
+                renderizado = True
+
+        resultado = ResultadoImagem(tarefa.indice, tarefa.origem, caminho=caminho, renderizado=renderizado)
+        resultado.bytes_origem = os.path.getsize(tarefa.origem)
+        resultado.bytes_final = os.path.getsize(caminho)
+        return resultado
+    except Exception as e:
+        return ResultadoImagem(tarefa.indice, tarefa.origem, erro=str(e))
+
+
+def _preparar_em_serie(tarefas, progresso, cancelado):
+    total = len(tarefas)
+    for i, tarefa in enumerate(tarefas, 1):
+        if cancelado and cancelado():
+            raise GeracaoCancelada()
+        resultado = preparar_imagem(tarefa)
+        if progresso:
+            progresso(i, total)
+        yield resultado
+
+
+def preparar_imagens(tarefas, workers=None, progresso=None, cancelado=None):
+    """
+    Prepara as imagens em um ProcessPoolExecutor e entrega os resultados
+    NA ORDEM das tarefas, à medida que ficam prontos.
+
+    Apenas ``2 * workers`` tarefas ficam em voo por vez, para que o montador
+    do documento consuma enquanto o pool trabalha. ``progresso(feitas, total)``
+    é chamado a cada resultado entregue; se ``cancelado()`` retornar True, as
+    tarefas pendentes são descartadas e ``GeracaoCancelada`` é lançada.
+    """
+    tarefas = list(tarefas)
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(tarefas))
+    if workers <= 1:
+        yield from _preparar_em_serie(tarefas, progresso, cancelado)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError) as e:
+        print(f"⚠️ Pool de processos indisponível ({e}), preparando imagens em série")
+        yield from _preparar_em_serie(tarefas, progresso, cancelado)
+        return
+
+    total = len(tarefas)
+    pendentes = deque()
+    proxima = 0
+    entregues = 0
+    try:
+        while entregues < total:
+            if cancelado and cancelado():
+                raise GeracaoCancelada()
+
+            while proxima < total and len(pendentes) < workers * 2:
+                pendentes.append(pool.submit(preparar_imagem, tarefas[proxima]))
+                proxima += 1
+
+            resultado = pendentes.popleft().result()
+            entregues += 1
+            if progresso:
+                progresso(entregues, total)
+            yield resultado
+    finally:
+        for futuro in pendentes:
+            futuro.cancel()
+        pool.shutdown(wait=True)
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime
+
+from PIL import ImageChops
+
+try:
+    from modules.capture_pipeline import frame_to_image
+except ImportError:
+    from capture_pipeline import frame_to_image
+
+
+class DetectorMudancas:
+    """
+    Compara quadros em miniatura (escala de cinza reduzida por ``fator``): a
+    diferença é calculada pelo PIL em C sobre poucos milhares de pixels, sem
+    comparar a tela inteira. Um pixel conta como alterado quando a diferença
+    passa de ``tolerancia`` níveis (ignora ruído de compressão/antialiasing);
+    o quadro conta como novo quando a proporção de pixels alterados passa de
+    ``limiar``.
+    """
+
+    def __init__(self, fator=8, tolerancia=24, limiar=0.01):
+        self.fator = max(1, int(fator))
+        self.tolerancia = max(0, min(254, int(tolerancia)))
+        self.limiar = float(limiar)
+        self._referencia = None
+        self._tabela = [255 if v > self.tolerancia else 0 for v in range(256)]
+
+    def miniatura(self, frame):
+        imagem = frame_to_image(frame)
+        if self.fator > 1:
+            imagem = imagem.reduce(self.fator)
+        return imagem.convert("L")
+
+    def proporcao(self, a, b):
+        """Fração (0 a 1) dos pixels da miniatura que mudaram"""
+        if a.size != b.size:
+            return 1.0
+        alterados = ImageChops.difference(a, b).point(self._tabela).histogram()[255]
+        return alterados / float(a.size[0] * a.size[1] or 1)
+
+    def avaliar(self, frame):
+        """Retorna (mudou, proporção, miniatura) em relação ao último quadro aceito"""
+        miniatura = self.miniatura(frame)
+        if self._referencia is None:
+            return True, 1.0, miniatura
+        proporcao = self.proporcao(self._referencia, miniatura)
+        return proporcao > self.limiar, proporcao, miniatura
+
+    def aceitar(self, miniatura):
+        """Passa a comparar os próximos quadros com este"""
+        self._referencia = miniatura
+
+    def reiniciar(self):
+        self._referencia = None
+
+
+class CapturaPorIntervalo:
+    """
+    Captura periódica em uma thread, ao lado do listener de cliques.
+
+    A cada ``intervalo`` segundos chama ``capturar()`` -> (quadro, rel,
+    método) e compara o quadro com o último gravado. Só quando a tela mudou
+    chama ``entregar(quadro, rel, método, t_monotonic, momento, proporção)``,
+    que devolve True se a evidência foi aceita. A comparação é com o último
+    quadro gravado (e não com o imediatamente anterior), para que mudanças
+    lentas, como uma barra de progresso, acabem gerando uma nova evidência.
+    """
+
+    def __init__(self, capturar, entregar, intervalo=5.0, detector=None):
+        self.capturar = capturar
+        self.entregar = entregar
+        self.intervalo = max(0.2, float(intervalo))
+        self.detector = detector or DetectorMudancas()
+
+        self._parar = threading.Event()
+        self._ativo = threading.Event()
+        self._ativo.set()
+        self._thread = None
+
+        self.verificados = 0
+        self.gravados = 0
+
+    @property
+    def em_execucao(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="captura-intervalo", daemon=True)
+        self._thread.start()
+
+    def pausar(self):
+        self._ativo.clear()
+
+    def retomar(self):
+        self._ativo.set()
+
+    def stop(self, timeout=5.0):
+        if self._thread:
+            self._parar.set()
+            self._ativo.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._parar.wait(self.intervalo):
+            if not self._ativo.is_set():
+                continue
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"⚠️  Captura por intervalo falhou: {e}")
+
+    def verificar(self):
+        """Uma rodada: captura, compara e entrega se mudou. Retorna True se gravou"""
+        t_captura = time.monotonic()
+        momento = datetime.now()
+        frame, rel, metodo = self.capturar()
+        self.verificados += 1
+        mudou, proporcao, miniatura = self.detector.avaliar(frame)
+        if not mudou:
+            return False
+        if self.entregar(frame, rel, metodo, t_captura, momento, proporcao):
+            self.detector.aceitar(miniatura)
+            self.gravados += 1
+            return True
+        return False
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+try:
+    from modules.evidence_catalog import EvidenceCatalog
+except ImportError:
+    from evidence_catalog import EvidenceCatalog
+
+ARQUIVO_METADADOS = "evidencias_metadata.json"
+ARQUIVO_JOURNAL = "evidencias_metadata.journal.jsonl"
+SUFIXO_COMPACTANDO = ".compactando"
+
+
+def metadata_vazio():
+    return {"evidencias": [], "proximo_id": 1}
+
+
+FORMATOS_IMAGEM = ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.tif']
+
+
+def metadata_da_listagem(dir_path, extensoes=FORMATOS_IMAGEM):
+    """Metadados iniciais para uma pasta sem metadados: uma evidência por imagem, com a data do arquivo"""
+    metadata = metadata_vazio()
+    for arquivo in os.listdir(dir_path):
+        _, ext = os.path.splitext(arquivo)
+        if ext.lower() in extensoes:
+            caminho_completo = os.path.join(dir_path, arquivo)
+            timestamp = datetime.fromtimestamp(os.path.getmtime(caminho_completo))
+
+            metadata["evidencias"].append({
+                "id": metadata["proximo_id"],
+                "arquivo": arquivo,
+                "comentario": "",
+                "timestamp": timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                "excluida": False
+            })
+            metadata["proximo_id"] += 1
+    return metadata
+
+
+class MetadataStore:
+    """
+    Metadados das evidências com journal append-only.
+
+    Cada alteração (add, comment, exclude, timestamp, repeat) vira uma linha JSON em
+    ``evidencias_metadata.journal.jsonl``; o snapshot ``evidencias_metadata.json``
+    é reescrito em segundo plano (compactação) com troca atômica do arquivo.
+    Snapshots antigos, sem journal, continuam sendo lidos normalmente.
+    """
+
+    def __init__(self, dir_path, limite_compactacao=200):
+        self.dir_path = dir_path
+        self.snapshot_path = os.path.join(dir_path, ARQUIVO_METADADOS)
+        self.journal_path = os.path.join(dir_path, ARQUIVO_JOURNAL)
+        self.limite_compactacao = limite_compactacao
+
+        self.metadata = metadata_vazio()
+        self.catalog = EvidenceCatalog()
+        self._seq = 0
+        self._pendentes = 0
+        self._journal = None
+        self._lock = threading.RLock()
+        self._lock_compactacao = threading.Lock()
+        self._thread_compactacao = None
+
+    # ------------------------------------------------------------------ leitura
+    def carregar(self):
+        """Lê o snapshot (legado ou não) e reaplica o journal. Retorna o dict de metadados."""
+        with self._lock:
+            self._fechar_journal()
+            metadata = metadata_vazio()
+            seq_snapshot = 0
+
+            if os.path.exists(self.snapshot_path):
+                try:
+                    with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                    metadata.setdefault("evidencias", [])
+                    metadata.setdefault("proximo_id", 1)
+                    seq_snapshot = metadata.pop("journal_seq", 0)
+                except Exception as e:
+                    print(f"⚠️ Erro ao ler metadados ({self.snapshot_path}): {e}")
+                    metadata = metadata_vazio()
+
+            self.metadata = metadata
+            self.catalog.carregar(metadata["evidencias"])
+            self._seq = seq_snapshot
+
+            # Journal de uma compactação interrompida + journal atual
+            reaplicadas = 0
+            for caminho in (self.journal_path + SUFIXO_COMPACTANDO, self.journal_path):
+                for registro in self._ler_journal(caminho):
+                    if registro.get("seq", 0) <= seq_snapshot:
+                        continue
+                    self._aplicar(registro)
+                    self._seq = max(self._seq, registro["seq"])
+                    reaplicadas += 1
+
+            self._pendentes = reaplicadas
+            if reaplicadas:
+                print(f"📒 {reaplicadas} alteração(ões) reaplicada(s) do journal de metadados")
+            return self.metadata
+
+    @staticmethod
+    def _ler_journal(caminho):
+        if not os.path.exists(caminho):
+            return
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    # Última linha truncada (aplicativo encerrado no meio da escrita)
+                    print("⚠️ Linha inválida ignorada no journal de metadados")
+
+    # ------------------------------------------------------------------ mutações
+    def _aplicar(self, registro):
+        op = registro.get("op")
+        if op == "add":
+            evidencia = registro["evidencia"]
+            self.metadata["evidencias"].append(evidencia)
+            self.metadata["proximo_id"] = max(self.metadata["proximo_id"], evidencia["id"] + 1)
+            self.catalog.adicionar(evidencia)
+            return
+
+        evidencia = self.catalog.por_arquivo(registro.get("arquivo"))
+        if evidencia is None:
+            return
+        if op == "comment":
+            evidencia["comentario"] = registro["comentario"]
+        elif op == "exclude":
+            self.catalog.excluir(evidencia["arquivo"])
+        elif op == "timestamp":
+            evidencia["timestamp_posicao"] = {"x": registro["x"], "y": registro["y"]}
+        elif op == "repeat":
+            evidencia.setdefault("cliques_adicionais", []).append(registro["clique"])
+
+    def _registrar(self, registro):
+        """Aplica a alteração em memória e acrescenta a linha no journal"""
+        with self._lock:
+            self._seq += 1
+            registro["seq"] = self._seq
+            self._aplicar(registro)
+
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._journal.flush()
+
+            self._pendentes += 1
+            if self._pendentes >= self.limite_compactacao:
+                self.compactar_em_segundo_plano()
+
+    def adicionar(self, evidencia):
+        self._registrar({"op": "add", "evidencia": evidencia})
+
+    def comentar(self, arquivo, comentario):
+        """Altera o comentário; não grava nada se o texto não mudou"""
+        evidencia = self.catalog.por_arquivo(arquivo)
+        if evidencia is None or evidencia.get("comentario", "") == comentario:
+            return False
+        self._registrar({"op": "comment", "arquivo": arquivo, "comentario": comentario})
+        return True
+
+    def excluir(self, arquivo):
+        self._registrar({"op": "exclude", "arquivo": arquivo})
+
+    def mover_timestamp(self, arquivo, x, y):
+        self._registrar({"op": "timestamp", "arquivo": arquivo, "x": x, "y": y})
+
+    def registrar_repeticao(self, arquivo, clique):
+        """Clique em tela idêntica a uma evidência existente: só as coordenadas são guardadas nela"""
+        self._registrar({"op": "repeat", "arquivo": arquivo, "clique": clique})
+
+    def substituir(self, metadata):
+        """Substitui todos os metadados e grava o snapshot imediatamente"""
+        with self._lock:
+            self.metadata = metadata
+            self.catalog.carregar(metadata["evidencias"])
+            self._pendentes += 1
+        self.compactar()
+
+    # ------------------------------------------------------------------ compactação
+    def _fechar_journal(self):
+        if self._journal:
+            try:
+                self._journal.close()
+            except Exception:
+                pass
+            self._journal = None
+
+    def compactar(self):
+        """Grava o snapshot com troca atômica e descarta o journal já incorporado"""
+        with self._lock_compactacao:
+            self._compactar()
+
+    def _compactar(self):
+        with self._lock:
+            seq = self._seq
+            conteudo = dict(self.metadata, journal_seq=seq)
+            conteudo = json.dumps(conteudo, indent=2, ensure_ascii=False)
+
+            # O journal atual é "congelado"; novas alterações vão para um arquivo novo
+            self._fechar_journal()
+            congelado = self.journal_path + SUFIXO_COMPACTANDO
+            if os.path.exists(self.journal_path):
+                if os.path.exists(congelado):
+                    # Sobra de compactação interrompida: junta ao journal atual
+                    with open(congelado, 'a', encoding='utf-8') as destino, \
+                         open(self.journal_path, 'r', encoding='utf-8') as origem:
+                        destino.write(origem.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, congelado)
+            self._pendentes = 0
+
+        # Escrita pesada fora do lock: cliques continuam gravando no journal novo
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        if os.path.exists(congelado):
+            os.remove(congelado)
+
+    def compactar_em_segundo_plano(self):
+        if self._thread_compactacao and self._thread_compactacao.is_alive():
+            return
+        self._thread_compactacao = threading.Thread(target=self._compactar_seguro,
+                                                    name="compactacao-metadados", daemon=True)
+        self._thread_compactacao.start()
+
+    def _compactar_seguro(self):
+        try:
+            self.compactar()
+        except Exception as e:
+            print(f"⚠️ Erro ao compactar metadados: {e}")
+
+    def fechar(self, compactar=True):
+        """
+        Aguarda a compactação em andamento e grava o snapshot final. Com
+        ``compactar=False`` apenas fecha o journal (leitura de uma pasta que
+        outra instância pode estar usando: snapshot e journal ficam intactos).
+        """
+        if self._thread_compactacao:
+            self._thread_compactacao.join()
+            self._thread_compactacao = None
+        with self._lock:
+            precisa_compactar = compactar and (self._pendentes or os.path.exists(self.journal_path))
+        if precisa_compactar:
+            self.compactar()
+        with self._lock:
+            self._fechar_journal()
+
+    def remover_arquivos(self):
+        """Exclui snapshot e journal (usado quando as evidências não são mantidas)"""
+        self.fechar()
+        removidos = []
+        for caminho in (self.snapshot_path, self.journal_path, self.journal_path + SUFIXO_COMPACTANDO):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+                removidos.append(caminho)
+        return removidos
@@ -0,0 +1,103 @@
+import collections
+import threading
+
+from PIL import Image
+
+try:
+    from modules.capture_pipeline import frame_to_image
+    from modules.interval_capture import DetectorMudancas
+except ImportError:
+    from capture_pipeline import frame_to_image
+    from interval_capture import DetectorMudancas
+
+
+def dhash(imagem, tamanho=16):
+    """
+    Hash perceptual por diferença (dHash): a imagem é reduzida para
+    (tamanho + 1) x tamanho em tons de cinza e cada bit indica se o pixel é
+    mais claro que o vizinho da direita. Resulta em tamanho² bits (inteiro).
+    """
+    reduzida = imagem.resize((tamanho + 1, tamanho), Image.BOX).convert("L")
+    pixels = reduzida.tobytes()
+    largura = tamanho + 1
+    valor = 0
+    for linha in range(tamanho):
+        base = linha * largura
+        for coluna in range(tamanho):
+            valor = (valor << 1) | (pixels[base + coluna] > pixels[base + coluna + 1])
+    return valor
+
+
+def distancia(a, b):
+    """Distância de Hamming entre dois hashes"""
+    return bin(a ^ b).count("1")
+
+
+class Assinatura:
+    """Hash perceptual e miniatura de uma captura"""
+
+    __slots__ = ("hash", "miniatura")
+
+    def __init__(self, valor, miniatura):
+        self.hash = valor
+        self.miniatura = miniatura
+
+
+class SupressorDuplicatas:
+    """
+    Guarda a assinatura das últimas ``historico`` evidências gravadas e aponta
+    quando uma nova captura é praticamente igual a uma delas.
+
+    O hash (distância de Hamming até ``distancia_maxima`` bits) descarta
+    rapidamente as telas diferentes. Como um hash de tela inteira não enxerga
+    uma palavra alterada, a repetição só é confirmada pela miniatura (1/4 da
+    tela): no máximo ``proporcao_maxima`` dos pixels pode ter mudado além do
+    ruído de ``tolerancia`` níveis (0 = nenhum pixel).
+
+    ``procurar`` pode ser chamado pelos workers (para não codificar o PNG de
+    uma repetição já conhecida) e de novo na confirmação, em ordem de clique;
+    só ``manter`` altera o histórico, sempre na confirmação.
+    """
+
+    def __init__(self, historico=5, distancia_maxima=6, tamanho=16, proporcao_maxima=0.0,
+                 tolerancia=24):
+        self.tamanho = max(4, int(tamanho))
+        self.distancia_maxima = max(0, int(distancia_maxima))
+        self.proporcao_maxima = max(0.0, float(proporcao_maxima))
+        self.detector = DetectorMudancas(fator=4, tolerancia=tolerancia)
+        self._recentes = collections.deque(maxlen=max(1, int(historico)))
+        self._lock = threading.Lock()
+        self.suprimidas = 0
+
+    def hash_de(self, frame):
+        """Assinatura da captura (calcular antes de desenhar o marcador do clique)"""
+        imagem = frame_to_image(frame)
+        return Assinatura(dhash(imagem, self.tamanho), self.detector.miniatura(imagem))
+
+    def procurar(self, assinatura):
+        """Arquivo da evidência recente igual à captura, ou None se não houver repetição"""
+        with self._lock:
+            recentes = list(self._recentes)
+        candidatos = sorted((distancia(mantida.hash, assinatura.hash), ordem, mantida, arquivo)
+                            for ordem, (mantida, arquivo) in enumerate(recentes))
+        for d, _ordem, mantida, arquivo in candidatos:
+            if d > self.distancia_maxima:
+                break
+            if self.detector.proporcao(mantida.miniatura, assinatura.miniatura) <= self.proporcao_maxima:
+                return arquivo
+        return None
+
+    def manter(self, assinatura, arquivo):
+        with self._lock:
+            self._recentes.append((assinatura, arquivo))
+
+    def esquecer(self, arquivo):
+        """Remove uma evidência excluída do histórico"""
+        with self._lock:
+            self._recentes = collections.deque(
+                (item for item in self._recentes if item[1] != arquivo), maxlen=self._recentes.maxlen)
+
+    def reiniciar(self):
+        with self._lock:
+            self._recentes.clear()
+            self.suprimidas = 0
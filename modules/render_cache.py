@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Estilo do selo de timestamp. Qualquer mudança aqui (ou na VERSAO_RENDER)
+# muda a chave do cache e força uma nova renderização.
+VERSAO_RENDER = 1
+ESTILO_TIMESTAMP = {
+    "fonte": "arial.ttf",
+    "padding_horizontal": 20,
+    "padding_vertical": 12,
+    "borda_radius": 8,
+    "margem": 10,
+}
+
+CAMPOS_TIMESTAMP = ("timestamp_texto", "timestamp_cor", "timestamp_fundo",
+                    "timestamp_tamanho", "timestamp_posicao")
+
+PASTA_CACHE = ".render_cache"
+
+
+def _cor_fundo_rgba(fundo_cor):
+    """Converte #RRGGBBAA em tupla RGBA (fallback: preto 70%)"""
+    if fundo_cor.startswith("#") and len(fundo_cor) == 9:
+        return (int(fundo_cor[1:3], 16), int(fundo_cor[3:5], 16),
+                int(fundo_cor[5:7], 16), int(fundo_cor[7:9], 16))
+    return (0, 0, 0, 178)
+
+
+def desenhar_timestamp(img, evidencia_meta, tamanho_padrao=24, estilo=None):
+    """
+    Desenha o timestamp com fundo arredondado semi-transparente sobre ``img``
+    (RGBA, alterada no lugar), centralizado na posição percentual dos metadados.
+    """
+    estilo = estilo or ESTILO_TIMESTAMP
+    draw = ImageDraw.Draw(img)
+
+    # Calcular posição em pixels
+    img_width, img_height = img.size
+    pos_x_percent = evidencia_meta["timestamp_posicao"]["x"]
+    pos_y_percent = evidencia_meta["timestamp_posicao"]["y"]
+
+    # Configurações do texto
+    texto = evidencia_meta["timestamp_texto"]
+    texto_cor = evidencia_meta["timestamp_cor"]
+    fundo_rgba = _cor_fundo_rgba(evidencia_meta.get("timestamp_fundo", "#000000B2"))
+    tamanho = evidencia_meta.get("timestamp_tamanho", tamanho_padrao)
+
+    try:
+        font = ImageFont.truetype(estilo["fonte"], tamanho)
+    except Exception:
+        font = ImageFont.load_default()
+
+    padding_horizontal = estilo["padding_horizontal"]
+    padding_vertical = estilo["padding_vertical"]
+    margem = estilo["margem"]
+
+    # Tamanho do texto e do fundo
+    bbox = draw.textbbox((0, 0), texto, font=font)
+    texto_ascendente = -bbox[1]
+    texto_largura = bbox[2] - bbox[0]
+    texto_altura = bbox[3] - bbox[1]
+    fundo_largura = texto_largura + (padding_horizontal * 2)
+    fundo_altura = texto_altura + (padding_vertical * 2)
+
+    # Fundo centralizado na posição percentual
+    fundo_x1 = int((img_width * pos_x_percent) - (fundo_largura / 2))
+    fundo_y1 = int((img_height * pos_y_percent) - (fundo_altura / 2))
+    fundo_x2 = fundo_x1 + fundo_largura
+    fundo_y2 = fundo_y1 + fundo_altura
+
+    # Garantir que o fundo não saia dos limites da imagem
+    if fundo_x1 < margem:
+        fundo_x1 = margem
+    elif fundo_x2 > img_width - margem:
+        fundo_x1 = img_width - margem - fundo_largura
+
+    if fundo_y1 < margem:
+        fundo_y1 = margem
+    elif fundo_y2 > img_height - margem:
+        fundo_y1 = img_height - margem - fundo_altura
+
+    # Texto centralizado no fundo (considerando a métrica da fonte)
+    texto_x = fundo_x1 + padding_horizontal
+    texto_y = fundo_y1 + (fundo_altura - texto_altura) // 2 + texto_ascendente
+
+    # Fundo com cantos arredondados
+    mask = Image.new("L", (fundo_largura, fundo_altura), 0)
+    ImageDraw.Draw(mask).rounded_rectangle(
+        [0, 0, fundo_largura, fundo_altura],
+        radius=estilo["borda_radius"],
+        fill=255
+    )
+    fundo_img = Image.new("RGBA", (fundo_largura, fundo_altura), fundo_rgba)
+    img.paste(fundo_img, (fundo_x1, fundo_y1), mask)
+
+    draw.text((texto_x, texto_y), texto, fill=texto_cor, font=font)
+    return img
+
+
+def renderizar_timestamp(caminho_origem, caminho_destino, evidencia_meta, tamanho_padrao=24):
+    """Abre a captura original, aplica o timestamp e grava em ``caminho_destino``"""
+    with Image.open(caminho_origem) as origem:
+        img = origem.convert("RGBA")
+    desenhar_timestamp(img, evidencia_meta, tamanho_padrao)
+    img.save(caminho_destino, "PNG")
+
+
+class RenderCache:
+    """
+    Cache endereçado por conteúdo das imagens preparadas para o documento.
+
+    A chave combina o hash da captura original, os campos de timestamp dos
+    metadados, o estilo de renderização e o perfil de exportação; a captura
+    original nunca é alterada.
+    O hash de cada arquivo é memorizado por (tamanho, mtime) no índice do cache
+    para não reler arquivos que não mudaram.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._usados = set()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._carregar_indice()
+
+    @classmethod
+    def para_diretorio(cls, evidence_dir):
+        return cls(os.path.join(evidence_dir, PASTA_CACHE))
+
+    def _carregar_indice(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._hashes = json.load(f).get("hashes", {})
+        except (OSError, ValueError):
+            self._hashes = {}
+
+    def salvar_indice(self):
+        with self._lock:
+            conteudo = json.dumps({"hashes": self._hashes}, ensure_ascii=False)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(tmp_path, self.index_path)
+
+    def hash_arquivo(self, caminho):
+        """Hash do conteúdo da captura (reaproveitado enquanto tamanho/mtime não mudam)"""
+        stat = os.stat(caminho)
+        assinatura = [stat.st_size, stat.st_mtime_ns]
+        chave = os.path.abspath(caminho)
+        with self._lock:
+            registro = self._hashes.get(chave)
+            if registro and registro[0] == assinatura:
+                return registro[1]
+
+        sha = hashlib.sha1()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(bloco)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._hashes[chave] = [assinatura, digest]
+        return digest
+
+    def chave(self, caminho_origem, evidencia_meta=None, tamanho_padrao=24, exportacao=None):
+        """Chave do resultado: conteúdo da captura + timestamp (se houver) + estilo + perfil de exportação"""
+        campos = None
+        if evidencia_meta:
+            campos = {campo: evidencia_meta.get(campo) for campo in CAMPOS_TIMESTAMP}
+            if campos["timestamp_tamanho"] is None:
+                campos["timestamp_tamanho"] = tamanho_padrao
+        descricao = json.dumps({
+            "origem": self.hash_arquivo(caminho_origem),
+            "timestamp": campos,
+            "estilo": ESTILO_TIMESTAMP if campos else None,
+            "exportacao": exportacao,
+            "versao": VERSAO_RENDER,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(descricao.encode("utf-8")).hexdigest()
+
+    def caminho(self, chave, extensao=".png"):
+        return os.path.join(self.cache_dir, f"{chave}{extensao}")
+
+    def reservar(self, caminho_origem, evidencia_meta=None, tamanho_padrao=24, exportacao=None):
+        """
+        Calcula o caminho de destino no cache e o marca como usado, sem renderizar.
+        A renderização fica a cargo de quem chamou (ex.: pool de preparação de imagens).
+        """
+        chave = self.chave(caminho_origem, evidencia_meta, tamanho_padrao, exportacao)
+        with self._lock:
+            self._usados.add(chave)
+        extensao = ".jpg" if exportacao and exportacao.get("format") == "jpeg" else ".png"
+        return self.caminho(chave, extensao)
+
+    def podar(self):
+        """Remove renderizações que não foram usadas desde a criação do cache"""
+        removidos = 0
+        with self._lock:
+            usados = set(self._usados)
+        for nome in os.listdir(self.cache_dir):
+            chave, ext = os.path.splitext(nome)
+            if ext in (".png", ".jpg") and chave not in usados:
+                try:
+                    os.remove(os.path.join(self.cache_dir, nome))
+                    removidos += 1
+                except OSError:
+                    pass
+        return removidos
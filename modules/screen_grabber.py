@@ -0,0 +1,305 @@
+import bisect
+import threading
+import time
+
+try:
+    import win32api
+    import win32con
+    WIN32_AVAILABLE = True
+except ImportError:
+    win32api = None
+    win32con = None
+    WIN32_AVAILABLE = False
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    mss = None
+    MSS_AVAILABLE = False
+
+try:
+    from modules.capture_pipeline import RawFrame
+except ImportError:
+    from capture_pipeline import RawFrame
+
+
+# Índices do GetSystemMetrics usados na assinatura da configuração de vídeo
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+SM_CMONITORS = 80
+
+
+def intersecao(a, b):
+    """Interseção de dois retângulos (left, top, right, bottom) ou None se não se cruzam"""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[2], b[2]), min(a[3], b[3])
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right, bottom)
+
+
+def retangulo_centrado(x, y, largura, altura, limite):
+    """Retângulo largura x altura centrado no ponto, deslocado para caber em ``limite``"""
+    largura = min(int(largura), limite[2] - limite[0])
+    altura = min(int(altura), limite[3] - limite[1])
+    left = min(max(x - largura // 2, limite[0]), limite[2] - largura)
+    top = min(max(y - altura // 2, limite[1]), limite[3] - altura)
+    return (left, top, left + largura, top + altura)
+
+
+def contem(externo, interno):
+    return (externo[0] <= interno[0] and externo[1] <= interno[1]
+            and interno[2] <= externo[2] and interno[3] <= externo[3])
+
+
+class MonitorInfo:
+    """Monitor da tabela em cache: retângulos no formato (left, top, right, bottom)"""
+
+    __slots__ = ("indice", "monitor", "work")
+
+    def __init__(self, indice, monitor, work=None):
+        self.indice = indice
+        self.monitor = tuple(monitor)
+        self.work = tuple(work) if work else self.monitor
+
+    def area(self, tipo="monitor"):
+        return self.work if tipo == "work" else self.monitor
+
+    def contem(self, x, y):
+        left, top, right, bottom = self.monitor
+        return left <= x < right and top <= y < bottom
+
+    def distancia(self, x, y):
+        """Distância (ao quadrado) do ponto até o monitor - equivale ao MONITOR_DEFAULTTONEAREST"""
+        left, top, right, bottom = self.monitor
+        dx = max(left - x, 0, x - (right - 1))
+        dy = max(top - y, 0, y - (bottom - 1))
+        return dx * dx + dy * dy
+
+    def __repr__(self):
+        return f"MonitorInfo({self.indice}, monitor={self.monitor}, work={self.work})"
+
+
+class MssBackend:
+    """
+    Backend real: uma instância do mss por thread (o mss não é thread-safe),
+    criada uma única vez e reaproveitada durante toda a sessão.
+    """
+
+    nome = "MSS"
+
+    def __init__(self, estimador_barra=None):
+        self._local = threading.local()
+        self._instancias = []
+        self._lock = threading.Lock()
+        self._estimador_barra = estimador_barra
+        if WIN32_AVAILABLE:
+            self.nome = "Win32+MSS"
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._instancias.append(sct)
+        return sct
+
+    def assinatura(self):
+        """Identifica a configuração de vídeo atual (barata o suficiente para cada clique)"""
+        if WIN32_AVAILABLE:
+            metricas = tuple(win32api.GetSystemMetrics(i) for i in (
+                SM_CMONITORS, SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN,
+                SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN))
+            # A work area do primário muda quando a barra de tarefas é movida/redimensionada
+            primario = win32api.MonitorFromPoint((0, 0), win32con.MONITOR_DEFAULTTOPRIMARY)
+            return metricas + tuple(win32api.GetMonitorInfo(primario)["Work"])
+        # Sem Win32 não há como consultar barato: o ScreenGrabber revalida por tempo
+        return None
+
+    def listar_monitores(self):
+        """Retorna a lista de (retângulo do monitor, retângulo da work area)"""
+        if WIN32_AVAILABLE:
+            monitores = []
+            for handle, _hdc, _rect in win32api.EnumDisplayMonitors(None, None):
+                info = win32api.GetMonitorInfo(handle)
+                monitores.append((tuple(info["Monitor"]), tuple(info["Work"])))
+            return monitores
+
+        # mss guarda a lista de monitores na instância: usar uma nova para enxergar mudanças
+        with mss.mss() as sct:
+            monitores_mss = sct.monitors[1:] or sct.monitors[:1]
+        monitores = []
+        for m in monitores_mss:
+            rect = (m["left"], m["top"], m["left"] + m["width"], m["top"] + m["height"])
+            work = rect
+            if self._estimador_barra:
+                # 🔥 ESTIMAR WORK AREA (recortar barra de tarefas)
+                work = rect[:3] + (rect[3] - self._estimador_barra(m["height"]),)
+            monitores.append((rect, work))
+        return monitores
+
+    def grab(self, rect):
+        left, top, right, bottom = rect
+        screenshot = self._sct().grab({
+            "left": left,
+            "top": top,
+            "width": right - left,
+            "height": bottom - top
+        })
+        return RawFrame.from_mss(screenshot)
+
+    def close(self):
+        with self._lock:
+            instancias, self._instancias = self._instancias, []
+        for sct in instancias:
+            try:
+                sct.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+class FakeGrabberBackend:
+    """
+    Backend falso para testes sem tela (ex.: Linux headless).
+    Os monitores são informados como lista de (monitor, work) e podem ser
+    trocados com ``set_monitores`` para simular mudança de configuração.
+    """
+
+    nome = "Fake"
+
+    def __init__(self, monitores=None, cor=(0, 0, 0)):
+        self._monitores = list(monitores or [((0, 0, 1920, 1080), (0, 0, 1920, 1040))])
+        self._versao = 0
+        self._pixel = bytes((cor[2], cor[1], cor[0], 255))
+        self.grabs = []
+        self.listagens = 0
+
+    def set_monitores(self, monitores):
+        self._monitores = list(monitores)
+        self._versao += 1
+
+    def assinatura(self):
+        return self._versao
+
+    def listar_monitores(self):
+        self.listagens += 1
+        return list(self._monitores)
+
+    def grab(self, rect):
+        self.grabs.append(tuple(rect))
+        largura, altura = rect[2] - rect[0], rect[3] - rect[1]
+        return RawFrame((largura, altura), self._pixel * (largura * altura))
+
+    def close(self):
+        pass
+
+
+class ScreenGrabber:
+    """
+    Sessão de captura de longa duração.
+
+    Mantém o backend aberto e uma tabela de monitores/work areas em cache,
+    reconstruída apenas quando a configuração de vídeo muda. A busca
+    ponto -> monitor usa o último monitor encontrado e, em seguida, uma grade
+    pré-calculada a partir das bordas dos monitores.
+    """
+
+    def __init__(self, backend=None, estimador_barra=None, intervalo_revalidacao=2.0):
+        if backend is None:
+            if not MSS_AVAILABLE:
+                raise RuntimeError("mss não disponível para captura de tela")
+            backend = MssBackend(estimador_barra=estimador_barra)
+        self.backend = backend
+        self.intervalo_revalidacao = intervalo_revalidacao
+
+        self._lock = threading.Lock()
+        self._monitores = []
+        self._bordas_x = []
+        self._bordas_y = []
+        self._grade = {}
+        self._ultimo = None
+        self._assinatura = None
+        self._validado_em = 0.0
+        self._construir_tabela()
+
+    @property
+    def monitores(self):
+        self._revalidar()
+        return list(self._monitores)
+
+    def invalidar(self):
+        """Força a reconstrução da tabela na próxima captura"""
+        with self._lock:
+            self._validado_em = 0.0
+            self._assinatura = object()
+
+    def _construir_tabela(self):
+        monitores = [MonitorInfo(i, monitor, work)
+                     for i, (monitor, work) in enumerate(self.backend.listar_monitores(), 1)]
+        if not monitores:
+            raise RuntimeError("Nenhum monitor encontrado")
+
+        bordas_x = sorted({m.monitor[0] for m in monitores} | {m.monitor[2] for m in monitores})
+        bordas_y = sorted({m.monitor[1] for m in monitores} | {m.monitor[3] for m in monitores})
+
+        # Cada célula da grade (entre bordas consecutivas) aponta para um único monitor
+        grade = {}
+        for m in monitores:
+            left, top, right, bottom = m.monitor
+            for cx in range(bordas_x.index(left), bordas_x.index(right)):
+                for cy in range(bordas_y.index(top), bordas_y.index(bottom)):
+                    grade.setdefault((cx, cy), m)
+
+        self._monitores = monitores
+        self._bordas_x = bordas_x
+        self._bordas_y = bordas_y
+        self._grade = grade
+        self._ultimo = monitores[0]
+        self._assinatura = self.backend.assinatura()
+        self._validado_em = time.monotonic()
+        print(f"🖥️ Tabela de monitores atualizada: {len(monitores)} monitor(es)")
+
+    def _revalidar(self):
+        with self._lock:
+            assinatura = self.backend.assinatura()
+            if assinatura is not None:
+                if assinatura != self._assinatura:
+                    self._construir_tabela()
+            elif time.monotonic() - self._validado_em >= self.intervalo_revalidacao:
+                self._construir_tabela()
+
+    def monitor_em(self, x, y):
+        """Monitor que contém o ponto (ou o mais próximo, como MONITOR_DEFAULTTONEAREST)"""
+        self._revalidar()
+        ultimo = self._ultimo
+        if ultimo.contem(x, y):
+            return ultimo
+
+        cx = bisect.bisect_right(self._bordas_x, x) - 1
+        cy = bisect.bisect_right(self._bordas_y, y) - 1
+        monitor = self._grade.get((cx, cy))
+        if monitor is None:
+            monitor = min(self._monitores, key=lambda m: m.distancia(x, y))
+        self._ultimo = monitor
+        return monitor
+
+    def grab_em(self, x, y, area="monitor"):
+        """
+        Captura o monitor (ou a work area, com ``area="work"``) que contém o ponto.
+        Retorna (quadro bruto, (rel_x, rel_y), retângulo capturado).
+        """
+        rect = self.monitor_em(x, y).area(area)
+        frame = self.backend.grab(rect)
+        return frame, (x - rect[0], y - rect[1]), rect
+
+    def grab(self, rect):
+        """Captura um retângulo arbitrário (left, top, right, bottom)"""
+        return self.backend.grab(rect)
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,715 @@
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import RGBColor
+
+try:
+    from modules.template_cache import template_em_cache
+    from modules.docx_fragment import FragmentoDocumento
+    from modules.template_placeholders import ResolvedorPlaceholders
+    from modules.doc_styles import registrar_estilos, paragrafo, trecho, estilo_tabela
+    from modules.csv_store import TAMANHO_BLOCO, estimar_linhas, iterar_casos
+    from modules.batch_archive import ArquivoZipLote
+    from modules.batch_manifest import (BatchManifest, PREFIXO_IMPRESSAO, hash_arquivo, impressao_caso,
+                                        impressao_lote, ler_impressao)
+except ImportError:
+    from template_cache import template_em_cache
+    from docx_fragment import FragmentoDocumento
+    from template_placeholders import ResolvedorPlaceholders
+    from doc_styles import registrar_estilos, paragrafo, trecho, estilo_tabela
+    from csv_store import TAMANHO_BLOCO, estimar_linhas, iterar_casos
+    from batch_archive import ArquivoZipLote
+    from batch_manifest import (BatchManifest, PREFIXO_IMPRESSAO, hash_arquivo, impressao_caso,
+                                impressao_lote, ler_impressao)
+
+
+class ConfigManager:
+    """Gerencia o carregamento e salvamento da configuração de campos"""
+    
+    DEFAULT_CONFIG = [
+        {"label": "Campo1:", "key": "campo1"},
+        {"label": "Campo2:", "key": "campo2"},
+        {"label": "Campo3:", "key": "campo3"},
+        {"label": "Campo4:", "key": "campo4"},
+        {"label": "Campo5:", "key": "campo5"},
+        {"label": "Campo6:", "key": "campo6"}
+    ]
+
+    def __init__(self, config_file: str = 'config_campos.json'):
+        self.config_file = Path(config_file)
+
+    def load_config(self) -> List[Dict]:
+        """Carrega a configuração do arquivo JSON ou cria uma padrão"""
+        try:
+            if self.config_file.exists():
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                    print(f"✅ Configuração carregada de '{self.config_file}'")
+                    return config
+            else:
+                return self._create_default_config()
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar configuração: {e}")
+            return self.DEFAULT_CONFIG
+
+    def _create_default_config(self) -> List[Dict]:
+        """Cria arquivo de configuração padrão"""
+        try:
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(self.DEFAULT_CONFIG, f, indent=4, ensure_ascii=False)
+            print(f"ℹ️ Arquivo '{self.config_file}' criado com configuração padrão")
+            return self.DEFAULT_CONFIG
+        except Exception as e:
+            print(f"❌ Erro ao criar configuração padrão: {e}")
+            return self.DEFAULT_CONFIG
+
+
+class DocumentProcessor:
+    """Processa e gera documentos Word baseados em templates"""
+    
+    @staticmethod
+    def clean_filename(filename: str, max_length: int = 100) -> str:
+        """Limpa o nome do arquivo removendo caracteres inválidos"""
+        cleaned = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        cleaned = cleaned.strip()[:max_length]
+        return cleaned or "caso_teste"
+
+    @staticmethod
+    def fill_template(doc: Document, data: Dict[str, str], field_config: List[Dict], 
+                     colunas_selecionadas: List[str] = None, dados_csv: Dict[str, str] = None,
+                     fragmento: Optional[FragmentoDocumento] = None) -> None:
+        """Preenche o template com os dados fornecidos - AGORA ADICIONA APÓS CONTEÚDO EXISTENTE"""
+        # No lote o fragmento vem compilado; avulso, é compilado para este documento
+        if fragmento is None:
+            fragmento = DocumentProcessor.compilar_dados_teste(
+                doc, field_config, colunas_selecionadas, bool(colunas_selecionadas and dados_csv))
+        fragmento.instanciar(doc, data, dados_csv)
+
+    @staticmethod
+    def compilar_dados_teste(doc: Document, field_config: List[Dict], colunas_selecionadas: List[str] = None,
+                             com_tabela: bool = True) -> FragmentoDocumento:
+        """Esqueleto do bloco "Dados do Teste" (título, campos, caso e tabela), uma vez por lote"""
+        return FragmentoDocumento(doc, DocumentProcessor._montar_dados_teste, field_config,
+                                  colunas_selecionadas, com_tabela)
+
+    @staticmethod
+    def _montar_dados_teste(doc: Document, data: Dict[str, str], field_config: List[Dict],
+                            colunas_selecionadas: List[str] = None, dados_csv: Dict[str, str] = None) -> None:
+        """Monta o bloco "Dados do Teste" pela API do python-docx (usado na compilação do fragmento)"""
+        estilos = registrar_estilos(doc)
+        
+        # ADICIONAR ESPAÇO REDUZIDO APÓS O TÍTULO
+        espaco_apos_titulo = doc.add_paragraph()
+        espaco_apos_titulo.paragraph_format.space_after = Pt(1)
+        
+       
+        # Adicionar título da seção de dados
+        paragrafo(doc, 'Dados do Teste', estilos['titulo_secao'])
+        
+        # Adicionar campos da configuração
+        for campo_info in field_config:
+            key = campo_info['key']
+            label = campo_info['label'].rstrip(':')
+            value = data.get(key, '')
+            
+            # Adicionar parágrafo com campo e valor
+            campo_para = doc.add_paragraph()
+            trecho(campo_para, f"{label}: ", estilos['rotulo'])
+            trecho(campo_para, value, estilos['valor'])
+        
+        # Adicionar caso de teste
+        caso_para = doc.add_paragraph()
+        trecho(caso_para, "Caso de Teste: ", estilos['rotulo'])
+        trecho(caso_para, data.get('Caso de Teste', ''), estilos['valor'])
+        
+        # Adicionar tabela com dados do CSV se houver colunas selecionadas
+        if colunas_selecionadas and dados_csv:
+            DocumentProcessor._adicionar_tabela_csv(doc, colunas_selecionadas, dados_csv, estilos)
+
+    @staticmethod
+    def _adicionar_tabela_csv(doc: Document, colunas_selecionadas: List[str], dados_csv: Dict[str, str],
+                              estilos: Optional[Dict[str, str]] = None) -> None:
+        """Adiciona uma tabela com os dados do CSV ao documento"""
+        if not colunas_selecionadas or not dados_csv:
+            return
+        estilos = estilos or registrar_estilos(doc)
+        
+        # Adicionar um espaço antes da tabela
+        doc.add_paragraph()
+        
+        # Adicionar título da tabela
+        paragrafo(doc, 'Dados Adicionais do Caso de Teste', estilos['titulo_tabela'])
+        
+        # Criar tabela (bordas pretas vêm do estilo da tabela)
+        tabela = doc.add_table(rows=len(colunas_selecionadas), cols=2)
+        estilo_tabela(tabela, estilos['tabela'])
+        
+        # Adicionar dados
+        for i, coluna in enumerate(colunas_selecionadas):
+            if coluna in dados_csv:
+                row_cells = tabela.rows[i].cells
+                
+                # Primeira coluna: nome do campo em negrito; segunda: valor sem negrito
+                trecho(row_cells[0].paragraphs[0], coluna, estilos['rotulo'])
+                trecho(row_cells[1].paragraphs[0], str(dados_csv[coluna]), estilos['valor'])
+
+
+def _preparar_documento_padrao(doc: Document) -> None:
+    """Fonte padrão e estilos do PrintF no documento base (uma vez por processo)"""
+    font = doc.styles['Normal'].font
+    font.name = 'Arial'
+    font.size = Pt(12)
+    font.color.rgb = RGBColor(0, 0, 0)
+    registrar_estilos(doc)
+
+
+class DefaultDocumentGenerator:
+    """Gera documentos padrão quando nenhum template é fornecido"""
+    
+    @staticmethod
+    def documento_base() -> Document:
+        """Documento base com estilos já configurados; válido até o próximo documento padrão"""
+        return template_em_cache(None, _preparar_documento_padrao).documento()
+
+    @staticmethod
+    def create_default_document(data: Dict[str, str], field_config: List[Dict], 
+                               colunas_selecionadas: List[str] = None, 
+                               dados_csv: Dict[str, str] = None,
+                               fragmento: Optional[FragmentoDocumento] = None) -> Document:
+        """Cria um documento padrão com estrutura organizada - AGORA DINÂMICO BASEADO NA CONFIGURAÇÃO"""
+        doc = DefaultDocumentGenerator.documento_base()
+        if fragmento is None:
+            fragmento = DefaultDocumentGenerator.compilar_documento_padrao(
+                doc, field_config, colunas_selecionadas, bool(colunas_selecionadas and dados_csv))
+        fragmento.instanciar(doc, data, dados_csv)
+        return doc
+
+    @staticmethod
+    def compilar_documento_padrao(doc: Document, field_config: List[Dict], colunas_selecionadas: List[str] = None,
+                                  com_tabela: bool = True) -> FragmentoDocumento:
+        """Esqueleto do documento padrão inteiro (campos sem valor: "Não informado")"""
+        return FragmentoDocumento(doc, DefaultDocumentGenerator._montar_documento_padrao, field_config,
+                                  colunas_selecionadas, com_tabela, padrao='Não informado')
+
+    @staticmethod
+    def _montar_documento_padrao(doc: Document, data: Dict[str, str], field_config: List[Dict],
+                                 colunas_selecionadas: List[str] = None, dados_csv: Dict[str, str] = None) -> None:
+        """Monta o documento padrão pela API do python-docx (usado na compilação do fragmento)"""
+        estilos = registrar_estilos(doc)
+        
+        # Título do documento
+        title = paragrafo(doc, 'Evidências de Teste - Documentação', estilos['titulo_documento'])
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        # Seção de informações do teste
+        paragrafo(doc, 'Informações do Teste', estilos['titulo_secao'])
+        
+        # Adicionar campos dinamicamente baseados na configuração
+        for campo_info in field_config:
+            key = campo_info['key']
+            label = campo_info['label'].rstrip(':')
+            value = data.get(key, 'Não informado')
+            
+            campo_para = doc.add_paragraph()
+            trecho(campo_para, f"{label}: ", estilos['rotulo'])
+            trecho(campo_para, value, estilos['valor'])
+        
+        doc.add_paragraph()
+        
+        # Seção do caso de teste
+        caso_para = doc.add_paragraph()
+        trecho(caso_para, 'Nome do Caso de Teste: ', estilos['rotulo'])
+        trecho(caso_para, data.get('Caso de Teste', 'Não informado'), estilos['valor'])
+        
+        # Adicionar tabela com dados do CSV se houver colunas selecionadas
+        if colunas_selecionadas and dados_csv:
+            DocumentProcessor._adicionar_tabela_csv(doc, colunas_selecionadas, dados_csv, estilos)
+        
+        doc.add_paragraph()
+        
+        # Seções fixas adicionais (mantidas do original)
+        DefaultDocumentGenerator._add_standard_sections(doc, estilos)
+
+    @staticmethod
+    def _add_standard_sections(doc: Document, estilos: Optional[Dict[str, str]] = None) -> None:
+        """Adiciona seções padrão ao documento"""
+        estilos = estilos or registrar_estilos(doc)
+        
+        # Seção de descrição
+        paragrafo(doc, 'Descrição do Teste', estilos['subtitulo'])
+            
+        desc_para = doc.add_paragraph(
+            "Esta seção deve conter a descrição detalhada do caso de teste executado, "
+            "incluindo pré-condições, passos de execução e resultados esperados."
+        )
+        
+        # Seção de evidências
+        paragrafo(doc, 'Evidências Coletadas', estilos['subtitulo'])
+            
+        evid_para = doc.add_paragraph("Registro das evidências coletadas durante a execução do teste:")
+        
+        # Tabela para evidências
+        evidencias_table = doc.add_table(rows=6, cols=3)
+        evidencias_table.style = 'Light Grid Accent 1'
+        
+        # Cabeçalho da tabela de evidências
+        # (negrito direto: a 1ª linha/coluna do estilo da tabela já alterna o negrito)
+        evidencias_header = evidencias_table.rows[0].cells
+        headers = ['Etapa', 'Evidência', 'Resultado']
+        for col, header in enumerate(headers):
+            trecho(evidencias_header[col].paragraphs[0], header, estilos['rotulo']).bold = True
+        
+        # Linhas para preenchimento
+        etapas = [
+            'Pré-condições',
+            'Configuração Inicial', 
+            'Execução do Teste',
+            'Pós-condições',
+            'Resultado Final'
+        ]
+        
+        for row, etapa in enumerate(etapas, 1):
+            if row < len(evidencias_table.rows):
+                row_cells = evidencias_table.rows[row].cells
+                textos = [etapa, "[Descreva a evidência coletada]", "[Resultado obtido - OK/Erro]"]
+                for cell, texto in zip(row_cells, textos):
+                    trecho(cell.paragraphs[0], texto, estilos['valor']).bold = False
+        
+        doc.add_paragraph()
+        
+        # Seção de observações
+        paragrafo(doc, 'Observações e Comentários', estilos['subtitulo'])
+            
+        obs_para = doc.add_paragraph("Adicione observações relevantes sobre a execução do teste:")
+        
+        # Área para observações
+        obs_list_para = doc.add_paragraph()
+        trecho(obs_list_para, "Observações Gerais:\n", estilos['rotulo'])
+        
+        obs_items = [
+            "• [Insira observações sobre problemas encontrados]\n",
+            "• [Comentários sobre o comportamento do sistema]\n",
+            "• [Sugestões de melhorias]\n",
+            "• [Outras informações relevantes]"
+        ]
+        
+        for item in obs_items:
+            trecho(obs_list_para, item, estilos['valor'])
+
+
+# Incrementar quando o conteúdo gerado mudar: invalida as impressões digitais já gravadas
+VERSAO_GERADOR = 1
+
+
+class ContextoLote:
+    """
+    Parâmetros comuns a todos os documentos do lote. Enviado uma única vez a
+    cada processo do pool (initializer), em vez de junto com cada tarefa.
+    """
+
+    __slots__ = ("template_path", "use_default_template", "campos_config",
+                 "colunas_selecionadas", "output_folder", "placeholders", "impressao_lote", "em_memoria")
+
+    def __init__(self, template_path: str, use_default_template: bool, campos_config: List[Dict],
+                 colunas_selecionadas: List[str], output_folder: str,
+                 placeholders: Optional[Dict[str, str]] = None, impressao_lote: Optional[str] = None,
+                 em_memoria: bool = False):
+        self.template_path = template_path
+        self.use_default_template = use_default_template
+        self.campos_config = campos_config
+        self.colunas_selecionadas = colunas_selecionadas
+        self.output_folder = output_folder
+        # Apelidos de placeholders do template (ex.: {'NOME_DO_PROJETO': 'Projeto'})
+        self.placeholders = placeholders
+        # Hash das entradas do lote; None desativa a comparação com os documentos existentes
+        self.impressao_lote = impressao_lote
+        # Documento devolvido em bytes (saída em .zip) em vez de salvo na pasta
+        self.em_memoria = em_memoria
+
+
+class TarefaDocumento:
+    """Um caso de teste do CSV, com o nome do arquivo já definido antes do envio ao pool"""
+
+    __slots__ = ("indice", "caso_teste", "dados", "nome_arquivo", "dados_csv")
+
+    def __init__(self, indice: int, caso_teste: str, dados: Dict[str, str], nome_arquivo: str,
+                 dados_csv: Optional[Dict[str, str]] = None):
+        self.indice = indice
+        self.caso_teste = caso_teste
+        self.dados = dados
+        self.nome_arquivo = nome_arquivo
+        self.dados_csv = dados_csv
+
+
+class ResultadoDocumento:
+    """Resultado da geração de um caso; ``mensagens`` são exibidas no log pela interface"""
+
+    __slots__ = ("indice", "caso_teste", "nome_arquivo", "sucesso", "erro", "mensagens", "inalterado",
+                 "conteudo")
+
+    def __init__(self, indice: int, caso_teste: str, nome_arquivo: Optional[str] = None,
+                 sucesso: bool = False, erro: Optional[str] = None):
+        self.indice = indice
+        self.caso_teste = caso_teste
+        self.nome_arquivo = nome_arquivo
+        self.sucesso = sucesso
+        self.erro = erro
+        self.mensagens = []
+        # Documento existente com a mesma impressão digital: não foi regravado
+        self.inalterado = False
+        # Bytes do .docx quando o lote grava em .zip
+        self.conteudo: Optional[bytes] = None
+
+
+class NomesArquivos:
+    """
+    Define o nome de cada documento antes do envio ao pool (mesma regra de
+    antes: ``nome.docx``, ``nome_1.docx``, ...), para que os processos não
+    precisem compartilhar o conjunto de nomes já usados.
+    """
+
+    def __init__(self):
+        self._usados = set()
+
+    def proximo(self, caso_teste: str) -> str:
+        nome_original = f"{DocumentProcessor.clean_filename(caso_teste)}.docx"
+        nome_arquivo = nome_original
+        contador = 1
+        while nome_arquivo in self._usados:
+            base, ext = os.path.splitext(nome_original)
+            nome_arquivo = f"{base}_{contador}{ext}"
+            contador += 1
+        self._usados.add(nome_arquivo)
+        return nome_arquivo
+
+
+def atribuir_nomes_arquivos(casos_teste: List[str]) -> List[str]:
+    nomes = NomesArquivos()
+    return [nomes.proximo(caso_teste) for caso_teste in casos_teste]
+
+
+_CONTEXTO: Optional[ContextoLote] = None
+
+
+_FRAGMENTOS: Dict[tuple, FragmentoDocumento] = {}
+_RESOLVEDOR: Optional[ResolvedorPlaceholders] = None
+
+
+def _inicializar_processo(contexto: ContextoLote) -> None:
+    global _CONTEXTO, _RESOLVEDOR
+    _CONTEXTO = contexto
+    _FRAGMENTOS.clear()
+    _RESOLVEDOR = ResolvedorPlaceholders(contexto.campos_config, contexto.colunas_selecionadas,
+                                         contexto.placeholders)
+
+
+def _fragmento(compilar: Callable, doc: Document, contexto: ContextoLote, com_tabela: bool) -> FragmentoDocumento:
+    """Fragmento compilado uma vez por lote (e por processo) para cada tipo de documento"""
+    chave = (compilar, com_tabela)
+    fragmento = _FRAGMENTOS.get(chave)
+    if fragmento is None:
+        fragmento = _FRAGMENTOS[chave] = compilar(
+            doc, contexto.campos_config, contexto.colunas_selecionadas, com_tabela)
+    return fragmento
+
+
+def _documento_padrao(dados: Dict[str, str], contexto: ContextoLote, tarefa: TarefaDocumento) -> Document:
+    doc = DefaultDocumentGenerator.documento_base()
+    com_tabela = bool(contexto.colunas_selecionadas and tarefa.dados_csv)
+    fragmento = _fragmento(DefaultDocumentGenerator.compilar_documento_padrao, doc, contexto, com_tabela)
+    return DefaultDocumentGenerator.create_default_document(
+        dados, contexto.campos_config, contexto.colunas_selecionadas, tarefa.dados_csv, fragmento)
+
+
+def gerar_documento_caso(tarefa: TarefaDocumento) -> ResultadoDocumento:
+    """Executado no pool: gera e salva o documento de um caso de teste"""
+    contexto = _CONTEXTO
+    resultado = ResultadoDocumento(tarefa.indice, tarefa.caso_teste)
+    try:
+        impressao = None
+        if contexto.impressao_lote:
+            impressao = impressao_caso(contexto.impressao_lote, tarefa.caso_teste, tarefa.dados_csv)
+            if not contexto.em_memoria and ler_impressao(str(Path(contexto.output_folder) / tarefa.nome_arquivo)) == impressao:
+                resultado.nome_arquivo = tarefa.nome_arquivo
+                resultado.sucesso = True
+                resultado.inalterado = True
+                resultado.mensagens.append(f"⏭️ Inalterado: {tarefa.nome_arquivo}")
+                return resultado
+
+        dados_completos = dict(tarefa.dados)
+        dados_completos['Caso de Teste'] = tarefa.caso_teste
+
+        # Usar template se fornecido e existir, caso contrário criar documento padrão
+        if not contexto.use_default_template:
+            try:
+                # Template analisado uma vez por processo; cada caso recebe uma cópia do corpo
+                # Placeholders do template ([NOME_DO_PROJETO]...) preenchidos com os dados da linha
+                valores = _RESOLVEDOR.valores(dados_completos, tarefa.dados_csv)
+                doc = template_em_cache(contexto.template_path).documento(valores)
+                # Esqueleto do bloco compilado no 1º caso; os demais só copiam e preenchem
+                com_tabela = bool(contexto.colunas_selecionadas and tarefa.dados_csv)
+                fragmento = _fragmento(DocumentProcessor.compilar_dados_teste, doc, contexto, com_tabela)
+                # Adiciona dados APÓS o conteúdo do template original
+                DocumentProcessor.fill_template(doc, dados_completos, contexto.campos_config,
+                                                contexto.colunas_selecionadas, tarefa.dados_csv, fragmento)
+            except Exception as e:
+                resultado.mensagens.append(
+                    f"⚠️ Erro ao usar template personalizado: {e}. Usando template padrão...")
+                doc = _documento_padrao(dados_completos, contexto, tarefa)
+        else:
+            doc = _documento_padrao(dados_completos, contexto, tarefa)
+
+        # O documento base vem do cache: sempre sobrescreve a impressão do caso anterior
+        if impressao:
+            doc.core_properties.identifier = impressao
+        elif (doc.core_properties.identifier or '').startswith(PREFIXO_IMPRESSAO):
+            doc.core_properties.identifier = ''
+
+        if contexto.em_memoria:
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            resultado.conteudo = buffer.getvalue()
+            resultado.nome_arquivo = tarefa.nome_arquivo
+            resultado.sucesso = True
+            return resultado
+
+        try:
+            doc.save(Path(contexto.output_folder) / tarefa.nome_arquivo)
+            resultado.nome_arquivo = tarefa.nome_arquivo
+            resultado.mensagens.append(f"✅ Salvo: {tarefa.nome_arquivo}")
+        except Exception:
+            # Fallback: tentar salvar com nome diferente (índice garante unicidade entre processos)
+            try:
+                nome_alternativo = f"Evidencia_{datetime.now().strftime('%H%M%S')}_{tarefa.indice + 1}.docx"
+                doc.save(Path(contexto.output_folder) / nome_alternativo)
+                resultado.nome_arquivo = nome_alternativo
+                resultado.mensagens.append(f"✅ Salvo (nome alternativo): {nome_alternativo}")
+            except Exception as e2:
+                resultado.erro = "Erro na geração"
+                resultado.mensagens.append(f"❌ Erro ao salvar documento: {e2}")
+                return resultado
+
+        resultado.sucesso = True
+        return resultado
+
+    except Exception as e:
+        resultado.erro = str(e)
+        resultado.mensagens.append(f"❌ Erro crítico ao gerar documento: {e}")
+        return resultado
+
+
+def _gerar_em_serie(tarefas: Iterable[TarefaDocumento], contexto: ContextoLote):
+    _inicializar_processo(contexto)
+    for tarefa in tarefas:
+        yield gerar_documento_caso(tarefa)
+
+
+def gerar_documentos(tarefas: Iterable[TarefaDocumento], contexto: ContextoLote, workers: Optional[int] = None):
+    """
+    Gera os documentos do lote em um ProcessPoolExecutor e entrega os
+    resultados NA ORDEM das tarefas. Apenas ``2 * workers`` tarefas ficam em
+    voo por vez, para que a interface acompanhe o progresso enquanto o pool trabalha.
+    ``tarefas`` pode ser um gerador (ex.: CSV lido em blocos): cada tarefa só é
+    consumida quando há espaço na janela, então os primeiros documentos saem
+    antes do fim da leitura.
+    """
+    workers = workers or os.cpu_count() or 1
+    if hasattr(tarefas, '__len__'):
+        workers = min(workers, len(tarefas))
+    if workers <= 1:
+        yield from _gerar_em_serie(tarefas, contexto)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_processo,
+                                   initargs=(contexto,))
+    except (OSError, NotImplementedError) as e:
+        print(f"⚠️ Pool de processos indisponível ({e}), gerando documentos em série")
+        yield from _gerar_em_serie(tarefas, contexto)
+        return
+
+    tarefas = iter(tarefas)
+    pendentes = deque()
+    esgotadas = False
+    try:
+        while True:
+            while not esgotadas and len(pendentes) < workers * 2:
+                tarefa = next(tarefas, None)
+                if tarefa is None:
+                    esgotadas = True
+                    break
+                pendentes.append(pool.submit(gerar_documento_caso, tarefa))
+
+            if not pendentes:
+                break
+            yield pendentes.popleft().result()
+    finally:
+        for futuro in pendentes:
+            futuro.cancel()
+        pool.shutdown(wait=True)
+
+
+class ResumoLote:
+    """Totais de uma execução de ``executar_lote``"""
+
+    def __init__(self):
+        self.estimativa = 0
+        self.total = 0
+        self.sucessos = 0
+        self.erros = []
+        self.arquivos_gerados = set()
+        self.pulados = 0
+        self.inalterados = 0
+        self.arquivos_zip: List[str] = []
+        self.indice_zip: Optional[str] = None
+        self.retomado = False
+        self.segundos = 0.0
+
+    @property
+    def gravados(self) -> int:
+        return self.sucessos - self.pulados - self.inalterados
+
+    def como_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "sucessos": self.sucessos,
+            "gerados": self.gravados,
+            "pulados": self.pulados,
+            "inalterados": self.inalterados,
+            "arquivos_zip": self.arquivos_zip,
+            "indice_zip": self.indice_zip,
+            "erros": [{"caso": caso, "erro": erro} for caso, erro in self.erros],
+            "retomado": self.retomado,
+            "segundos": round(self.segundos, 3),
+            "documentos_por_segundo": round(self.gravados / self.segundos, 2)
+            if self.segundos else 0.0,
+        }
+
+
+def executar_lote(csv_path: str, dados_fixos: Dict[str, str], template_path: str, output_folder: str,
+                  use_default_template: bool, campos_config: List[Dict],
+                  colunas_selecionadas: Optional[List[str]] = None, duplicados: str = 'first',
+                  workers: Optional[int] = None, tamanho_bloco: int = TAMANHO_BLOCO, retomar: bool = True,
+                  placeholders: Optional[Dict[str, str]] = None, pular_inalterados: bool = True,
+                  arquivo_zip: bool = False, documentos_por_zip: Optional[int] = None,
+                  ao_iniciar: Optional[Callable[[int], None]] = None,
+                  ao_resultado: Optional[Callable[[ResultadoDocumento], None]] = None,
+                  log: Callable[[str], None] = print) -> ResumoLote:
+    """
+    Executa um lote completo (CSV + template -> N documentos) sem depender de
+    interface: lê o CSV em blocos, pula casos já concluídos segundo o manifesto,
+    gera o restante no pool e registra cada resultado no manifesto.
+    Com ``pular_inalterados``, documentos já existentes com a mesma impressão
+    digital (entradas do lote + dados da linha) não são regravados.
+    Com ``arquivo_zip`` os documentos vão direto para .zip(s) com índice
+    (ver ``ArquivoZipLote``); nesse modo não há retomada nem comparação.
+    Usado pela interface (TemplateGeneratorModule) e pela linha de comando.
+    """
+    resumo = ResumoLote()
+    inicio = time.perf_counter()
+    colunas_selecionadas = list(colunas_selecionadas or [])
+
+    resumo.estimativa = estimar_linhas(csv_path)
+    log(f"📊 Aproximadamente {resumo.estimativa} casos de teste no CSV\n")
+    if ao_iniciar:
+        ao_iniciar(resumo.estimativa)
+
+    if arquivo_zip and (retomar or pular_inalterados):
+        log("ℹ️ Saída em .zip: retomada e comparação com documentos existentes desativadas")
+        retomar = pular_inalterados = False
+
+    impressao = None
+    if pular_inalterados:
+        impressao = impressao_lote(
+            versao=VERSAO_GERADOR, template_padrao=use_default_template,
+            template_hash="" if use_default_template else hash_arquivo(template_path),
+            dados_fixos=dados_fixos, campos=campos_config, colunas=colunas_selecionadas,
+            placeholders=placeholders or {})
+
+    contexto = ContextoLote(template_path, use_default_template, campos_config,
+                            colunas_selecionadas, output_folder, placeholders, impressao, arquivo_zip)
+    destino_zip = ArquivoZipLote(output_folder, documentos_por_zip=documentos_por_zip) if arquivo_zip else None
+
+    # Manifesto do lote: casos já gerados com as mesmas entradas são pulados
+    manifesto = None
+    if retomar:
+        try:
+            manifesto = BatchManifest(output_folder, BatchManifest.descrever_entradas(
+                csv_path, "" if use_default_template else template_path, dados_fixos,
+                colunas_selecionadas, campos=campos_config, duplicados=duplicados,
+                placeholders=placeholders or {})).abrir()
+            resumo.retomado = manifesto.retomado
+            if manifesto.retomado:
+                log("♻️ Manifesto do lote encontrado: retomando execução anterior")
+        except Exception as e:
+            log(f"⚠️ Não foi possível usar o manifesto do lote: {e}")
+            manifesto = None
+
+    nomes_arquivos = NomesArquivos()
+    casos = iterar_casos(csv_path, colunas_selecionadas, duplicados, tamanho_bloco)
+
+    def tarefas():
+        for indice, (caso_teste, dados_csv) in enumerate(casos):
+            nome_arquivo = nomes_arquivos.proximo(caso_teste)
+            resumo.total += 1
+            existente = manifesto.concluido(indice, caso_teste) if manifesto else None
+            if existente:
+                resumo.sucessos += 1
+                resumo.arquivos_gerados.add(existente)
+                continue
+            yield TarefaDocumento(indice, caso_teste, dados_fixos, nome_arquivo, dados_csv)
+
+    try:
+        for resultado in gerar_documentos(tarefas(), contexto, workers):
+            if resultado.sucesso and destino_zip and resultado.conteudo is not None:
+                arquivo, _ = destino_zip.adicionar(resultado.caso_teste, resultado.nome_arquivo, resultado.conteudo)
+                resultado.conteudo = None
+                resultado.mensagens.append(f"📦 {resultado.nome_arquivo} -> {arquivo}")
+            if resultado.sucesso:
+                resumo.sucessos += 1
+                resumo.arquivos_gerados.add(resultado.nome_arquivo)
+                if resultado.inalterado:
+                    resumo.inalterados += 1
+            else:
+                resumo.erros.append((resultado.caso_teste, resultado.erro))
+            if manifesto:
+                manifesto.registrar(resultado)
+            if ao_resultado:
+                ao_resultado(resultado)
+    except Exception as e:
+        log(f"❌ Erro no processamento em lote: {e}\n")
+        resumo.erros.append(("(lote)", str(e)))
+    finally:
+        if manifesto:
+            manifesto.fechar()
+        if destino_zip:
+            try:
+                destino_zip.fechar()
+            except Exception as e:
+                log(f"❌ Erro ao finalizar o arquivo .zip: {e}\n")
+                resumo.erros.append(("(zip)", str(e)))
+
+    if destino_zip and destino_zip.arquivos:
+        resumo.arquivos_zip = list(destino_zip.arquivos)
+        resumo.indice_zip = destino_zip.caminho_indice
+        log(f"📦 {len(destino_zip.documentos)} documento(s) em {len(destino_zip.arquivos)} arquivo(s) .zip "
+            f"(índice: {os.path.basename(destino_zip.caminho_indice)})")
+
+    if manifesto and manifesto.pulados:
+        resumo.pulados = manifesto.pulados
+        log(f"⏭️ {manifesto.pulados} caso(s) já gerado(s) anteriormente foram pulados")
+    if pular_inalterados:
+        log(f"💾 {resumo.gravados} documento(s) gravado(s), {resumo.inalterados} inalterado(s) não regravado(s)")
+    resumo.segundos = time.perf_counter() - inicio
+    return resumo
@@ -0,0 +1,91 @@
+import copy
+import os
+import threading
+
+from docx import Document
+
+try:
+    from modules.template_placeholders import PlaceholdersTemplate, partes_cabecalho_rodape
+except ImportError:
+    from template_placeholders import PlaceholdersTemplate, partes_cabecalho_rodape
+
+
+class TemplateCache:
+    """
+    Template DOCX carregado uma única vez e reaproveitado a cada documento.
+
+    O pacote (zip, partes XML, estilos, mídia, cabeçalhos) é lido e analisado
+    apenas no primeiro uso; ``documento()`` devolve o mesmo objeto Document com
+    o corpo restaurado a partir de uma cópia profunda do corpo original. As
+    demais partes são compartilhadas sem alteração, então o documento devolvido
+    só é válido até a próxima chamada (salve-o antes de pedir outro).
+    Se o arquivo do template mudar (tamanho/mtime), ele é recarregado.
+
+    Sem ``template_path`` usa o documento padrão do python-docx. ``preparar``
+    é chamado uma vez a cada carga (ex.: registrar estilos no template).
+
+    Os placeholders (``[NOME_DO_PROJETO]``...) do corpo, cabeçalhos e rodapés
+    são mapeados na carga; ``documento(valores)`` os preenche no corpo
+    original antes da cópia e direto nos cabeçalhos/rodapés (que são
+    reescritos a cada documento, então não precisam ser restaurados).
+    """
+
+    def __init__(self, template_path=None, preparar=None):
+        self.template_path = template_path
+        self.preparar = preparar
+        self._doc = None
+        self._corpo_original = None
+        self._assinatura = None
+        self.placeholders = None
+
+    def _assinatura_atual(self):
+        if not self.template_path:
+            return None
+        stat = os.stat(self.template_path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _carregar(self, assinatura):
+        doc = Document(self.template_path or None)
+        if self.preparar:
+            self.preparar(doc)
+        self._corpo_original = [copy.deepcopy(filho) for filho in doc.element.body]
+        self.placeholders = PlaceholdersTemplate(self._corpo_original + partes_cabecalho_rodape(doc))
+        self._doc = doc
+        self._assinatura = assinatura
+
+    def documento(self, valores=None):
+        """
+        Document pronto para receber conteúdo após o corpo original do template.
+        ``valores`` (qualquer objeto com ``get(nome, padrao)``) preenche os placeholders.
+        """
+        assinatura = self._assinatura_atual()
+        recarregado = self._doc is None or assinatura != self._assinatura
+        if recarregado:
+            self._carregar(assinatura)
+        if valores is not None and self.placeholders:
+            self.placeholders.preencher(valores)
+            recarregado = False
+        if not recarregado:
+            # Mantém o mesmo elemento <w:body> (o Document guarda referência a ele)
+            self._doc.element.body[:] = [copy.deepcopy(filho) for filho in self._corpo_original]
+        return self._doc
+
+
+_LOCAL = threading.local()
+
+
+def template_em_cache(template_path=None, preparar=None):
+    """
+    TemplateCache da thread atual para o caminho informado. Os caches ficam
+    em ``threading.local``: o Document devolvido nunca é compartilhado entre
+    threads e é liberado junto com a thread (cada lote da interface roda em
+    uma thread nova). Template alterado no disco é recarregado no mesmo cache.
+    """
+    caches = getattr(_LOCAL, "caches", None)
+    if caches is None:
+        caches = _LOCAL.caches = {}
+    chave = (os.path.abspath(template_path) if template_path else None, preparar)
+    cache = caches.get(chave)
+    if cache is None:
+        cache = caches[chave] = TemplateCache(template_path, preparar)
+    return cache
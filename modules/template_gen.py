@@ -1,114 +1,72 @@
 import csv
-import json
 import os
 import platform
-import re
 import threading
-import time
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import pandas as pd
 from docx import Document
 from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import RGBColor
-from docx.oxml import parse_xml
 
+try:
+    from modules.template_batch import (ConfigManager, DocumentProcessor, DefaultDocumentGenerator,
+                                        executar_lote)
+except ImportError:
+    from template_batch import (ConfigManager, DocumentProcessor, DefaultDocumentGenerator,
+                                executar_lote)
 
-class ConfigManager:
-    """Gerencia o carregamento e salvamento da configuração de campos"""
-    
-    DEFAULT_CONFIG = [
-        {"label": "Campo1:", "key": "campo1"},
-        {"label": "Campo2:", "key": "campo2"},
-        {"label": "Campo3:", "key": "campo3"},
-        {"label": "Campo4:", "key": "campo4"},
-        {"label": "Campo5:", "key": "campo5"},
-        {"label": "Campo6:", "key": "campo6"}
-    ]
-
-    def __init__(self, config_file: str = 'config_campos.json'):
-        self.config_file = Path(config_file)
+try:
+    from modules.csv_store import (CSVRecordStore, ENCODINGS, TAMANHO_BLOCO, coluna_de_nome,
+                                   colunas_csv, iterar_casos, ler_tabela)
+except ImportError:
+    from csv_store import (CSVRecordStore, ENCODINGS, TAMANHO_BLOCO, coluna_de_nome,
+                           colunas_csv, iterar_casos, ler_tabela)
 
-    def load_config(self) -> List[Dict]:
-        """Carrega a configuração do arquivo JSON ou cria uma padrão"""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    print(f"✅ Configuração carregada de '{self.config_file}'")
-                    return config
-            else:
-                return self._create_default_config()
-        except Exception as e:
-            print(f"⚠️ Erro ao carregar configuração: {e}")
-            return self.DEFAULT_CONFIG
-
-    def _create_default_config(self) -> List[Dict]:
-        """Cria arquivo de configuração padrão"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.DEFAULT_CONFIG, f, indent=4, ensure_ascii=False)
-            print(f"ℹ️ Arquivo '{self.config_file}' criado com configuração padrão")
-            return self.DEFAULT_CONFIG
-        except Exception as e:
-            print(f"❌ Erro ao criar configuração padrão: {e}")
-            return self.DEFAULT_CONFIG
+try:
+    from config import APP_CONFIG
+    TEMPLATE_SETTINGS = getattr(APP_CONFIG, 'TEMPLATE_SETTINGS', {})
+except ImportError:
+    TEMPLATE_SETTINGS = {}
 
 
 class CSVReader:
-    """Responsável pela leitura de arquivos CSV"""
+    """Responsável pela leitura dos casos de teste (CSV ou planilha .xlsx)"""
     
-    ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'windows-1252']
+    ENCODINGS = ENCODINGS
 
     @staticmethod
-    def read_csv(file_path: str) -> Tuple[Optional[List[str]], Optional[List[str]], Optional[pd.DataFrame]]:
-        """Lê um arquivo CSV e retorna a lista de nomes, colunas e o DataFrame completo"""
+    def read_csv(file_path: str, colunas_selecionadas: List[str] = None, duplicados: str = 'first'
+                 ) -> Tuple[Optional[List[str]], Optional[List[str]], Optional[CSVRecordStore]]:
+        """Lê um arquivo CSV e retorna a lista de nomes, colunas e os registros indexados por nome"""
         try:
-            return CSVReader._read_with_pandas(file_path)
+            return CSVReader._read_with_pandas(file_path, colunas_selecionadas, duplicados)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao ler o CSV: {e}")
             return None, None, None
 
     @staticmethod
-    def _read_with_pandas(file_path: str) -> Tuple[Optional[List[str]], Optional[List[str]], Optional[pd.DataFrame]]:
-        """Tenta ler o CSV usando pandas e retorna nomes, colunas e DataFrame"""
-        for encoding in CSVReader.ENCODINGS:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding, engine='python', 
-                               on_bad_lines='skip')
-                if 'Nome' in df.columns:
-                    nomes = df['Nome'].dropna().str.strip()
-                    nomes_list = nomes[nomes != ''].tolist()
-                    colunas = [col for col in df.columns if col != 'Nome']
-                    return nomes_list, colunas, df
-                else:
-                    # Se não encontrar coluna "Nome", usa a primeira coluna
-                    primeira_coluna = df.columns[0]
-                    nomes = df[primeira_coluna].dropna().str.strip()
-                    nomes_list = nomes[nomes != ''].tolist()
-                    colunas = [col for col in df.columns if col != primeira_coluna]
-                    return nomes_list, colunas, df
-            except Exception:
-                continue
-        return None, None, None
+    def _read_with_pandas(file_path: str, colunas_selecionadas: List[str] = None, duplicados: str = 'first'
+                          ) -> Tuple[Optional[List[str]], Optional[List[str]], Optional[CSVRecordStore]]:
+        """Lê o arquivo inteiro (CSV: engine C, formato detectado uma vez) e retorna nomes, colunas e registros"""
+        df = ler_tabela(file_path)
+        # Coluna "Nome" ou, se não existir, a primeira coluna
+        registros = CSVRecordStore.de_dataframe(df, colunas_selecionadas, duplicados)
+        return list(registros.nomes), registros.colunas, registros
+
+    @staticmethod
+    def iter_casos(file_path: str, colunas_selecionadas: List[str] = None, duplicados: str = 'first',
+                   tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """(nome, dados do CSV) de cada caso de teste, lendo o arquivo em blocos"""
+        return iterar_casos(file_path, colunas_selecionadas, duplicados, tamanho_bloco)
 
     @staticmethod
     def get_csv_columns(file_path: str) -> Optional[List[str]]:
-        """Obtém apenas as colunas do arquivo CSV"""
+        """Obtém apenas as colunas do arquivo CSV (reaproveita a detecção de formato)"""
         try:
-            for encoding in CSVReader.ENCODINGS:
-                try:
-                    df = pd.read_csv(file_path, encoding=encoding, engine='python', 
-                                   on_bad_lines='skip', nrows=1)
-                    return df.columns.tolist()
-                except Exception:
-                    continue
-            return None
+            return colunas_csv(file_path)
         except Exception as e:
             print(f"Erro ao obter colunas do CSV: {e}")
             return None
@@ -194,309 +152,6 @@ class ColumnSelectionDialog:
         return self.selected_columns
 
 
-class DocumentProcessor:
-    """Processa e gera documentos Word baseados em templates"""
-    
-    @staticmethod
-    def clean_filename(filename: str, max_length: int = 100) -> str:
-        """Limpa o nome do arquivo removendo caracteres inválidos"""
-        cleaned = re.sub(r'[<>:"/\\|?*]', '_', filename)
-        cleaned = cleaned.strip()[:max_length]
-        return cleaned or "caso_teste"
-
-    @staticmethod
-    def fill_template(doc: Document, data: Dict[str, str], field_config: List[Dict], 
-                     colunas_selecionadas: List[str] = None, dados_csv: Dict[str, str] = None) -> None:
-        """Preenche o template com os dados fornecidos - AGORA ADICIONA APÓS CONTEÚDO EXISTENTE"""
-        
-        # ADICIONAR ESPAÇO REDUZIDO APÓS O TÍTULO
-        espaco_apos_titulo = doc.add_paragraph()
-        espaco_apos_titulo.paragraph_format.space_after = Pt(1)
-        
-       
-        # Adicionar título da seção de dados
-        titulo = doc.add_heading('Dados do Teste', level=1)
-        for run in titulo.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(14)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)  
-        
-        # Adicionar campos da configuração
-        for campo_info in field_config:
-            key = campo_info['key']
-            label = campo_info['label'].rstrip(':')
-            value = data.get(key, '')
-            
-            # Adicionar parágrafo com campo e valor
-            campo_para = doc.add_paragraph()
-            campo_run = campo_para.add_run(f"{label}: ")
-            campo_run.bold = True
-            campo_run.font.name = 'Arial'
-            campo_run.font.size = Pt(12)
-            campo_run.font.color.rgb = RGBColor(0, 0, 0)
-            
-            valor_run = campo_para.add_run(value)
-            valor_run.bold = False
-            valor_run.font.name = 'Arial'
-            valor_run.font.size = Pt(12)
-            valor_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Adicionar caso de teste
-        caso_para = doc.add_paragraph()
-        caso_run = caso_para.add_run("Caso de Teste: ")
-        caso_run.bold = True
-        caso_run.font.name = 'Arial'
-        caso_run.font.size = Pt(12)
-        caso_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        nome_run = caso_para.add_run(data.get('Caso de Teste', ''))
-        nome_run.bold = False
-        nome_run.font.name = 'Arial'
-        nome_run.font.size = Pt(12)
-        nome_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Adicionar tabela com dados do CSV se houver colunas selecionadas
-        if colunas_selecionadas and dados_csv:
-            DocumentProcessor._adicionar_tabela_csv(doc, colunas_selecionadas, dados_csv)
-
-    @staticmethod
-    def _adicionar_tabela_csv(doc: Document, colunas_selecionadas: List[str], dados_csv: Dict[str, str]) -> None:
-        """Adiciona uma tabela com os dados do CSV ao documento"""
-        if not colunas_selecionadas or not dados_csv:
-            return
-        
-        # Adicionar um espaço antes da tabela
-        doc.add_paragraph()
-        
-        # Adicionar título da tabela
-        titulo = doc.add_heading('Dados Adicionais do Caso de Teste', level=2)
-        
-        for run in titulo.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(14)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Criar tabela
-        tabela = doc.add_table(rows=len(colunas_selecionadas), cols=2)
-        
-        # Adicionar dados
-        for i, coluna in enumerate(colunas_selecionadas):
-            if coluna in dados_csv:
-                row_cells = tabela.rows[i].cells
-                
-                # Primeira coluna: nome do campo em negrito
-                row_cells[0].text = coluna
-                for paragraph in row_cells[0].paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = 'Arial'
-                        run.font.size = Pt(12)
-                        run.bold = True
-                        run.font.color.rgb = RGBColor(0, 0, 0)
-                
-                # Segunda coluna: valor sem negrito
-                row_cells[1].text = str(dados_csv[coluna])
-                for paragraph in row_cells[1].paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = 'Arial'
-                        run.font.size = Pt(12)
-                        run.bold = False
-                        run.font.color.rgb = RGBColor(0, 0, 0)
-                
-                # Adicionar bordas pretas às células
-                for cell in row_cells:
-                    tcPr = cell._element.get_or_add_tcPr()
-                    tcBorders = parse_xml(r'<w:tcBorders xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
-                                          r'<w:top w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-                                          r'<w:left w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-                                          r'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-                                          r'<w:right w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-                                          r'</w:tcBorders>')
-                    tcPr.append(tcBorders)
-
-
-class DefaultDocumentGenerator:
-    """Gera documentos padrão quando nenhum template é fornecido"""
-    
-    @staticmethod
-    def create_default_document(data: Dict[str, str], field_config: List[Dict], 
-                               colunas_selecionadas: List[str] = None, 
-                               dados_csv: Dict[str, str] = None) -> Document:
-        """Cria um documento padrão com estrutura organizada - AGORA DINÂMICO BASEADO NA CONFIGURAÇÃO"""
-        doc = Document()
-        
-        # Configurar estilos de fonte padrão
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = 'Arial'
-        font.size = Pt(12)
-        font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Título do documento
-        title = doc.add_heading('Evidências de Teste - Documentação', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        for run in title.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(16)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Seção de informações do teste
-        info_heading = doc.add_heading('Informações do Teste', level=1)
-        for run in info_heading.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(14)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Adicionar campos dinamicamente baseados na configuração
-        for campo_info in field_config:
-            key = campo_info['key']
-            label = campo_info['label'].rstrip(':')
-            value = data.get(key, 'Não informado')
-            
-            campo_para = doc.add_paragraph()
-            label_run = campo_para.add_run(f"{label}: ")
-            label_run.bold = True
-            label_run.font.name = 'Arial'
-            label_run.font.size = Pt(12)
-            label_run.font.color.rgb = RGBColor(0, 0, 0)
-            
-            value_run = campo_para.add_run(value)
-            value_run.bold = False
-            value_run.font.name = 'Arial'
-            value_run.font.size = Pt(12)
-            value_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        doc.add_paragraph()
-        
-        # Seção do caso de teste
-        caso_para = doc.add_paragraph()
-        caso_run = caso_para.add_run('Nome do Caso de Teste: ')
-        caso_run.bold = True
-        caso_run.font.name = 'Arial'
-        caso_run.font.size = Pt(12)
-        caso_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        nome_run = caso_para.add_run(data.get('Caso de Teste', 'Não informado'))
-        nome_run.font.name = 'Arial'
-        nome_run.font.size = Pt(12)
-        nome_run.bold = False
-        nome_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Adicionar tabela com dados do CSV se houver colunas selecionadas
-        if colunas_selecionadas and dados_csv:
-            DocumentProcessor._adicionar_tabela_csv(doc, colunas_selecionadas, dados_csv)
-        
-        doc.add_paragraph()
-        
-        # Seções fixas adicionais (mantidas do original)
-        DefaultDocumentGenerator._add_standard_sections(doc)
-        
-        return doc
-
-    @staticmethod
-    def _add_standard_sections(doc: Document) -> None:
-        """Adiciona seções padrão ao documento"""
-        # Seção de descrição
-        desc_heading = doc.add_heading('Descrição do Teste', level=2)
-        for run in desc_heading.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(12)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-            
-        desc_para = doc.add_paragraph(
-            "Esta seção deve conter a descrição detalhada do caso de teste executado, "
-            "incluindo pré-condições, passos de execução e resultados esperados."
-        )
-        
-        # Seção de evidências
-        evid_heading = doc.add_heading('Evidências Coletadas', level=2)
-        for run in evid_heading.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(12)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-            
-        evid_para = doc.add_paragraph("Registro das evidências coletadas durante a execução do teste:")
-        
-        # Tabela para evidências
-        evidencias_table = doc.add_table(rows=6, cols=3)
-        evidencias_table.style = 'Light Grid Accent 1'
-        
-        # Cabeçalho da tabela de evidências
-        evidencias_header = evidencias_table.rows[0].cells
-        headers = ['Etapa', 'Evidência', 'Resultado']
-        for col, header in enumerate(headers):
-            evidencias_header[col].text = header
-            for paragraph in evidencias_header[col].paragraphs:
-                for run in paragraph.runs:
-                    run.font.name = 'Arial'
-                    run.font.size = Pt(12)
-                    run.bold = True
-                    run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Linhas para preenchimento
-        etapas = [
-            'Pré-condições',
-            'Configuração Inicial', 
-            'Execução do Teste',
-            'Pós-condições',
-            'Resultado Final'
-        ]
-        
-        for row, etapa in enumerate(etapas, 1):
-            if row < len(evidencias_table.rows):
-                row_cells = evidencias_table.rows[row].cells
-                row_cells[0].text = etapa
-                row_cells[1].text = "[Descreva a evidência coletada]"
-                row_cells[2].text = "[Resultado obtido - OK/Erro]"
-                
-                for cell in row_cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.name = 'Arial'
-                            run.font.size = Pt(12)
-                            run.bold = False
-                            run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        doc.add_paragraph()
-        
-        # Seção de observações
-        obs_heading = doc.add_heading('Observações e Comentários', level=2)
-        for run in obs_heading.runs:
-            run.font.name = 'Arial'
-            run.font.size = Pt(12)
-            run.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
-            
-        obs_para = doc.add_paragraph("Adicione observações relevantes sobre a execução do teste:")
-        
-        # Área para observações
-        obs_list_para = doc.add_paragraph()
-        obs_title_run = obs_list_para.add_run("Observações Gerais:\n")
-        obs_title_run.bold = True
-        obs_title_run.font.name = 'Arial'
-        obs_title_run.font.size = Pt(12)
-        obs_title_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        obs_items = [
-            "• [Insira observações sobre problemas encontrados]\n",
-            "• [Comentários sobre o comportamento do sistema]\n",
-            "• [Sugestões de melhorias]\n",
-            "• [Outras informações relevantes]"
-        ]
-        
-        for item in obs_items:
-            item_run = obs_list_para.add_run(item)
-            item_run.font.name = 'Arial'
-            item_run.font.size = Pt(12)
-            item_run.bold = False
-            item_run.font.color.rgb = RGBColor(0, 0, 0)
-
-
 class TemplateGeneratorModule:
     """Interface principal da aplicação"""
     
@@ -515,11 +170,13 @@ class TemplateGeneratorModule:
         
         # Controle das colunas do CSV
         self.colunas_selecionadas: List[str] = []
-        self.df_csv: Optional[pd.DataFrame] = None
         self.csv_colunas: List[str] = []
         
         # Variável para controle de diretório automático
         self.auto_directory_var = tk.BooleanVar(value=True)
+        
+        # Saída do lote em .zip (um arquivo com índice em vez de um .docx por caso)
+        self.zip_output_var = tk.BooleanVar(value=TEMPLATE_SETTINGS.get('archive_output', False))
     
     def show(self):
         """Mostra interface completa"""
@@ -635,6 +292,9 @@ class TemplateGeneratorModule:
             command=self._toggle_auto_directory
         )
         self.auto_dir_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        ttk.Checkbutton(directory_frame, text="Salvar em .zip",
+                        variable=self.zip_output_var).pack(side=tk.LEFT, padx=(10, 0))
 
         # Info sobre campos obrigatórios
         info_label = ttk.Label(parent, text="* Campos obrigatórios", font=("Arial", 9), foreground="gray")
@@ -775,7 +435,8 @@ class TemplateGeneratorModule:
     # Métodos de seleção de arquivos
     def selecionar_csv(self) -> None:
         arquivo = filedialog.askopenfilename(title="Selecionar arquivo CSV", 
-                                            filetypes=[("CSV Files", "*.csv"), ("Todos os arquivos", "*.*")])
+                                            filetypes=[("CSV / Excel", "*.csv *.xlsx *.xlsm"), ("CSV Files", "*.csv"),
+                                                       ("Excel", "*.xlsx *.xlsm"), ("Todos os arquivos", "*.*")])
         if arquivo:
             self.csv_entry.delete(0, tk.END)
             self.csv_entry.insert(0, arquivo)
@@ -790,9 +451,9 @@ class TemplateGeneratorModule:
             colunas = self.csv_reader.get_csv_columns(arquivo_csv)
             
             if colunas and len(colunas) > 1:  # Tem colunas além do Nome (ou primeira coluna)
-                # Remover a coluna de nome (assumindo que é a primeira)
-                coluna_nome = colunas[0]
-                colunas_adicionais = colunas[1:] if len(colunas) > 1 else []
+                # Remover a coluna de nome ("Nome" ou a primeira)
+                coluna_nome = coluna_de_nome(colunas)
+                colunas_adicionais = [coluna for coluna in colunas if coluna != coluna_nome]
                 
                 if colunas_adicionais:
                     self.log(f"📊 CSV possui {len(colunas_adicionais)} colunas adicionais")
@@ -814,9 +475,6 @@ class TemplateGeneratorModule:
                             self.log(f"✅ Colunas selecionadas: {', '.join(self.colunas_selecionadas)}")
                         else:
                             self.log("ℹ️ Nenhuma coluna adicional selecionada")
-                    
-                    # Carregar o DataFrame completo para uso posterior
-                    _, _, self.df_csv = self.csv_reader.read_csv(arquivo_csv)
             else:
                 self.log("ℹ️ CSV não possui colunas adicionais para seleção")
                 self.colunas_selecionadas = []
@@ -859,7 +517,6 @@ class TemplateGeneratorModule:
         
         # Limpar seleção de colunas
         self.colunas_selecionadas = []
-        self.df_csv = None
         
         # Restaurar auto directory
         self.auto_directory_var.set(True)
@@ -872,8 +529,18 @@ class TemplateGeneratorModule:
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state='disabled')
 
+    def _na_interface(self, funcao, *args) -> None:
+        """Agenda uma chamada na thread do Tk (o lote roda em outra thread)"""
+        try:
+            self.window.after(0, funcao, *args)
+        except Exception as e:
+            print(f"Erro ao agendar atualização da interface: {e}")
+
     def log(self, mensagem: str) -> None:
         """Adiciona mensagem ao log"""
+        if threading.current_thread() is not threading.main_thread():
+            self._na_interface(self.log, mensagem)
+            return
         self.log_text.config(state='normal')
         self.log_text.insert(tk.END, mensagem + "\n")
         self.log_text.see(tk.END)
@@ -902,36 +569,6 @@ class TemplateGeneratorModule:
         
         return True
 
-    def _obter_dados_csv_por_nome(self, nome_caso_teste: str) -> Dict[str, str]:
-        """Obtém os dados do CSV para um caso de teste específico"""
-        if self.df_csv is None or not self.colunas_selecionadas:
-            return {}
-        
-        try:
-            # Encontrar a linha correspondente ao nome do caso de teste
-            # Assumindo que a primeira coluna contém os nomes
-            coluna_nome = self.df_csv.columns[0]
-            linha = self.df_csv[self.df_csv[coluna_nome] == nome_caso_teste]
-            
-            if not linha.empty:
-                dados = {}
-                for coluna in self.colunas_selecionadas:
-                    if coluna in linha.columns:
-                        valor = linha[coluna].iloc[0]
-                        # Converter para string e tratar valores NaN
-                        if pd.isna(valor):
-                            dados[coluna] = ""
-                        else:
-                            dados[coluna] = str(valor)
-                    else:
-                        dados[coluna] = ""
-                return dados
-        
-        except Exception as e:
-            self.log(f"⚠️ Erro ao obter dados do CSV para '{nome_caso_teste}': {e}")
-        
-        return {}
-
     def _get_output_directory(self, template_path: str) -> str:
         """Determina o diretório de saída baseado nas configurações"""
         if self.auto_directory_var.get() and template_path:
@@ -977,16 +614,16 @@ class TemplateGeneratorModule:
                 output_folder = '.'
             
             self.log("📖 Lendo arquivo CSV...")
-            casos_teste, colunas_csv, self.df_csv = self.csv_reader.read_csv(csv_path)
+            colunas = self.csv_reader.get_csv_columns(csv_path)
             
-            if not casos_teste:
+            if not colunas:
                 messagebox.showerror("Erro", "Não foi possível ler os casos de teste do CSV")
                 self.gerar_btn.config(state='normal')
                 return
             
             # Se não tivermos colunas selecionadas mas o CSV tiver colunas adicionais, 
             # perguntar novamente (pode acontecer se o usuário cancelou anteriormente)
-            if not self.colunas_selecionadas and colunas_csv and len(colunas_csv) > 0:
+            if not self.colunas_selecionadas and len(colunas) > 1:
                 self._verificar_colunas_csv(csv_path)
             
             # Determinar modo de operação
@@ -997,7 +634,7 @@ class TemplateGeneratorModule:
             else:
                 self.log("📝 Gerando documentos com template padrão...")
             
-            self._process_test_cases(casos_teste, dados_fixos, template_path, output_folder, use_default_template)
+            self._process_test_cases(csv_path, dados_fixos, template_path, output_folder, use_default_template)
             
         except Exception as e:
             self.log(f"❌ Erro inesperado: {e}")
@@ -1019,106 +656,50 @@ class TemplateGeneratorModule:
                 return ""
         return template_path
 
-    def _process_test_cases(self, casos_teste: List[str], dados_fixos: Dict[str, str], 
+    def _process_test_cases(self, csv_path: str, dados_fixos: Dict[str, str], 
                            template_path: str, output_folder: str, use_default_template: bool) -> None:
-        """Processa cada caso de teste individualmente"""
-        self.log(f"📊 Encontrados {len(casos_teste)} casos de teste\n")
-        self.progress['maximum'] = len(casos_teste)
-        
-        sucessos = 0
-        erros = []
-        arquivos_gerados = set()
-        
-        for i, caso_teste in enumerate(casos_teste, 1):
-            try:
-                self.progress['value'] = i
-                self.log(f"🔄 Processando: {caso_teste}")
-                
-                # Obter dados do CSV para este caso de teste
-                dados_csv = self._obter_dados_csv_por_nome(caso_teste)
-                
-                if self._generate_single_document(caso_teste, dados_fixos, template_path, 
-                                                output_folder, arquivos_gerados, use_default_template,
-                                                dados_csv):
-                    sucessos += 1
-                else:
-                    erros.append((caso_teste, "Erro na geração"))
-                    
-            except Exception as e:
-                self.log(f"❌ Erro no caso '{caso_teste}': {e}\n")
-                erros.append((caso_teste, str(e)))
-            
-            time.sleep(0.05)  # Pequena pausa para não sobrecarregar
-            
-        self._show_final_results(sucessos, len(erros), len(casos_teste), 
-                               output_folder, arquivos_gerados)
+        """
+        Gera os documentos do lote em um pool de processos enquanto o CSV é lido
+        em blocos. Os nomes dos arquivos são definidos antes do envio; o progresso
+        volta para o Tk via ``after()``.
+        """
+        resumo = executar_lote(
+            csv_path, dados_fixos, template_path, output_folder, use_default_template,
+            self.campos_config, self.colunas_selecionadas,
+            duplicados=TEMPLATE_SETTINGS.get('csv_duplicates', 'first'),
+            workers=TEMPLATE_SETTINGS.get('batch_workers'),
+            tamanho_bloco=TEMPLATE_SETTINGS.get('csv_chunk_rows', TAMANHO_BLOCO),
+            retomar=TEMPLATE_SETTINGS.get('resume_batches', True),
+            placeholders=TEMPLATE_SETTINGS.get('placeholders'),
+            pular_inalterados=TEMPLATE_SETTINGS.get('skip_unchanged', True),
+            arquivo_zip=self.zip_output_var.get(),
+            documentos_por_zip=TEMPLATE_SETTINGS.get('archive_documents_per_zip'),
+            ao_iniciar=lambda estimativa: self._na_interface(
+                self.progress.config, {'maximum': max(1, estimativa), 'value': 0}),
+            ao_resultado=lambda resultado: self._na_interface(self._registrar_resultado, resultado),
+            log=self.log)
+        
+        self._na_interface(self._concluir_lote, resumo.sucessos, len(resumo.erros), resumo.total,
+                           output_folder, resumo.arquivos_gerados)
+
+    def _registrar_resultado(self, resultado) -> None:
+        """Atualiza barra de progresso e log com o resultado de um caso (thread do Tk)"""
+        feitos = resultado.indice + 1
+        if feitos > self.progress['maximum']:
+            self.progress['maximum'] = feitos
+        self.progress['value'] = feitos
+        self.log(f"🔄 Processando: {resultado.caso_teste}")
+        for mensagem in resultado.mensagens:
+            self.log(mensagem)
+
+    def _concluir_lote(self, sucessos: int, erros: int, total: int,
+                       output_folder: str, arquivos_gerados: set) -> None:
         self.gerar_btn.config(state='normal')
-
-    def _generate_single_document(self, caso_teste: str, dados_fixos: Dict[str, str], 
-                                template_path: str, output_folder: str, 
-                                arquivos_gerados: set, use_default_template: bool,
-                                dados_csv: Dict[str, str] = None) -> bool:
-        """Gera um único documento - AGORA PRESERVA TEMPLATE ORIGINAL E ADICIONA DADOS APÓS"""
-        try:
-            dados_completos = dados_fixos.copy()
-            dados_completos['Caso de Teste'] = caso_teste
-            
-            # Usar template se fornecido e existir, caso contrário criar documento padrão
-            if not use_default_template:
-                try:
-                    doc = Document(template_path)
-                    # AGORA: Adiciona dados APÓS o conteúdo do template original
-                    self.doc_processor.fill_template(doc, dados_completos, self.campos_config,
-                                                   self.colunas_selecionadas, dados_csv)
-                except Exception as e:
-                    self.log(f"⚠️ Erro ao usar template personalizado: {e}. Usando template padrão...")
-                    doc = self.default_doc_generator.create_default_document(
-                        dados_completos, self.campos_config, self.colunas_selecionadas, dados_csv)
-            else:
-                # Criar documento padrão com todos os dados
-                doc = self.default_doc_generator.create_default_document(
-                    dados_completos, self.campos_config, self.colunas_selecionadas, dados_csv)
-            
-            # Nome do arquivo usa apenas o nome do Caso de Teste
-            nome_base = self.doc_processor.clean_filename(caso_teste)
-            nome_arquivo = self._generate_unique_filename(f"{nome_base}.docx", arquivos_gerados)
-            
-            caminho_completo = Path(output_folder) / nome_arquivo
-            
-            # Tentar salvar o documento
-            try:
-                doc.save(caminho_completo)
-                self.log(f"✅ Salvo: {nome_arquivo}")
-                return True
-            except Exception as e:
-                # Fallback: tentar salvar com nome diferente
-                try:
-                    nome_alternativo = f"Evidencia_{datetime.now().strftime('%H%M%S')}.docx"
-                    caminho_alternativo = Path(output_folder) / nome_alternativo
-                    doc.save(caminho_alternativo)
-                    self.log(f"✅ Salvo (nome alternativo): {nome_alternativo}")
-                    arquivos_gerados.add(nome_alternativo)
-                    return True
-                except Exception as e2:
-                    self.log(f"❌ Erro ao salvar documento: {e2}")
-                    return False
-            
-        except Exception as e:
-            self.log(f"❌ Erro crítico ao gerar documento: {e}")
-            return False
-
-    def _generate_unique_filename(self, filename: str, existing_files: set) -> str:
-        """Gera um nome de arquivo único"""
-        contador = 1
-        nome_original = filename
-        
-        while filename in existing_files:
-            base, ext = os.path.splitext(nome_original)
-            filename = f"{base}_{contador}{ext}"
-            contador += 1
-        
-        existing_files.add(filename)
-        return filename
+        if not total:
+            messagebox.showerror("Erro", "Não foi possível ler os casos de teste do CSV")
+            return
+        self.progress.config(maximum=total, value=total)
+        self._show_final_results(sucessos, erros, total, output_folder, arquivos_gerados)
 
     def _abrir_pasta(self, caminho_pasta: str) -> None:
         """Abre a pasta no explorador de arquivos do sistema operacional"""
@@ -0,0 +1,157 @@
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+
+W_P = qn('w:p')
+W_T = qn('w:t')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+# [NOME_DO_PROJETO], [MÓDULO], [VERSÃO]... (só nomes em maiúsculas)
+PADRAO_PLACEHOLDER = re.compile(r'\[(\w+)\]')
+
+# Nomes que sempre se referem ao caso de teste da linha
+NOMES_CASO = ('CASO_DE_TESTE', 'NOME_DO_CASO', 'CASO_TESTE')
+
+
+def normalizar_nome(texto: str) -> str:
+    """'Nome do Projeto:' -> 'NOME_DO_PROJETO' (mesma forma dos placeholders)"""
+    return re.sub(r'[\s\-]+', '_', texto.strip().rstrip(':').strip()).upper()
+
+
+def _eh_placeholder(nome: str) -> bool:
+    return nome == nome.upper() and any(c.isalpha() for c in nome)
+
+
+def partes_cabecalho_rodape(doc) -> List:
+    """Elementos raiz de todos os cabeçalhos e rodapés do documento"""
+    return [rel.target_part.element for rel in doc.part.rels.values()
+            if not rel.is_external and rel.reltype in (RT.HEADER, RT.FOOTER)]
+
+
+class PlaceholdersTemplate:
+    """
+    Mapa dos placeholders de um template, montado uma única vez.
+
+    Cada parágrafo (corpo, tabelas, caixas de texto, cabeçalhos e rodapés) é
+    lido uma vez; para cada ocorrência de ``[NOME]`` — inclusive quando o Word
+    dividiu o texto em vários runs — são guardados os ``<w:t>`` afetados e o
+    texto de cada um em pedaços (literal ou placeholder). O placeholder fica
+    no primeiro run em que começa (mantém a formatação dele) e os demais
+    perdem o trecho consumido. ``preencher`` só reescreve esses ``<w:t>``:
+    O(placeholders) por documento, sem percorrer o template de novo.
+    Placeholders sem valor voltam ao texto original.
+    """
+
+    def __init__(self, raizes: Iterable):
+        self.nomes = set()
+        self._textos = []
+        for raiz in raizes:
+            for paragrafo in raiz.iter(W_P):
+                self._mapear_paragrafo(paragrafo)
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def _mapear_paragrafo(self, paragrafo) -> None:
+        # Só os <w:t> do próprio parágrafo (caixas de texto aninhadas têm os seus)
+        elementos = [t for t in paragrafo.iter(W_T) if next(t.iterancestors(W_P), None) is paragrafo]
+        if not elementos:
+            return
+        textos = [t.text or '' for t in elementos]
+        completo = ''.join(textos)
+        if '[' not in completo:
+            return
+        ocorrencias = [m for m in PADRAO_PLACEHOLDER.finditer(completo) if _eh_placeholder(m.group(1))]
+        if not ocorrencias:
+            return
+
+        inicios = []
+        posicao = 0
+        for texto in textos:
+            inicios.append(posicao)
+            posicao += len(texto)
+
+        pedacos = [[] for _ in elementos]
+        afetados = set()
+
+        def literal(inicio, fim):
+            for i in range(bisect.bisect_right(inicios, inicio) - 1, len(elementos)):
+                ini_t = inicios[i]
+                if ini_t >= fim:
+                    break
+                trecho = completo[max(inicio, ini_t):min(fim, ini_t + len(textos[i]))]
+                if trecho:
+                    pedacos[i].append((trecho, None))
+
+        posicao = 0
+        for ocorrencia in ocorrencias:
+            literal(posicao, ocorrencia.start())
+            primeiro = bisect.bisect_right(inicios, ocorrencia.start()) - 1
+            ultimo = bisect.bisect_right(inicios, ocorrencia.end() - 1) - 1
+            afetados.update(range(primeiro, ultimo + 1))
+            nome = normalizar_nome(ocorrencia.group(1))
+            pedacos[primeiro].append((ocorrencia.group(0), nome))
+            self.nomes.add(nome)
+            posicao = ocorrencia.end()
+        literal(posicao, len(completo))
+
+        for i in sorted(afetados):
+            self._textos.append((elementos[i], pedacos[i]))
+
+    def preencher(self, valores) -> None:
+        """Escreve os valores (``valores.get(nome)``) nos runs mapeados"""
+        for t, pedacos in self._textos:
+            texto = ''.join(original if nome is None else valores.get(nome, original)
+                            for original, nome in pedacos)
+            t.text = texto
+            if texto[:1].isspace() or texto[-1:].isspace():
+                t.set(XML_SPACE, 'preserve')
+
+
+class ResolvedorPlaceholders:
+    """
+    De onde vem o valor de cada placeholder, decidido uma vez por lote:
+    chave ou rótulo de um campo fixo, coluna selecionada do CSV, o nome do
+    caso de teste ou um apelido configurado (``{'NOME_DO_PROJETO': 'Projeto'}``).
+    """
+
+    def __init__(self, campos_config: List[Dict], colunas_selecionadas: Optional[List[str]] = None,
+                 apelidos: Optional[Dict[str, str]] = None):
+        self._fontes = {}
+        for coluna in colunas_selecionadas or []:
+            self._fontes[normalizar_nome(coluna)] = ('csv', coluna)
+        for campo in campos_config:
+            self._fontes[normalizar_nome(campo['key'])] = ('dado', campo['key'])
+            self._fontes[normalizar_nome(campo['label'])] = ('dado', campo['key'])
+        for nome in NOMES_CASO:
+            self._fontes[nome] = ('dado', 'Caso de Teste')
+        for apelido, alvo in (apelidos or {}).items():
+            fonte = self._fontes.get(normalizar_nome(alvo))
+            if fonte:
+                self._fontes[normalizar_nome(apelido)] = fonte
+
+    def valores(self, data: Dict[str, str], dados_csv: Optional[Dict[str, str]] = None) -> 'ValoresCaso':
+        return ValoresCaso(self._fontes, data, dados_csv or {})
+
+
+class ValoresCaso:
+    """Valores de uma linha, resolvidos sob demanda só para os placeholders do template"""
+
+    __slots__ = ("_fontes", "_dicionarios")
+
+    def __init__(self, fontes: Dict, data: Dict[str, str], dados_csv: Dict[str, str]):
+        self._fontes = fontes
+        self._dicionarios = {'dado': data, 'csv': dados_csv}
+
+    def get(self, nome: str, padrao: str) -> str:
+        fonte = self._fontes.get(nome)
+        if fonte is None:
+            return padrao
+        origem, chave = fonte
+        dicionario = self._dicionarios[origem]
+        if chave not in dicionario:
+            return padrao
+        return str(dicionario[chave])
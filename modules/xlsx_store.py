@@ -0,0 +1,117 @@
+from datetime import date, datetime, time
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+EXTENSOES_PLANILHA = ('.xlsx', '.xlsm')
+
+
+def eh_planilha(file_path: str) -> bool:
+    return str(file_path).lower().endswith(EXTENSOES_PLANILHA)
+
+
+def _abrir(file_path: str):
+    if openpyxl is None:
+        raise ImportError("Leitura de planilhas .xlsx requer o pacote openpyxl (pip install openpyxl)")
+    # Somente leitura: as linhas são lidas do XML sob demanda (memória constante)
+    return openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+
+
+def _texto_celula(celula) -> Optional[str]:
+    """Valor da célula como texto, preservando zeros à esquerda de formatos como "00000" """
+    valor = celula.value
+    if valor is None:
+        return None
+    if isinstance(valor, bool):
+        return str(valor)
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int):
+        formato = getattr(celula, 'number_format', None) or ''
+        if formato and set(formato) == {'0'}:
+            return str(valor).zfill(len(formato))
+        return str(valor)
+    if isinstance(valor, datetime):
+        if valor.time() == time(0):
+            return valor.date().isoformat()
+        return valor.isoformat(sep=' ')
+    if isinstance(valor, (date, time)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _cabecalho(linha) -> List[str]:
+    """Nomes das colunas, com vazios e repetidos tratados como no pandas.read_csv"""
+    colunas = []
+    vistos = {}
+    for posicao, celula in enumerate(linha):
+        nome = _texto_celula(celula)
+        nome = nome.strip() if nome and nome.strip() else f"Unnamed: {posicao}"
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        colunas.append(nome)
+    # Colunas vazias no fim da linha de cabeçalho (formatação além dos dados)
+    while colunas and colunas[-1].startswith("Unnamed: "):
+        colunas.pop()
+    return colunas
+
+
+def colunas_xlsx(file_path: str) -> List[str]:
+    """Colunas da aba ativa (primeira linha)"""
+    livro = _abrir(file_path)
+    try:
+        for linha in livro.active.iter_rows(max_row=1):
+            return _cabecalho(linha)
+        return []
+    finally:
+        livro.close()
+
+
+def estimar_linhas_xlsx(file_path: str) -> int:
+    """Linhas de dados segundo a dimensão gravada na aba (0 se a planilha não informar)"""
+    livro = _abrir(file_path)
+    try:
+        return max(0, (livro.active.max_row or 1) - 1)
+    finally:
+        livro.close()
+
+
+def ler_blocos_xlsx(file_path: str, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    """
+    Lê a aba ativa linha a linha e entrega DataFrames de ``tamanho_bloco``
+    linhas com os valores em texto, no mesmo formato de ``ler_blocos`` do CSV.
+    O primeiro bloco fica pronto sem esperar o restante da planilha.
+    """
+    livro = _abrir(file_path)
+    try:
+        linhas = livro.active.iter_rows()
+        colunas = None
+        for linha in linhas:
+            colunas = _cabecalho(linha)
+            break
+        if not colunas:
+            return
+
+        largura = len(colunas)
+        bloco = []
+        for linha in linhas:
+            valores = [_texto_celula(celula) for celula in linha[:largura]]
+            if not any(valor is not None and valor.strip() for valor in valores):
+                continue  # linha em branco (o read_csv também as ignora)
+            valores.extend([None] * (largura - len(valores)))
+            bloco.append(valores)
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=colunas, dtype=object)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=colunas, dtype=object)
+    finally:
+        livro.close()
@@ -0,0 +1 @@
+"""PrintF - execução via ``python -m printf`` (modo linha de comando)"""
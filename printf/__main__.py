@@ -0,0 +1,15 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Necessário para o pool de processos (Windows / executável)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # Raiz do projeto no caminho de imports (config.py e modules/)
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if raiz not in sys.path:
+        sys.path.insert(0, raiz)
+
+    from modules.cli import main
+    sys.exit(main())